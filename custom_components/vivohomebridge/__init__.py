@@ -8,7 +8,7 @@ Licensed under the Apache License, Version 2.0 (the "License");
 import asyncio
 import uuid
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import ConfigType
 from .const import (
@@ -16,16 +16,32 @@ from .const import (
     VIVO_BRIDGE_BOOT_UP_REASON_KEY,
     VIVO_HA_BRIDGE_VERSION,
     DOMAIN,
+    CONF_VHOME_BACKEND,
+    CONF_VHOME_ISOLATION,
+    CONF_VLOG_LEVEL,
 )
+from .py_vhome.vhome import select_backend, select_isolation
 from .v_local_service import VLocalService
 from .device_manager import DeviceManager
 from .v_utils.vlog import VLog
 from .vbridge import VBridgeEntity
 
 _TAG = "entry_config"
+PLATFORMS = [Platform.SENSOR]
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    log_level = config.get(DOMAIN, {}).get(CONF_VLOG_LEVEL)
+    if log_level is not None:
+        VLog.set_level_by_name(log_level)
+    backend = config.get(DOMAIN, {}).get(CONF_VHOME_BACKEND)
+    if backend is not None:
+        VLog.info(_TAG, f"[setup] vhome backend:{backend}")
+        select_backend(backend)
+    isolation = config.get(DOMAIN, {}).get(CONF_VHOME_ISOLATION)
+    if isolation is not None:
+        VLog.info(_TAG, f"[setup] vhome isolation:{isolation}")
+        select_isolation(isolation)
     return True
 
 
@@ -33,6 +49,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up an entry."""
     boot_up_reason = entry.data.get(VIVO_BRIDGE_BOOT_UP_REASON_KEY, "home_assistant")
     VLog.info(_TAG, f"[setup entry] setup from:{boot_up_reason},data:{entry.data}")
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     if boot_up_reason == "home_assistant":
 
         async def _async_initialize(event):
@@ -56,16 +73,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def _async_init(hass, entry):
+    device_manager = DeviceManager.get(entry.entry_id)
     bridge_entity = VBridgeEntity(hass, entry)
-    DeviceManager.instance().set_bridge(bridge_entity)
-    DeviceManager.instance().set_local_service(hass)
-    await DeviceManager.instance().async_dm_service_start(hass)
+    device_manager.set_bridge(bridge_entity)
+    device_manager.set_local_service(hass)
+    await device_manager.async_dm_service_start(hass)
 
 
 async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     VLog.info(_TAG, f"[async_remove_entry]{entry.data}")
-    await DeviceManager.instance().async_remove_sub_devices()
-    await DeviceManager.instance().async_bridge_remove()
+    device_manager = DeviceManager.find(entry.entry_id)
+    if device_manager is None:
+        # 条目从未加载过，没有需要在云端注销的设备
+        return True
+    # 删除前 HA 已先卸载条目并关闭了 VHome，需重新打开才能在云端注销子设备
+    vhome = device_manager.get_vhome()
+    await vhome.async_open()
+    await vhome.async_wait_ready()
+    await device_manager.async_remove_sub_devices()
+    await device_manager.async_bridge_remove()
+    await vhome.async_close()
+    DeviceManager.release(entry.entry_id)
     return True
 
 
@@ -76,37 +104,43 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     hass.config_entries.async_update_entry(config_entry, data=_entry_data)
 
     VLog.info(_TAG, f"[async_unload_entry]{config_entry.data}")
-    DeviceManager.instance().instance().get_local_server().config_flag(2)
-    await DeviceManager.instance().instance().get_local_server().sync_update_txt()
-    await DeviceManager.instance().instance().get_local_server().sync_stop()
-    await DeviceManager.instance().instance().get_vhome().network_shakehand_task_stop()
-    await DeviceManager.instance().uninstall()
-    return True
+    device_manager = DeviceManager.find(config_entry.entry_id)
+    if device_manager is None:
+        return await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
+    device_manager.get_local_server().config_flag(2)
+    await device_manager.get_local_server().sync_update_txt()
+    await device_manager.get_local_server().sync_stop()
+    await device_manager.get_vhome().network_shakehand_task_stop()
+    await device_manager.uninstall()
+    return await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
 
 
 async def _async_setup_entry_task(
     hass: HomeAssistant, config_entry: ConfigEntry
 ) -> None:
     VLog.info(_TAG, f"[setup task] start")
-    await DeviceManager.instance().async_load_config()
-    bridge_device = DeviceManager.instance().get_bridge_device()
-    DeviceManager.instance().instance().get_local_server().config_flag(0)
-
-    await DeviceManager.instance().get_vhome().network_shakehand_task_stop()
+    device_manager = DeviceManager.find(config_entry.entry_id)
+    if device_manager is None:
+        return
+    await device_manager.async_load_config()
+    bridge_device = device_manager.get_bridge_device()
+    device_manager.get_local_server().config_flag(0)
+
+    await device_manager.get_vhome().network_shakehand_task_stop()
     if bridge_device.name is not None and len(bridge_device.name) > 0:
         VLog.info(_TAG, f"[setup task] init bridge {bridge_device}")
-        DeviceManager.instance().create_update_service(
+        device_manager.create_update_service(
             hass, bridge_device.name, bridge_device.mac, config_entry.entry_id
         )
         if (
-            DeviceManager.instance().get_bridge_entity().get_device_enable()
+            device_manager.get_bridge_entity().get_device_enable()
             and bridge_device.host is not None
             and len(bridge_device.host) > 0
             and bridge_device.port is not None
             and len(bridge_device.port) > 0
         ):
-            DeviceManager.instance().instance().get_local_server().config_flag(1)
-            await DeviceManager.instance().async_connect(
+            device_manager.get_local_server().config_flag(1)
+            await device_manager.async_connect(
                 bridge_device.host,
                 int(bridge_device.port),
                 bridge_device.name,
@@ -116,7 +150,7 @@ async def _async_setup_entry_task(
         else:
             VLog.info(_TAG, f"[setup task] bridge is disable")
     else:
-        await DeviceManager.instance().get_vhome().network_shakehand_task_start()
-    target_port: int = DeviceManager.instance().get_vhome().get_local_net_target_port()
-    await DeviceManager.instance().instance().get_local_server().sync_start(target_port)
+        await device_manager.get_vhome().network_shakehand_task_start()
+    target_port: int = device_manager.get_vhome().get_local_net_target_port()
+    await device_manager.get_local_server().sync_start(target_port)
     VLog.info(_TAG, f"[setup task] end")
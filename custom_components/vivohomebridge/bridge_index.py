@@ -0,0 +1,118 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+from typing import Iterable, Optional
+
+from .const import (
+    VIVO_DEVICE_ENTITY_ID_KEY,
+    VIVO_DEVICE_ID_KEY,
+    VIVO_DEVICE_NAME_CONFIG_KEY,
+    VIVO_HA_KEY_WORLD_DEV_ENTRY_ID,
+    VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC,
+)
+
+
+class BridgeDeviceIndex(list):
+    """
+    网桥子设备配置记录(bridge_config_data)及其索引
+
+    仍是 list，可直接保存到 Store；按 entity_id、dn、logicMac、device_id 查找记录为 O(1)，
+    同一键出现多次时与线性查找一致，返回第一条记录。
+    通过 list 接口增删记录时自动更新索引；直接修改记录字段后需调用 reindex。
+    """
+
+    _KEYS = (
+        VIVO_DEVICE_ENTITY_ID_KEY,
+        VIVO_DEVICE_NAME_CONFIG_KEY,
+        VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC,
+        VIVO_DEVICE_ID_KEY,
+    )
+
+    def __init__(self, records: Iterable[dict] = ()):
+        super().__init__(records)
+        self.reindex()
+
+    def reindex(self) -> None:
+        self._indexes: dict[str, dict] = {key: {} for key in self._KEYS}
+        self._by_entry_id: dict[str, list[dict]] = {}
+        for record in self:
+            self._index(record)
+
+    def _index(self, record: dict) -> None:
+        for key, index in self._indexes.items():
+            value = record.get(key)
+            if value is not None:
+                index.setdefault(value, record)
+        self._by_entry_id.setdefault(record.get(VIVO_HA_KEY_WORLD_DEV_ENTRY_ID), []).append(
+            record
+        )
+
+    # ---- 查找 ----
+
+    def find(self, key: str, value) -> Optional[dict]:
+        """按字段查找第一条记录，未建索引的字段退化为线性查找"""
+        index = self._indexes.get(key)
+        if index is not None:
+            return index.get(value)
+        return next((record for record in self if record.get(key) == value), None)
+
+    def find_by_entity_id(self, entity_id: str) -> Optional[dict]:
+        return self._indexes[VIVO_DEVICE_ENTITY_ID_KEY].get(entity_id)
+
+    def find_by_dn(self, dn: str) -> Optional[dict]:
+        return self._indexes[VIVO_DEVICE_NAME_CONFIG_KEY].get(dn)
+
+    def find_by_logic_mac(self, logic_mac: str) -> Optional[dict]:
+        return self._indexes[VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC].get(logic_mac)
+
+    def find_by_device_id(self, device_id: str) -> Optional[dict]:
+        return self._indexes[VIVO_DEVICE_ID_KEY].get(device_id)
+
+    def find_by_entry_id(self, entry_id: str) -> list[dict]:
+        """来源集成的配置条目 id 对应的所有记录"""
+        return list(self._by_entry_id.get(entry_id, ()))
+
+    # ---- 维护索引的 list 接口 ----
+
+    def append(self, record: dict) -> None:
+        super().append(record)
+        self._index(record)
+
+    def extend(self, records: Iterable[dict]) -> None:
+        records = list(records)
+        super().extend(records)
+        for record in records:
+            self._index(record)
+
+    def __iadd__(self, records: Iterable[dict]):
+        self.extend(records)
+        return self
+
+    def insert(self, position, record: dict) -> None:
+        super().insert(position, record)
+        self.reindex()
+
+    def remove(self, record: dict) -> None:
+        super().remove(record)
+        self.reindex()
+
+    def pop(self, position=-1) -> dict:
+        record = super().pop(position)
+        self.reindex()
+        return record
+
+    def clear(self) -> None:
+        super().clear()
+        self.reindex()
+
+    def __setitem__(self, position, value) -> None:
+        super().__setitem__(position, value)
+        self.reindex()
+
+    def __delitem__(self, position) -> None:
+        super().__delitem__(position)
+        self.reindex()
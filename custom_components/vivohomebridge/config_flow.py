@@ -137,6 +137,10 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
     @property
     def config_entry(self):
        return self._config_entry
+
+    @property
+    def _device_manager(self) -> DeviceManager | None:
+        return DeviceManager.find(self._config_entry.entry_id)
    
     def __generate_qr_code(self, bind_code: str):
         data = {"ha_bind_code": bind_code}
@@ -192,7 +196,7 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
                     raise TimeoutError("QR code scan timed out")
                 VLog.info(_TAG, f"[wait_for_scanned] check scan {bind_code}")
                 bind_result_dict = (
-                    await DeviceManager.instance()
+                    await self._device_manager
                     .get_vhome()
                     .async_bind(bind_code, mac, GLOB_NAME)
                 )
@@ -224,7 +228,7 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
         if self._qrcode_scanned_task is None:
             self._qrcode_scanned_task = self.hass.async_create_task(
                 partial(
-                    DeviceManager.instance().async_binding_pending,
+                    self._device_manager.async_binding_pending,
                     1,
                     self._bind_code,
                     self.config_entry.data.get(VIVO_BRIDGE_MAC_CONFIG_KEY),
@@ -247,8 +251,8 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
                 self.qrcode_abort_msg_id = ""
             return self.async_show_progress_done(next_step_id="qrcode_scanned")
 
-        await DeviceManager.instance().get_vhome().network_shakehand_task_stop()
-        await DeviceManager.instance().instance().get_local_server().sync_stop()
+        await self._device_manager.get_vhome().network_shakehand_task_stop()
+        await self._device_manager.get_local_server().sync_stop()
         if self._delay_time % 60 == 0:
             time_out_minutes = self._delay_time / 60
             unit_key = "min"
@@ -290,7 +294,7 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
 
         mac = self.config_entry.data.get(VIVO_BRIDGE_MAC_CONFIG_KEY)
         bcode_dict_result = (
-            await DeviceManager.instance().get_vhome().async_get_bcode(mac)
+            await self._device_manager.get_vhome().async_get_bcode(mac)
         )
         VLog.info(_TAG, f"[_handle_bcode_async] bcode_dict_result:{bcode_dict_result}")
 
@@ -343,7 +347,7 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
             )
         if user_input is not None:
             if (
-                DeviceManager.instance().get_bridge_entity().get_device_enable()
+                self._device_manager.get_bridge_entity().get_device_enable()
                 is False
             ):
                 return self.async_abort(reason="bridge_device_disable")
@@ -358,16 +362,19 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
                         un_reg_logic_mac = config_device_item.get(
                             VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC
                         )
-                        DeviceManager.instance().get_bridge_entity().hass.bus.fire(
+                        bridge_entity = self._device_manager.get_bridge_entity()
+                        bridge_entity.hass.bus.fire(
                             EVENT_VHOME_DEV_UNREG_RESULT,
-                            {
-                                "success": [
-                                    {VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC: un_reg_logic_mac}
-                                ],
-                                "failed": [],
-                            },
+                            bridge_entity.event_data(
+                                {
+                                    "success": [
+                                        {VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC: un_reg_logic_mac}
+                                    ],
+                                    "failed": [],
+                                }
+                            ),
                         )
-            await DeviceManager.instance().on_async_ui_select_device(
+            await self._device_manager.on_async_ui_select_device(
                 select_device_entity_ids
             )
             host = ""
@@ -388,11 +395,11 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
                     VIVO_BRIDGE_MAC_CONFIG_KEY: mac,
                 },
             )
-        bridge_entity = DeviceManager.instance().get_bridge_entity()
+        bridge_entity = self._device_manager.get_bridge_entity()
         if bridge_entity is None:
             return self.async_abort(reason="integration_not_init")
         options_source_list = (
-            await DeviceManager.instance().get_bridge_entity().get_supported_list()
+            await self._device_manager.get_bridge_entity().get_supported_list()
         )
         """
         [{'entity_id': 'xxxxa','name': 'yyyya'},{'entity_id': 'xxxxb','name': 'yyyyb'}]
@@ -439,8 +446,10 @@ class VHomeBridgeOptionsFlowHandler(OptionsFlow):
         VLog.debug(_TAG, f"[async_step_init] user_input:{user_input}")
         VLog.debug(_TAG, f"_is_bound={await self._is_bound()}")
         VLog.debug(_TAG, f"_qrcode_base64={self._qrcode_base64}")
+        if self._device_manager is None:
+            return self.async_abort(reason="integration_not_init")
         if (
-            DeviceManager.instance().get_config_state()
+            self._device_manager.get_config_state()
             == DeviceManager.VConfig_STATE.STATE_LAN
         ):
             return await self.async_step_finish()
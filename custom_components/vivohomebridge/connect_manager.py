@@ -11,18 +11,6 @@ from .v_utils.vlog import VLog
 _TAG = "ReconnectManager"
 
 
-def singleton(cls):
-    instances = {}
-
-    def get_instance(*args, **kwargs):
-        if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
-        return instances[cls]
-
-    return get_instance
-
-
-@singleton
 class ReconnectManager:
 
     def __init__(self, vhome):
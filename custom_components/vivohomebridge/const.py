@@ -40,6 +40,34 @@ EVENT_VHOME_DEV_SET_STATUS = "vhome_dev_set_status"
 EVENT_VHOME_DEV_REMOVE_BRIDGE = "vhome_dev_remove_bridge"
 EVEVT_VHOME_BRIDGE_ONLINE = "vhome_dev_online_bridge"
 EVENT_VHOME_RECONNECT = "vhome_reconnect"
+# 事件数据中标识所属网桥配置条目的键，多个网桥共用 HA 事件总线
+VIVO_BRIDGE_ENTRY_ID_EVENT_KEY = "bridge_entry_id"
+# 状态上报事件数据中标识全量刷新的键，全量刷新不做去重
+VIVO_STATE_FLUSH_EVENT_KEY = "flush"
+
+# #### upload batching ####
+# 合并上报窗口(秒)及单次上报最大设备数
+UPLOAD_BATCH_WINDOW = 0.2
+UPLOAD_BATCH_MAX_SIZE = 50
+
+# #### state report coalescing ####
+# 单个设备状态上报的静默窗口(秒)：窗口内无新变化才上报；首次变化后最长延迟(秒)
+STATE_REPORT_QUIET_WINDOW = 0.5
+STATE_REPORT_MAX_LATENCY = 2.0
+
+# #### upload rate limit ####
+# 全局及单个设备的上报速率(次/秒)和突发容量
+UPLOAD_RATE_LIMIT = 20.0
+UPLOAD_RATE_BURST = 40
+UPLOAD_TARGET_RATE_LIMIT = 2.0
+UPLOAD_TARGET_RATE_BURST = 5
+
+# configuration.yaml 中选择 libvhome 实现: native(默认) / fake(离线压测)
+CONF_VHOME_BACKEND = "vhome_backend"
+# libvhome 运行方式: thread(默认，本进程加载) / process(子进程隔离，native 崩溃不影响 HA)
+CONF_VHOME_ISOLATION = "vhome_isolation"
+# 集成日志级别: debug / info / warn(默认) / error
+CONF_VLOG_LEVEL = "log_level"
 
 VIVO_HA_CONF_BIND_CODE = "bindCode"
 VIVO_HA_CONF_DEVICE_TYPE = "deviceType"
@@ -5,7 +5,6 @@ Licensed under the Apache License, Version 2.0 (the "License");
    http://www.apache.org/licenses/LICENSE-2.0
 """
 
-import json
 from dataclasses import dataclass
 from typing import Any, Optional, Callable, Dict
 import asyncio
@@ -18,6 +17,7 @@ from homeassistant.const import (
     __version__,
     ATTR_ENTITY_ID,
     ATTR_NAME,
+    Platform,
 )
 from homeassistant.core import (
     CALLBACK_TYPE,
@@ -37,11 +37,12 @@ from homeassistant.helpers.device_registry import (
 )
 from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
-from homeassistant.helpers.event import (
-    async_track_state_change_event,
-    async_track_device_registry_updated_event,
-)
+from homeassistant.helpers.event import async_track_device_registry_updated_event
 from .connect_manager import ReconnectManager
+from .report_cache import LastReportCache
+from .state_subscription import EntityStateSubscription
+from .upload_batcher import UploadBatcher
+from .upload_limiter import UploadRateLimiter, upload_priority
 from .const import (
     VIVO_BRIDGE_DEVICE_NAME_CONFIG_KEY,
     VIVO_BRIDGE_MAC_CONFIG_KEY,
@@ -72,8 +73,16 @@ from .const import (
     VIVO_HA_CONF_BIND_CODE,
     VIVO_HA_CONF_ADDABLE_DEVS,
     VHOME_URL,
+    VIVO_BRIDGE_ENTRY_ID_EVENT_KEY,
+    VIVO_STATE_FLUSH_EVENT_KEY,
+)
+from .py_vhome.messages import (
+    EventMessage,
+    LocalHandshake,
+    SetCommand,
+    StateMessage,
 )
-from .py_vhome.vhome import VHome
+from .py_vhome.vhome import VHOME_ISOLATION_PROCESS, VHome, create_vhome
 from .utils import Utils
 from .v_attribute import (
     VIVO_HA_COMMON_ATTR_MODEL,
@@ -83,6 +92,7 @@ from .v_attribute import (
     VIVO_HA_COMMOM_ATTR_VENDOR,
     VIVO_HA_COMMON_ATTR_SERIAL,
 )
+from .py_vhome import codec
 from .v_utils.vlog import VLog
 from .vbridge import VBridgeEntity, VIVO_HA_PLATFORM_SUPPORT_LIST
 from .vmodel import VModel
@@ -106,7 +116,8 @@ class DeviceManager:
         STATE_LAN = 1  # 局域网配置状态
         STATE_QRCODE = 2  # 扫描配置状态
 
-    _instance = None
+    _instances: Dict[str, "DeviceManager"] = {}
+    _entry_id: str
     _integration_enable: bool
     _vhome: VHome
     _delayed_job = None
@@ -115,6 +126,9 @@ class DeviceManager:
     _isbinding_pending: bool = False
     _local_server: VLocalService | None
     _reconnector: ReconnectManager
+    _upload_batcher: UploadBatcher
+    _report_cache: LastReportCache
+    _upload_limiter: UploadRateLimiter
     _bridge_entity: VBridgeEntity | None
     _registered_device_mac_list: list
     _cancel_listen_add_device: Optional[CALLBACK_TYPE]
@@ -126,30 +140,45 @@ class DeviceManager:
     _cancel_listen_bridge_remove: Optional[CALLBACK_TYPE]
     _cancel_listen_bridge_online: Optional[CALLBACK_TYPE]
     _cancel_listen_reconnect: Optional[CALLBACK_TYPE]
-    _cancel_ha_state_changed_listener_dict: Dict[str, Optional[Callable[[], None]]]
+    _state_subscription: Optional[EntityStateSubscription]
     _cancel_listen_entity_registry_updated: Optional[CALLBACK_TYPE]
     _cancel_listen_device_registry_updated_dict: Dict[str, Optional[Callable[[], None]]]
     _cancel_listen_delete_device: Optional[CALLBACK_TYPE]
     __BRIDGE_DEVICE_REMOVED_CODE = 5
     integration_version: str = "0.0.0.0"
 
-    def __new__(cls, *args, **kwargs):
-        if not cls._instance:
-            cls._instance = super(DeviceManager, cls).__new__(cls, *args, **kwargs)
-            cls._instance.__initialize()
-        return cls._instance
-
-    def __initialize(self):
-        self._vhome = VHome(
-            VHOME_URL,
-            self._on_vhome_state_changed_callback,
-            self._on_vhome_data_received_callback,
-            self._on_vhome_local_event_callback,
+    def __init__(self, entry_id: str):
+        """
+        每个配置条目(网桥)对应一个实例，拥有独立的 VHome 连接、上报队列和重连任务
+
+        libvhome 的连接状态是进程级的，已有网桥在本进程加载 libvhome 时，
+        新网桥的 VHome 固定运行在子进程中
+        """
+        self._entry_id = entry_id
+        in_process = any(
+            isinstance(manager.get_vhome(), VHome)
+            for manager in self._instances.values()
+        )
+        self._vhome = create_vhome(
+            VHOME_URL, isolation=VHOME_ISOLATION_PROCESS if in_process else None
+        )
+        self._vhome.register_handler(
+            StateMessage, self._on_vhome_state_changed_callback
+        )
+        self._vhome.register_handler(SetCommand, self._on_vhome_set_action_callback)
+        self._vhome.register_handler(
+            EventMessage, self._on_vhome_event_action_callback
+        )
+        self._vhome.register_handler(
+            LocalHandshake, self._on_vhome_local_event_callback
         )
         self.integration_version = "0.0.0.0"
         self._config_state = self.VConfig_STATE.STATE_INIT
         self._local_server = None
         self._reconnector = ReconnectManager(self._vhome)
+        self._upload_batcher = UploadBatcher(self._vhome.async_data_upload)
+        self._report_cache = LastReportCache()
+        self._upload_limiter = UploadRateLimiter(self._async_batch_upload)
         self._bridge_entity = None
         self._integration_enable = True
         self._registered_device_mac_list = []
@@ -165,13 +194,29 @@ class DeviceManager:
         self._cancel_listen_entity_registry_updated = None
         self._cancel_listen_delete_device = None
         self._cancel_listen_device_registry_updated_dict = {}
-        self._cancel_ha_state_changed_listener_dict = {}
+        self._state_subscription = None
+
+    @classmethod
+    def get(cls, entry_id: str) -> "DeviceManager":
+        """获取配置条目对应的实例，首次访问时创建"""
+        manager = cls._instances.get(entry_id)
+        if manager is None:
+            manager = cls._instances[entry_id] = cls(entry_id)
+        return manager
+
+    @classmethod
+    def find(cls, entry_id: str) -> Optional["DeviceManager"]:
+        """获取配置条目对应的实例，不存在时返回 None，不会创建"""
+        return cls._instances.get(entry_id)
 
     @classmethod
-    def instance(cls):
-        if not cls._instance:
-            cls._instance = cls()
-        return cls._instance
+    def release(cls, entry_id: str) -> None:
+        """配置条目被删除后释放实例"""
+        cls._instances.pop(entry_id, None)
+
+    @property
+    def entry_id(self) -> str:
+        return self._entry_id
 
     def set_config_state(self, state: int):
         self._config_state = state
@@ -184,7 +229,14 @@ class DeviceManager:
         self._integration_enable = True
         self._registered_device_mac_list = []
         self._bridge_entity = bridge_entity
+        if self._state_subscription is not None:
+            self._state_subscription.clear()
+        self._state_subscription = EntityStateSubscription(
+            bridge_entity.hass, bridge_entity.async_handle_entity_state_change
+        )
         self._register_events_listener(bridge_entity.hass)
+        self._vhome.attach_loop(bridge_entity.hass.loop)
+        self._vhome.start_loop_monitor(bridge_entity.hass.loop)
         VLog.info(_TAG, f"[set_bridge]：bridge has been set")
 
     def set_local_service(self, hass: HomeAssistant) -> None:
@@ -200,9 +252,10 @@ class DeviceManager:
             return
         VLog.info(_TAG, "[async_load_config] start ...")
         try:
-            self._bridge_entity.bridge_config_data = (
-                await self._bridge_entity.bridge_config_handle.async_load() or []
-            )
+            config_data = await self._bridge_entity.bridge_config_handle.async_load()
+            if config_data is None:
+                config_data = await self._bridge_entity.async_adopt_legacy_config()
+            self._bridge_entity.bridge_config_data = config_data or []
             VLog.debug(
                 _TAG, f"bridge_config_data:{self._bridge_entity.bridge_config_data}"
             )
@@ -213,24 +266,11 @@ class DeviceManager:
         for item in self._bridge_entity.bridge_config_data:
             entity_id_from_config = item.get(VIVO_DEVICE_ENTITY_ID_KEY)
             if entity_id_from_config:
-                if (
-                    self._cancel_ha_state_changed_listener_dict.get(
-                        entity_id_from_config
-                    )
-                    is None
-                ):
+                if self._state_subscription.track(entity_id_from_config):
                     VLog.info(
                         _TAG,
                         f"[async_load_config] add {entity_id_from_config} state change listener",
                     )
-                    self._cancel_ha_state_changed_listener_dict[
-                        entity_id_from_config
-                    ] = async_track_state_change_event(
-                        self._bridge_entity.hass,
-                        entity_id_from_config,
-                        self._bridge_entity.async_handle_entity_state_change,
-                        job_type=HassJobType.Coroutinefunction,
-                    )
                 else:
                     VLog.info(
                         _TAG,
@@ -241,6 +281,9 @@ class DeviceManager:
     async def async_dm_service_start(
         self, hass: HomeAssistant, isNeed_to_update_mdns: bool = False
     ):
+        # 卸载后重新加载时在这里重新打开，不在事件循环中执行 vhome_init
+        await self._vhome.async_open()
+        await self._vhome.async_wait_ready()
         await self.async_load_config()
         integration = await async_get_integration(hass, DOMAIN)
         self.integration_version = integration.manifest["version"]
@@ -310,7 +353,17 @@ class DeviceManager:
                     f"[async_sync_sub_devices] device list not update for {reason}",
                 )
 
-    async def async_data_report(self, target_id: str | None, props: dict):
+    async def async_data_report(
+        self, target_id: str | None, props: dict, full: bool = False
+    ):
+        """
+        上报设备状态，窗口期内的多个设备上报会合并为一次 native 调用
+
+        Args:
+         target_id: 子设备 dn，网桥自身为 None
+         props: 上报属性，只上报与上次提交值不同的属性
+         full: 全量上报，忽略上次上报的记录
+        """
         if self._bridge_entity is None:
             VLog.info(_TAG, f"[async_data_report] bridge has not initialized yet")
             return
@@ -321,23 +374,45 @@ class DeviceManager:
             )
             return
 
-        VLog.info(_TAG, f"[async_data_report] target_id {target_id},props:{props}")
-        bridge_name = self._bridge_entity.config_entry.data.get(
-            VIVO_BRIDGE_DEVICE_NAME_CONFIG_KEY
+        if full:
+            self._report_cache.invalidate(target_id)
+        changed = self._report_cache.changed(target_id, props)
+        if not changed:
+            VLog.debug(_TAG, "[async_data_report] target_id %s unchanged", target_id)
+            return
+        VLog.info(_TAG, "[async_data_report] target_id %s,props:%s", target_id, changed)
+        priority = upload_priority(changed, self._is_telemetry_device(target_id))
+        # 提交即记录，上传期间到达的回退值才能与在途值比较
+        self._report_cache.update(target_id, changed)
+        upload_result = await self._upload_limiter.async_submit(
+            target_id, changed, priority
         )
-        if target_id is None:
-            payload = [{"ver": 0, "props": props}]
-        else:
-            payload = [{"subId": target_id, "ver": 0, "props": props}]
-
-        upload_result = await self._vhome.async_data_upload(bridge_name, payload)
         if upload_result != 0:
+            self._report_cache.discard(target_id, changed)
             VLog.info(
                 _TAG,
-                f"[async_data_report][{upload_result}] target_id {target_id},"
-                f"props:{props} failed to upload",
+                "[async_data_report][%s] target_id %s,props:%s failed to upload",
+                upload_result,
+                target_id,
+                props,
             )
 
+    async def _async_batch_upload(self, target_id: str | None, props: dict) -> int:
+        bridge_name = self._bridge_entity.config_entry.data.get(
+            VIVO_BRIDGE_DEVICE_NAME_CONFIG_KEY
+        )
+        return await self._upload_batcher.async_upload(bridge_name, target_id, props)
+
+    def _is_telemetry_device(self, target_id: str | None) -> bool:
+        """传感器类设备的上报按测量值限流"""
+        if target_id is None:
+            return False
+        record = self._bridge_entity.bridge_config_data.find_by_dn(target_id)
+        if record is None or not record.get(VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC):
+            return False
+        platform = record[VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC].split(".")[-1]
+        return platform in (Platform.SENSOR, Platform.BINARY_SENSOR)
+
     async def async_unregister_device_report(self):
         hass = self._bridge_entity.hass
         # if hass.config_entries
@@ -354,7 +429,9 @@ class DeviceManager:
 
         hass.bus.fire(
             EVENT_VHOME_DEV_STATE_CHANGE,
-            {"data": payload, VIVO_DEVICE_NAME_CONFIG_KEY: None, "domain": DOMAIN},
+            self._bridge_entity.event_data(
+                {"data": payload, VIVO_DEVICE_NAME_CONFIG_KEY: None, "domain": DOMAIN}
+            ),
         )
 
     async def async_remove_sub_devices(self):
@@ -472,7 +549,8 @@ class DeviceManager:
     async def on_async_ui_select_device(self, entities: list):
         VLog.info(_TAG, f"[on_async_ui_select_device] user select device:{entities}")
         self._bridge_entity.hass.bus.async_fire(
-            EVENT_VHOME_DEV_ADD, {"data": entities, "domain": DOMAIN}
+            EVENT_VHOME_DEV_ADD,
+            self._bridge_entity.event_data({"data": entities, "domain": DOMAIN}),
         )
 
     def create_update_service(
@@ -567,6 +645,30 @@ class DeviceManager:
     def get_vhome(self) -> VHome:
         return self._vhome
 
+    def get_upload_stats(self) -> dict:
+        return self._upload_batcher.stats()
+
+    def get_report_cache_stats(self) -> dict:
+        return self._report_cache.stats()
+
+    def get_upload_limiter_stats(self) -> dict:
+        return self._upload_limiter.stats()
+
+    def get_state_report_stats(self) -> dict | None:
+        if self._bridge_entity is None:
+            return None
+        return self._bridge_entity.state_report_stats()
+
+    def get_state_subscription_stats(self) -> dict | None:
+        if self._state_subscription is None:
+            return None
+        return self._state_subscription.stats()
+
+    def get_sensor_report_stats(self) -> dict | None:
+        if self._bridge_entity is None:
+            return None
+        return self._bridge_entity.sensor_report_stats()
+
     def get_local_server(self) -> VLocalService:
         return self._local_server
 
@@ -618,80 +720,97 @@ class DeviceManager:
             self.get_bridge_device_name() is not None
             and len(self.get_bridge_device_name()) > 0
         ):
+            if self._bridge_entity is not None:
+                self._bridge_entity.flush_state_reports()
+            await self._upload_limiter.async_flush()
+            await self._upload_batcher.async_flush()
             VLog.info(_TAG, "[async_disconnect]...")
             await self._vhome.async_disconnect(self.get_bridge_device_name())
         self.cancel_bcode_task()
         await self._un_register_listener()
         await self._reconnector.stop_reconnect("uninstall")
+        await self._vhome.async_close()
 
     def get_device_list(self, config_entry: ConfigEntry) -> list[Any]:
         return config_entry.data.get(VIVO_HA_CONFIG_DATA_DEVICES_KEY, [])
 
     """ private method begin"""
 
+    @callback
+    def _is_own_event(self, event_data) -> bool:
+        """多个网桥共用事件总线，只处理本配置条目触发的事件"""
+        return event_data.get(VIVO_BRIDGE_ENTRY_ID_EVENT_KEY) == self._entry_id
+
     def _register_events_listener(self, hass):
         self._cancel_listen_entity_registry_updated = hass.bus.async_listen(
             EVENT_ENTITY_REGISTRY_UPDATED, self._entity_registry_updated_event
         )
         self._cancel_listen_delete_device = hass.bus.async_listen(
-            EVENT_VHOME_DEV_DEL, self._async_handle_delete_device_event
+            EVENT_VHOME_DEV_DEL,
+            self._async_handle_delete_device_event,
+            event_filter=self._is_own_event,
         )
         # control event
         self._cancel_listen_set_status = hass.bus.async_listen(
-            EVENT_VHOME_DEV_SET_STATUS, self._async_handle_set_status_event
+            EVENT_VHOME_DEV_SET_STATUS,
+            self._async_handle_set_status_event,
+            event_filter=self._is_own_event,
         )
         # unbind bridge event for local
         self._cancel_listen_bridge_remove = hass.bus.async_listen(
-            EVENT_VHOME_DEV_REMOVE_BRIDGE, self._async_handle_remove_bridge_event
+            EVENT_VHOME_DEV_REMOVE_BRIDGE,
+            self._async_handle_remove_bridge_event,
+            event_filter=self._is_own_event,
         )
         # sub device register result event
         self._cancel_listen_dev_reg = hass.bus.async_listen(
-            EVENT_VHOME_DEV_REG_RESULT, self._async_handle_dev_reg_result
+            EVENT_VHOME_DEV_REG_RESULT,
+            self._async_handle_dev_reg_result,
+            event_filter=self._is_own_event,
         )
         self._cancel_listen_dev_unreg = hass.bus.async_listen(
-            EVENT_VHOME_DEV_UNREG_RESULT, self._async_handle_dev_unreg_result
+            EVENT_VHOME_DEV_UNREG_RESULT,
+            self._async_handle_dev_unreg_result,
+            event_filter=self._is_own_event,
         )
         # add sub devices event
         self._cancel_listen_add_device = hass.bus.async_listen(
-            EVENT_VHOME_DEV_ADD, self._async_handle_add_device_event
+            EVENT_VHOME_DEV_ADD,
+            self._async_handle_add_device_event,
+            event_filter=self._is_own_event,
         )
         self._cancel_listen_state_change = hass.bus.async_listen(
-            EVENT_VHOME_DEV_STATE_CHANGE, self._async_handle_state_change_event
+            EVENT_VHOME_DEV_STATE_CHANGE,
+            self._async_handle_state_change_event,
+            event_filter=self._is_own_event,
         )
         self._cancel_listen_state_flush = hass.bus.async_listen(
-            EVENT_VHOME_DEV_STATE_FLUSH, self._async_handle_state_flush_event
+            EVENT_VHOME_DEV_STATE_FLUSH,
+            self._async_handle_state_flush_event,
+            event_filter=self._is_own_event,
         )
         # update bridge online state event
         self._cancel_listen_bridge_online = hass.bus.async_listen(
-            EVEVT_VHOME_BRIDGE_ONLINE, self._async_handle_bridge_online_event
+            EVEVT_VHOME_BRIDGE_ONLINE,
+            self._async_handle_bridge_online_event,
+            event_filter=self._is_own_event,
         )
         # reconnect event
         self._cancel_listen_reconnect = hass.bus.async_listen(
-            EVENT_VHOME_RECONNECT, self._async_handle_reconnect_event
+            EVENT_VHOME_RECONNECT,
+            self._async_handle_reconnect_event,
+            event_filter=self._is_own_event,
         )
 
     async def _un_register_listener(self):
         try:
-            if (
-                self._cancel_ha_state_changed_listener_dict is not None
-                and len(self._cancel_ha_state_changed_listener_dict) > 0
-            ):
+            if self._state_subscription is not None and len(self._state_subscription) > 0:
                 VLog.info(
                     _TAG,
-                    f"[un_register_listener] cancel state listener list size "
-                    f"{len(self._cancel_ha_state_changed_listener_dict)}",
+                    f"[un_register_listener] cancel state listener, tracked size "
+                    f"{len(self._state_subscription)}",
                 )
-                for (
-                    listener_id,
-                    listener_value,
-                ) in self._cancel_ha_state_changed_listener_dict.items():
-                    if listener_value is not None and callable(listener_value):
-                        VLog.info(
-                            _TAG,
-                            f"[un_register_listener] cancel entity listen {listener_id}",
-                        )
-                        listener_value()
-                self._cancel_ha_state_changed_listener_dict = {}
+                self._state_subscription.clear()
             if (
                 self._cancel_listen_device_registry_updated_dict is not None
                 and len(self._cancel_listen_device_registry_updated_dict) > 0
@@ -806,12 +925,11 @@ class DeviceManager:
                     f"[async_sync_sub_devices] vModel instantiation failed,ignore sync device {e}",
                 )
                 return
-        try:
-            VLog.info(
-                _TAG, f"[async_sync_sub_devices] sub_devices:{json.dumps(sub_devices,default=str)}"
-            )
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
+        VLog.info(
+            _TAG,
+            "[async_sync_sub_devices] sub_devices:%s",
+            VLog.lazy(codec.dumps_str, sub_devices),
+        )
             
         if len(sub_devices) >= 0:
             user_code = config_entry.data.get(VIVO_BRIDGE_USER_CODE_CONFIG_KEY, None)
@@ -824,33 +942,31 @@ class DeviceManager:
             )
             VLog.info(_TAG, f"[async_sync_sub_devices] register result:{result}")
 
-    def _on_vhome_state_changed_callback(self, data: dict) -> None:
+    @callback
+    def _on_vhome_state_changed_callback(self, message: StateMessage) -> None:
         """
         bridge state changed callback
         {"state": 0, "payload": {"connect_result": 0}}
         """
-        try:
-            VLog.info(
-                _TAG,
-                f"[state changed] {json.dumps(data,default=str)},the bridge enable is {self._integration_enable}",
-            )
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
-            
-        if data is None:
-            return
+        VLog.info(
+            _TAG,
+            f"[state changed] {message},the bridge enable is {self._integration_enable}",
+        )
         if self._bridge_entity is None:
             VLog.info(_TAG, f"[state changed] bridge has not initialized yet")
             return
         # state is connect established
-        if data.get("state") == 0:
-            self.get_bridge_entity().hass.bus.fire(EVEVT_VHOME_BRIDGE_ONLINE, {})
-        elif data.get("state") == 1:
-            reason_code = data.get("payload", {}).get("connect_result", -99)
+        if message.state == 0:
+            self.get_bridge_entity().hass.bus.async_fire(
+                EVEVT_VHOME_BRIDGE_ONLINE, self._bridge_entity.event_data()
+            )
+        elif message.state == 1:
+            self._report_cache.clear()
+            reason_code = message.connect_result
             # bridge has been removed by other client,and it has been removed in server
             if reason_code == self.__BRIDGE_DEVICE_REMOVED_CODE:
-                self.get_bridge_entity().hass.bus.fire(
-                    EVENT_VHOME_DEV_REMOVE_BRIDGE, {}
+                self.get_bridge_entity().hass.bus.async_fire(
+                    EVENT_VHOME_DEV_REMOVE_BRIDGE, self._bridge_entity.event_data()
                 )
             else:
                 if self._bridge_entity.get_device_enable() is False:
@@ -860,7 +976,7 @@ class DeviceManager:
                     )
                     return
                 if self._integration_enable:
-                    bridge_device = DeviceManager.instance().get_bridge_device()
+                    bridge_device = self.get_bridge_device()
                     event_data = {
                         VIVO_BRIDGE_HOST_CONFIG_KEY: bridge_device.host,
                         VIVO_BRIDGE_PORT_CONFIG_KEY: bridge_device.port,
@@ -877,8 +993,8 @@ class DeviceManager:
                         VLog.debug(_TAG, "bridge_device data is not useful")
                         return
 
-                    self.get_bridge_entity().hass.bus.fire(
-                        EVENT_VHOME_RECONNECT, event_data
+                    self.get_bridge_entity().hass.bus.async_fire(
+                        EVENT_VHOME_RECONNECT, self._bridge_entity.event_data(event_data)
                     )
                 else:
                     VLog.info(
@@ -886,102 +1002,63 @@ class DeviceManager:
                         f"[state changed] bridge is disable,not post reconnect event",
                     )
         else:
-            try:
-                VLog.info(_TAG, f"[state changed]: unknown state:{json.dumps(data,default=str)}")
-            except Exception as e:
-                VLog.warning(_TAG, f"<json error: {e}>")
-
-    def _on_vhome_data_received_callback(self, data: dict) -> None:
-        try:
-            VLog.info(_TAG, f"[data received]: {json.dumps(data,default=str)}")
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
-            
-        if data is None or not isinstance(data, dict) or "payload" not in data:
-            return
-        if self._bridge_entity is None:
-            VLog.info(_TAG, f"[data received]：bridge has not initialized yet")
-            return
-        action_type = data.get("payload").get("act")
-        payload_body_data_list = data.get("payload").get("body")
-        if (
-            payload_body_data_list is None
-            or not isinstance(payload_body_data_list, list)
-            or len(payload_body_data_list) == 0
-        ):
-            VLog.warning(_TAG, f"[data received]：action data is empty")
-            return
-        if action_type == "set":
-            self._on_vhome_set_action_callback(payload_body_data_list)
-        elif action_type == "event":
-            self._on_vhome_event_action_callback(payload_body_data_list)
-        else:
-            VLog.info(_TAG, f"[data received]：not support action:{action_type}")
+            VLog.info(_TAG, f"[state changed]: unknown state:{message}")
 
-    def _on_vhome_set_action_callback(self, payload_body_data_list: list):
-        VLog.info(_TAG, f"[set_action]:{payload_body_data_list}")
+    @callback
+    def _on_vhome_set_action_callback(self, command: SetCommand):
+        VLog.info(_TAG, f"[set_action]:{command}")
         if self._bridge_entity is None:
             VLog.info(_TAG, f"[set_action] bridge has not initialized yet")
             return
         if self._bridge_entity.get_device_enable() is False:
             VLog.info(_TAG, f"[set_action] bridge device is disable")
             return
-        for payload_body_item in payload_body_data_list:
-            props_dict = payload_body_item.get("props")
-            if props_dict is None or len(props_dict) == 0:
-                continue
-            """control sub device"""
-            sub_device_id = payload_body_item.get("subId")
-            if sub_device_id is None or len(sub_device_id) == 0:
-                device_control = {"props": props_dict}
-            else:
-                device_control = {"deviceName": sub_device_id, "props": props_dict}
+        """control sub device"""
+        if command.sub_id is None:
+            device_control = {"props": command.props}
+        else:
+            device_control = {"deviceName": command.sub_id, "props": command.props}
 
-            self.get_bridge_entity().hass.bus.fire(
-                EVENT_VHOME_DEV_SET_STATUS, device_control
-            )
+        self.get_bridge_entity().hass.bus.async_fire(
+            EVENT_VHOME_DEV_SET_STATUS, self._bridge_entity.event_data(device_control)
+        )
 
-    def _on_vhome_event_action_callback(self, payload_body_data_list: list):
+    @callback
+    def _on_vhome_event_action_callback(self, message: EventMessage):
+        VLog.info(_TAG, f"[event_action]:{message}")
         unregister_sub_device_list_of_dicts: list[dict[str, str]] = []
         if self._bridge_entity is None:
             VLog.info(_TAG, f"[event_action]：bridge has not initialized yet")
             return
 
-        for payload_body_item in payload_body_data_list:
-            props_dict = payload_body_item.get("props")
-            if props_dict is None or len(props_dict) == 0:
+        for event in message.events:
+            if event.props.get("unbind") != 1:
                 continue
-            is_unbind_event = False
-            is_unbind_data = props_dict.get("unbind")
-            if is_unbind_data is not None and is_unbind_data == 1:
-                is_unbind_event = True
-            if is_unbind_event:
-                sub_device_id = payload_body_item.get("subId")
-                if sub_device_id is not None:
-                    """unbind sub device"""
-                    unregister_sub_device_list_of_dicts.append(
-                        {VIVO_BRIDGE_DEVICE_ID_CLOUD_KEY: sub_device_id}
-                    )
-                else:
-                    """unbind bridge"""
-                    self.get_bridge_entity().hass.bus.fire(
-                        EVENT_VHOME_DEV_REMOVE_BRIDGE, {}
-                    )
-                    # 网桥被解绑，直接忽略掉子设备的解绑逻辑；
-                    VLog.warning(_TAG, "VHome Bridge is unbind by user!!!")
-                    return
+            if event.sub_id is not None:
+                """unbind sub device"""
+                unregister_sub_device_list_of_dicts.append(
+                    {VIVO_BRIDGE_DEVICE_ID_CLOUD_KEY: event.sub_id}
+                )
+            else:
+                """unbind bridge"""
+                self.get_bridge_entity().hass.bus.async_fire(
+                    EVENT_VHOME_DEV_REMOVE_BRIDGE, self._bridge_entity.event_data()
+                )
+                # 网桥被解绑，直接忽略掉子设备的解绑逻辑；
+                VLog.warning(_TAG, "VHome Bridge is unbind by user!!!")
+                return
 
-        if (
-            unregister_sub_device_list_of_dicts is not None
-            and len(unregister_sub_device_list_of_dicts) > 0
-        ):
-            self.get_bridge_entity().hass.bus.fire(
+        if len(unregister_sub_device_list_of_dicts) > 0:
+            self.get_bridge_entity().hass.bus.async_fire(
                 EVENT_VHOME_DEV_UNREG_RESULT,
-                {"success": unregister_sub_device_list_of_dicts},
+                self._bridge_entity.event_data(
+                    {"success": unregister_sub_device_list_of_dicts}
+                ),
             )
 
-    def _on_vhome_local_event_callback(self, data: dict):
-        async def _handle_bcode_async(data):
+    @callback
+    def _on_vhome_local_event_callback(self, message: LocalHandshake):
+        async def _handle_bcode_async():
             try:
                 VLog.info(_TAG, "[_handle_bcode_async] start")
                 bind_code: str = None
@@ -1027,20 +1104,17 @@ class DeviceManager:
                 VLog.warning(_TAG, f"[_handle_bcode_async] error:{e}")
                 return
 
-        if "payload" not in data:
-            return
-
-        if data.get("payload", {}).get("cmd") == 0:
+        VLog.info(_TAG, f"[local_event]:{message}")
+        if message.cmd == 0:
             VLog.info(_TAG, "握手成功，准备去获取bcode.")
             self.set_config_state(self.VConfig_STATE.STATE_LAN)
             self.cancel_bcode_task()
 
-            def schedule():
-                self._bcode_task = asyncio.create_task(_handle_bcode_async(data))
-
-            self._bridge_entity.hass.loop.call_soon_threadsafe(schedule)
+            self._bcode_task = self._bridge_entity.hass.async_create_task(
+                _handle_bcode_async()
+            )
 
-        elif data.get("payload", {}).get("cmd") == 1:
+        elif message.cmd == 1:
             # 客户端断开，要停止bcode处理逻辑
             VLog.info(_TAG, "客户端断开... ...")
             if self._isbinding_pending is False:
@@ -1217,7 +1291,9 @@ class DeviceManager:
                 self._bridge_entity.bridge_config_data
             )
             await self._async_set_config_devices(reason)
-            self.get_bridge_entity().hass.bus.fire(EVENT_VHOME_DEV_DEL, event_data)
+            self.get_bridge_entity().hass.bus.fire(
+                EVENT_VHOME_DEV_DEL, self._bridge_entity.event_data(event_data)
+            )
 
     async def _async_handle_set_status_event(self, event):
         if self._bridge_entity is None:
@@ -1260,22 +1336,16 @@ class DeviceManager:
                     config_device_item[ATTR_ENTITY_ID]
                     for config_device_item in config_devices
                 ]
-                try:
-                    VLog.debug(
-                        _TAG,
-                        "[set_status]:default_selected_entity_id_list={}".format(
-                            json.dumps(default_selected_entity_id_list,default=str)
-                        ),
-                    )
-                except Exception as e:
-                    VLog.warning(_TAG, f"<json error: {e}>")
-            try:        
                 VLog.debug(
                     _TAG,
-                    "[set_status]:user add entity_ids={}".format(json.dumps(entity_ids,default=str)),
+                    "[set_status]:default_selected_entity_id_list=%s",
+                    VLog.lazy(codec.dumps_str, default_selected_entity_id_list),
                 )
-            except Exception as e:
-                VLog.warning(_TAG, f"<json error: {e}>")
+            VLog.debug(
+                _TAG,
+                "[set_status]:user add entity_ids=%s",
+                VLog.lazy(codec.dumps_str, entity_ids),
+            )
             await self.on_async_ui_select_device(
                 entity_ids + default_selected_entity_id_list
             )
@@ -1363,20 +1433,11 @@ class DeviceManager:
                 f"[async_handle_dev_reg_result][{entity_id}]add dev_model:{dev_model}",
             )
             self._bridge_entity.bridge_config_data.append(new_obj.copy())
-            if self._cancel_ha_state_changed_listener_dict.get(entity_id) is None:
+            if self._state_subscription.track(entity_id):
                 VLog.info(
                     _TAG,
                     f"[async_handle_dev_reg_result] {entity_id} add state change listener",
                 )
-                cancel_listen_state_change = async_track_state_change_event(
-                    self._bridge_entity.hass,
-                    entity_id,
-                    self._bridge_entity.async_handle_entity_state_change,
-                    job_type=HassJobType.Coroutinefunction,
-                )
-                self._cancel_ha_state_changed_listener_dict[entity_id] = (
-                    cancel_listen_state_change
-                )
             else:
                 VLog.info(
                     _TAG,
@@ -1395,7 +1456,9 @@ class DeviceManager:
         if len(new_device_list) > 0:
             self._bridge_entity.hass.bus.async_fire(
                 EVENT_VHOME_DEV_STATE_FLUSH,
-                {"devices": new_device_list, "domain": DOMAIN},
+                self._bridge_entity.event_data(
+                    {"devices": new_device_list, "domain": DOMAIN}
+                ),
             )
             await self.async_unregister_device_report()
 
@@ -1437,6 +1500,7 @@ class DeviceManager:
             logic_mac = item.get(VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC, "")
             if logic_mac in devices_dict:
                 item[VIVO_DEVICE_ID_KEY] = devices_dict[logic_mac]
+        self._bridge_entity.bridge_config_data.reindex()
         VLog.info(
             _TAG,
             f"[async_fill_in_device_id_to_config_date] "
@@ -1520,25 +1584,16 @@ class DeviceManager:
         if self._bridge_entity is None:
             VLog.info(_TAG, f"[device_enable_event]：bridge has not initialized yet")
             return
-        entity_id = Utils.get_entity_id_by_logic_mac(
-            logic_mac, self._bridge_entity.bridge_config_data
-        )
+        record = self._bridge_entity.bridge_config_data.find_by_logic_mac(logic_mac)
+        entity_id = record.get(VIVO_DEVICE_ENTITY_ID_KEY) if record else None
         if not entity_id:
             VLog.info(_TAG, f"[device_enable_event] entity_id:{logic_mac} not exist")
             return
         if enable:
-            if self._cancel_ha_state_changed_listener_dict.get(entity_id) is None:
+            if self._state_subscription.set_enabled(entity_id, True):
                 VLog.info(
                     _TAG,
-                    f"[device_enable_event] add {logic_mac},{entity_id} state change listener",
-                )
-                self._cancel_ha_state_changed_listener_dict[entity_id] = (
-                    async_track_state_change_event(
-                        self._bridge_entity.hass,
-                        entity_id,
-                        self._bridge_entity.async_handle_entity_state_change,
-                        job_type=HassJobType.Coroutinefunction,
-                    )
+                    f"[device_enable_event] enable {logic_mac},{entity_id} state change listener",
                 )
             else:
                 VLog.info(
@@ -1547,32 +1602,22 @@ class DeviceManager:
                 )
             device = {
                 VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC: logic_mac,
-                VIVO_DEVICE_NAME_CONFIG_KEY: Utils.get_dn(
-                    entity_id, self._bridge_entity.bridge_config_data
-                ),
+                VIVO_DEVICE_NAME_CONFIG_KEY: record[VIVO_DEVICE_NAME_CONFIG_KEY],
                 VIVO_DEVICE_ENTITY_ID_KEY: entity_id,
-                VIVO_DEVICE_NAME_FRIENDLY_KEY: Utils.get_fn(
-                    entity_id, self._bridge_entity.bridge_config_data
-                ),
-                VIVO_HA_KEY_WORLD_DEV_ENTRY_ID: Utils.get_entry_id_from_entity_id(
-                    entity_id, self._bridge_entity.bridge_config_data
+                VIVO_DEVICE_NAME_FRIENDLY_KEY: record[VIVO_DEVICE_NAME_FRIENDLY_KEY],
+                VIVO_HA_KEY_WORLD_DEV_ENTRY_ID: record.get(
+                    VIVO_HA_KEY_WORLD_DEV_ENTRY_ID, None
                 ),
             }
             self.get_bridge_entity().flush_device_status("device enable", device)
         else:
-            cancel_listener = self._cancel_ha_state_changed_listener_dict.get(
-                entity_id, None
-            )
-            if cancel_listener is not None:
-                if callable(cancel_listener):
-                    cancel_listener()
-                    VLog.info(
-                        _TAG,
-                        f"[device_enable_event] delete listener {logic_mac}, {entity_id}",
-                    )
-                del self._cancel_ha_state_changed_listener_dict[entity_id]
+            if self._state_subscription.set_enabled(entity_id, False):
+                VLog.info(
+                    _TAG,
+                    f"[device_enable_event] disable listener {logic_mac}, {entity_id}",
+                )
             await self.get_bridge_entity().async_notify_device_offline(
-                Utils.get_dn(entity_id, self._bridge_entity.bridge_config_data)
+                record[VIVO_DEVICE_NAME_CONFIG_KEY]
             )
 
     def _is_VHome_bridge_device(self, device: DeviceEntry) -> bool:
@@ -1622,8 +1667,8 @@ class DeviceManager:
                 )
                 if device_availability:
                     self._bridge_entity.set_device_enable(True)
-                    bridge_device = DeviceManager.instance().get_bridge_device()
-                    await DeviceManager.instance().async_connect(
+                    bridge_device = self.get_bridge_device()
+                    await self.async_connect(
                         bridge_device.host,
                         int(bridge_device.port),
                         bridge_device.name,
@@ -1668,29 +1713,20 @@ class DeviceManager:
         remove the state change listener for the unregistered devices
         update _registered_device_mac_list
         """
-        removed_entity_ids = [
-            key
-            for key in self._cancel_ha_state_changed_listener_dict.keys()
-            if key not in existing_entity_ids
-        ]
+        removed_entity_ids = (
+            [key for key in self._state_subscription if key not in existing_entity_ids]
+            if self._state_subscription is not None
+            else []
+        )
         VLog.info(
             _TAG,
             f"[update_cache_for_unregister] \n\t add {existing_entity_ids} "
             f"\n\t remove: {removed_entity_ids} "
             f"\n\t before mac list: {self._registered_device_mac_list}",
         )
-        for listener_id, listener_value in list(
-            self._cancel_ha_state_changed_listener_dict.items()
-        ):
-            if listener_id in removed_entity_ids:
-                if listener_value is not None:
-                    if callable(listener_value):
-                        VLog.info(
-                            _TAG,
-                            f"[update_cache_for_unregister] cancel listen {listener_id}",
-                        )
-                        listener_value()
-                    del self._cancel_ha_state_changed_listener_dict[listener_id]
+        for listener_id in removed_entity_ids:
+            VLog.info(_TAG, f"[update_cache_for_unregister] cancel listen {listener_id}")
+            self._state_subscription.untrack(listener_id)
         if not existing_mac_ids:
             self._registered_device_mac_list = []
         _filtered_mac_list = [
@@ -1740,7 +1776,9 @@ class DeviceManager:
                 success_item[VIVO_DEVICE_ENTITY_ID_KEY] = logic_mac_entity_id_map[
                     current_logic_mac
                 ]
-        self._bridge_entity.hass.bus.async_fire(EVENT_VHOME_DEV_REG_RESULT, reg_result)
+        self._bridge_entity.hass.bus.async_fire(
+            EVENT_VHOME_DEV_REG_RESULT, self._bridge_entity.event_data(reg_result)
+        )
 
     async def _async_register_sub_devices(
         self, user_code: str, device_name: str, mac: str, sub_devices: list[dict]
@@ -1750,8 +1788,10 @@ class DeviceManager:
         )
         VLog.info(
             _TAG,
-            f"[_async_register_sub_devices] sub devices \n\t size {len(sub_devices)} "
-            f"\n\t{sub_devices} \n\tresult:{result}",
+            "[_async_register_sub_devices] sub devices \n\t size %s \n\t%s \n\tresult:%s",
+            len(sub_devices),
+            sub_devices,
+            result,
         )
         if result.get("success", None) is not None:
             self._registered_device_mac_list = [
@@ -1762,7 +1802,7 @@ class DeviceManager:
 
     async def _async_handle_state_change_event(self, event) -> None:
         VLog.info(_TAG, "_async_handle_state_change_event")
-        bridge_device = DeviceManager.instance().get_bridge_device()
+        bridge_device = self.get_bridge_device()
         if (
             bridge_device.host is None
             or bridge_device.port is None
@@ -1775,7 +1815,9 @@ class DeviceManager:
             )
             return
         await self.async_data_report(
-            event.data.get(VIVO_DEVICE_NAME_CONFIG_KEY), event.data.get("data")
+            event.data.get(VIVO_DEVICE_NAME_CONFIG_KEY),
+            event.data.get("data"),
+            full=event.data.get(VIVO_STATE_FLUSH_EVENT_KEY, False),
         )
 
     async def _async_handle_state_flush_event(self, event) -> None:
@@ -1804,6 +1846,8 @@ class DeviceManager:
             return
         VLog.info(_TAG, f"[_async_handle_bridge_online_event]")
         await self._reconnector.stop_reconnect("online_state")
+        # 重连后云端状态未知，全部重新上报
+        self._report_cache.clear()
         await self.async_data_report(
             None,
             {
@@ -1863,13 +1907,15 @@ class DeviceManager:
             VLog.info(_TAG, f"[set_config_devices] bridge has not initialized yet")
             return
         entry_data = self._bridge_entity.config_entry.data.copy()
-        entry_data[VIVO_HA_CONFIG_DATA_DEVICES_KEY] = (
+        entry_data[VIVO_HA_CONFIG_DATA_DEVICES_KEY] = list(
             self._bridge_entity.bridge_config_data
         )
-        try:
-            VLog.info(_TAG, f"[set_config_devices][{reason}] " + json.dumps(entry_data,default=str))
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
+        VLog.info(
+            _TAG,
+            "[set_config_devices][%s] %s",
+            reason,
+            VLog.lazy(codec.dumps_str, entry_data),
+        )
         devices = entry_data[VIVO_HA_CONFIG_DATA_DEVICES_KEY]
         if devices is not None:
             dev_reg = dr.async_get(self._bridge_entity.hass)
@@ -0,0 +1,57 @@
+"""
+Copyright 2024 vivo Mobile Communication Co., Ltd.
+Licensed under the Apache License, Version 2.0 (the "License");
+
+   http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    VIVO_BRIDGE_HOST_CONFIG_KEY,
+    VIVO_BRIDGE_MAC_CONFIG_KEY,
+    VIVO_BRIDGE_TMP_BIND_CODE_KEY,
+    VIVO_BRIDGE_USER_CODE_CONFIG_KEY,
+    VIVO_HA_CONFIG_DATA_DEVICES_KEY,
+)
+from .device_manager import DeviceManager
+
+TO_REDACT = {
+    VIVO_BRIDGE_USER_CODE_CONFIG_KEY,
+    VIVO_BRIDGE_TMP_BIND_CODE_KEY,
+    VIVO_BRIDGE_MAC_CONFIG_KEY,
+    VIVO_BRIDGE_HOST_CONFIG_KEY,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    device_manager = DeviceManager.find(entry.entry_id)
+    entry_data = {
+        key: value
+        for key, value in entry.data.items()
+        if key != VIVO_HA_CONFIG_DATA_DEVICES_KEY
+    }
+    diagnostics = {
+        "entry": async_redact_data(entry_data, TO_REDACT),
+        "bridged_devices": len(entry.data.get(VIVO_HA_CONFIG_DATA_DEVICES_KEY, [])),
+    }
+    if device_manager is None:
+        # 条目未加载，没有运行时数据
+        return diagnostics
+    diagnostics.update({
+        "vhome": device_manager.get_vhome().get_diagnostics(),
+        "upload": device_manager.get_upload_stats(),
+        "state_subscription": device_manager.get_state_subscription_stats(),
+        "state_reports": device_manager.get_state_report_stats(),
+        "sensor_reports": device_manager.get_sensor_report_stats(),
+        "report_cache": device_manager.get_report_cache_stats(),
+        "upload_limiter": device_manager.get_upload_limiter_stats(),
+    })
+    return diagnostics
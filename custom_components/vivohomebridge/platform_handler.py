@@ -0,0 +1,440 @@
+"""
+Copyright 2024 vivo Mobile Communication Co., Ltd.
+Licensed under the Apache License, Version 2.0 (the "License");
+
+   http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Mapping, MutableMapping
+
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
+from homeassistant.components.cover import CoverDeviceClass
+from homeassistant.components.media_player import MediaPlayerDeviceClass
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.components.switch import SwitchDeviceClass
+from homeassistant.const import (
+    ATTR_DEVICE_CLASS,
+    CONF_UNIT_OF_MEASUREMENT,
+    Platform,
+)
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers.device_registry import DeviceEntry
+
+from .const import (
+    VIVO_HA_PLATFORM_PK,
+    VIVO_HA_PLATFORM_SOCKET_PK,
+    VIVO_HA_PLATFORM_SWITCH_PK,
+)
+from .py_vhome import codec
+from .v_attribute import HA_ATTR_NAME_POWER
+from .v_climate_model import VClimateModel
+from .v_cover_model import VCoverModel
+from .v_fan_model import VFanModel
+from .v_light_model import VLightModel
+from .v_sensor_model import VSensorModel, VIVO_HA_SENSORS_PK
+from .v_switch_model import VSwitchModel
+from .v_tv_model import VTVModelUtils
+from .v_utils.vattributes_utils import VAttributesTable
+from .v_utils.vlog import VLog
+
+if TYPE_CHECKING:
+    from .vbridge import VBridgeEntity
+
+_TAG = "platform"
+
+PLATFORM_HANDLERS: dict[str, type["PlatformHandler"]] = {}
+
+
+def register_platform_handler(*domains: str):
+    """注册平台处理器，一个处理器可以对应多个 domain"""
+
+    def wrapper(cls: type["PlatformHandler"]) -> type["PlatformHandler"]:
+        for domain in domains:
+            PLATFORM_HANDLERS[domain] = cls
+        return cls
+
+    return wrapper
+
+
+def platform_handler_class_get(domain: str) -> type["PlatformHandler"]:
+    """未注册的 domain 返回 PlatformHandler，即不支持该平台"""
+    return PLATFORM_HANDLERS.get(domain, PlatformHandler)
+
+
+class PlatformHandler:
+    """
+    平台处理器基类，按 domain 集中各平台的物模型生成、属性映射表选择和上报前的属性校准
+
+    类方法不依赖网桥，供 VModel 和设备列表使用；实例方法使用网桥持有的各平台模型。
+    基类本身表示不支持的平台。
+    """
+
+    def __init__(self, bridge: VBridgeEntity, domain: str) -> None:
+        self.bridge = bridge
+        self.hass: HomeAssistant = bridge.hass
+        self.domain = domain
+
+    # ---- 与网桥无关 ----
+
+    @classmethod
+    def model_get(
+        cls,
+        hass: HomeAssistant,
+        entity_id: str,
+        device: DeviceEntry | None,
+        entity_attributes: Mapping[str, Any],
+    ) -> list | None:
+        """
+        生成实体的物模型属性列表
+
+        Returns:
+            None 表示不支持该平台
+        """
+        return None
+
+    @classmethod
+    def entity_supported(cls, device_class) -> bool:
+        """该 device_class 的实体能否接入"""
+        return True
+
+    @classmethod
+    def pky_get(cls, domain: str, device_class) -> str | None:
+        return VIVO_HA_PLATFORM_PK.get(domain)
+
+    # ---- 依赖网桥的模型 ----
+
+    def attributes_table_get(self, entity_id: str) -> VAttributesTable | None:
+        """v2h 控制时使用的属性映射表，None 表示不支持"""
+        VLog.info(_TAG, f"not support {self.domain}")
+        return None
+
+    def state_change_prepare(
+        self,
+        entity_id: str,
+        old_state: State,
+        new_state: State,
+        changed_attrs: dict,
+        current_attrs: dict,
+    ) -> VAttributesTable | None:
+        """
+        状态变化上报前校准 current_attrs 并选择属性映射表
+
+        Returns:
+            None 表示不上报
+        """
+        VLog.warning(_TAG, f"{entity_id} Unsupported platform:{self.domain}")
+        return None
+
+    def state_report_filter(self, dn: str, new_state: State, v_attrs: dict) -> dict | None:
+        """
+        转换后的 vivo 属性上报前的过滤
+
+        Returns:
+            None 表示暂不上报
+        """
+        return v_attrs
+
+    def flush_prepare(
+        self, entity_id: str, state: State, attributes: MutableMapping[str, Any]
+    ) -> VAttributesTable | None:
+        """
+        全量刷新前补充 attributes 并选择属性映射表
+
+        attributes 是叠在 HA 属性上的覆盖层，只能写入或覆盖键，不能删除 HA 原有的键
+
+        Returns:
+            None 表示不刷新
+        """
+        VLog.info(_TAG, f"[flush] not support :{self.domain}")
+        return None
+
+
+class _ModelPlatformHandler(PlatformHandler):
+    """属性映射表固定为网桥上某个模型的 attributes_table"""
+
+    model_attr: str = ""
+
+    @property
+    def model(self):
+        return getattr(self.bridge, self.model_attr)
+
+    def attributes_table_get(self, entity_id: str) -> VAttributesTable | None:
+        return self.model.attributes_table
+
+    def state_change_prepare(
+        self, entity_id, old_state, new_state, changed_attrs, current_attrs
+    ) -> VAttributesTable | None:
+        return self.model.attributes_table
+
+    def flush_prepare(self, entity_id, state, attributes) -> VAttributesTable | None:
+        return self.model.attributes_table
+
+
+@register_platform_handler(Platform.LIGHT)
+class LightPlatformHandler(_ModelPlatformHandler):
+    model_attr = "light_model"
+
+    @classmethod
+    def model_get(cls, hass, entity_id, device, entity_attributes) -> list | None:
+        return VLightModel.model_get(hass, entity_id, entity_attributes)
+
+
+@register_platform_handler(Platform.SWITCH)
+class SwitchPlatformHandler(_ModelPlatformHandler):
+    model_attr = "switch_model"
+
+    @classmethod
+    def model_get(cls, hass, entity_id, device, entity_attributes) -> list | None:
+        entity_model = VSwitchModel.model_get(hass, entity_id, entity_attributes)
+        VLog.info(
+            _TAG,
+            f"get switch model class:{entity_attributes.get(ATTR_DEVICE_CLASS)}",
+        )
+        return entity_model
+
+    @classmethod
+    def pky_get(cls, domain: str, device_class) -> str | None:
+        if device_class == SwitchDeviceClass.OUTLET:
+            return VIVO_HA_PLATFORM_SOCKET_PK
+        return VIVO_HA_PLATFORM_SWITCH_PK
+
+    def state_change_prepare(
+        self, entity_id, old_state, new_state, changed_attrs, current_attrs
+    ) -> VAttributesTable | None:
+        VLog.info(_TAG, "Switch class:%s", new_state.attributes.get(ATTR_DEVICE_CLASS))
+        if changed_attrs.get("switch.on") is None and new_state.state == old_state.state:
+            VLog.info(
+                _TAG,
+                "[entity_state_change] %s Unsupported the attrs:%s",
+                entity_id,
+                VLog.lazy(codec.dumps_str, changed_attrs),
+            )
+            return None
+        if new_state.state != old_state.state:
+            current_attrs[HA_ATTR_NAME_POWER] = new_state.state
+        return self.model.attributes_table
+
+
+@register_platform_handler(Platform.CLIMATE)
+class ClimatePlatformHandler(_ModelPlatformHandler):
+    model_attr = "climate_model"
+
+    @classmethod
+    def model_get(cls, hass, entity_id, device, entity_attributes) -> list | None:
+        return VClimateModel.model_get(hass, entity_id, entity_attributes)
+
+    def state_change_prepare(
+        self, entity_id, old_state, new_state, changed_attrs, current_attrs
+    ) -> VAttributesTable | None:
+        self.model.calibrate_current_attrs(
+            current_attrs, new_state.state, old_state.state
+        )
+        return self.model.attributes_table
+
+    def flush_prepare(self, entity_id, state, attributes) -> VAttributesTable | None:
+        attributes["state"] = state.state
+        self.model.calibrate_swing_mode_attr_when_flush(attributes)
+        return self.model.attributes_table
+
+
+@register_platform_handler(Platform.FAN)
+class FanPlatformHandler(_ModelPlatformHandler):
+    model_attr = "fan_model"
+
+    @classmethod
+    def model_get(cls, hass, entity_id, device, entity_attributes) -> list | None:
+        return VFanModel.model_get(hass, entity_id, entity_attributes)
+
+    def flush_prepare(self, entity_id, state, attributes) -> VAttributesTable | None:
+        attributes["state"] = state.state
+        return self.model.attributes_table
+
+
+@register_platform_handler(Platform.COVER)
+class CoverPlatformHandler(_ModelPlatformHandler):
+    model_attr = "cover_model"
+
+    @classmethod
+    def model_get(cls, hass, entity_id, device, entity_attributes) -> list | None:
+        return VCoverModel.model_get(hass, entity_id, entity_attributes)
+
+    @classmethod
+    def entity_supported(cls, device_class) -> bool:
+        return device_class == CoverDeviceClass.CURTAIN
+
+
+@register_platform_handler(Platform.WATER_HEATER)
+class WaterHeaterPlatformHandler(_ModelPlatformHandler):
+    model_attr = "water_heater_model"
+
+    def flush_prepare(self, entity_id, state, attributes) -> VAttributesTable | None:
+        attributes["state"] = state.state
+        return self.model.attributes_table
+
+
+class _TVPlatformHandler(PlatformHandler):
+    """电视的属性映射表由设备品牌决定"""
+
+    def _attributes_table_get(self, entity_id: str) -> VAttributesTable | None:
+        """按品牌选择属性映射表，None 表示无法识别"""
+        return None
+
+    def _attributes_table_and_state_get(
+        self, entity_id: str, old_state: State, new_state: State
+    ) -> tuple[dict | None, VAttributesTable | None]:
+        """
+        状态变化时按品牌校准的属性与属性映射表
+
+        Returns:
+            (current_attrs, attributes_table)，属性映射表为 None 表示不上报
+        """
+        return None, None
+
+    def attributes_table_get(self, entity_id: str) -> VAttributesTable | None:
+        attributes_table = self._attributes_table_get(entity_id)
+        if not attributes_table:
+            VLog.info(_TAG, f"no attribute {self.domain} for {entity_id}")
+            return None
+        return attributes_table
+
+    def state_change_prepare(
+        self, entity_id, old_state, new_state, changed_attrs, current_attrs
+    ) -> VAttributesTable | None:
+        _current_attrs, attributes_table = self._attributes_table_and_state_get(
+            entity_id, old_state, new_state
+        )
+        if not attributes_table:
+            VLog.info(
+                _TAG,
+                f"[entity_state_change] No attributes list for {entity_id} of {self.domain}",
+            )
+            return None
+        if _current_attrs:
+            current_attrs.update(_current_attrs)
+        return attributes_table
+
+    def flush_prepare(self, entity_id, state, attributes) -> VAttributesTable | None:
+        attributes["state"] = state.state
+        attributes[HA_ATTR_NAME_POWER] = state.state
+        # 无法识别品牌时仍刷新通用属性
+        return self._attributes_table_get(entity_id) or VAttributesTable(())
+
+
+@register_platform_handler(Platform.MEDIA_PLAYER)
+class MediaPlayerPlatformHandler(_TVPlatformHandler):
+    @classmethod
+    def model_get(cls, hass, entity_id, device, entity_attributes) -> list | None:
+        return VTVModelUtils.media_play_model_get(device, entity_attributes)
+
+    @classmethod
+    def entity_supported(cls, device_class) -> bool:
+        return device_class == MediaPlayerDeviceClass.TV
+
+    def _attributes_table_get(self, entity_id: str) -> VAttributesTable | None:
+        return VTVModelUtils.get_media_player_attributes_list(
+            entity_id, self.hass, self.bridge.tv_model
+        )
+
+    def _attributes_table_and_state_get(self, entity_id, old_state, new_state):
+        return VTVModelUtils.get_media_player_attribute_list_and_state(
+            entity_id, old_state.state, new_state.state, self.hass, self.bridge.tv_model
+        )
+
+
+@register_platform_handler(Platform.REMOTE)
+class RemotePlatformHandler(_TVPlatformHandler):
+    @classmethod
+    def model_get(cls, hass, entity_id, device, entity_attributes) -> list | None:
+        return VTVModelUtils.remote_model_get(device, entity_attributes)
+
+    def _attributes_table_get(self, entity_id: str) -> VAttributesTable | None:
+        return VTVModelUtils.get_remote_device_attribute_list(
+            entity_id, self.hass, self.bridge.tv_model
+        )
+
+    def _attributes_table_and_state_get(self, entity_id, old_state, new_state):
+        return VTVModelUtils.get_remote_attribute_list_and_state(
+            entity_id, old_state.state, new_state.state, self.hass, self.bridge.tv_model
+        )
+
+
+class _SensorPlatformHandler(PlatformHandler):
+    """传感器按 device_class 选择属性，只上报 state"""
+
+    SUPPORTED_CLASSES: frozenset = frozenset()
+
+    @classmethod
+    def model_get(cls, hass, entity_id, device, entity_attributes) -> list | None:
+        return VSensorModel.model_get(hass, entity_id, entity_attributes)
+
+    @classmethod
+    def entity_supported(cls, device_class) -> bool:
+        return device_class in cls.SUPPORTED_CLASSES
+
+    @classmethod
+    def pky_get(cls, domain: str, device_class) -> str | None:
+        return VIVO_HA_SENSORS_PK.get(device_class)
+
+    def state_change_prepare(
+        self, entity_id, old_state, new_state, changed_attrs, current_attrs
+    ) -> VAttributesTable | None:
+        device_class = new_state.attributes.get(ATTR_DEVICE_CLASS)
+        attributes_table = self.bridge.sensor_model.attributes_table_get(device_class)
+        if attributes_table is None:
+            VLog.warning(_TAG, f"{entity_id} Unsupported sensor class:{device_class}")
+            return None
+        if device_class == SensorDeviceClass.TEMPERATURE:
+            current_attrs["state"] = VSensorModel.sensor_h2v_val(
+                device_class,
+                new_state.attributes.get(CONF_UNIT_OF_MEASUREMENT),
+                new_state.state,
+            )
+        return attributes_table
+
+    def state_report_filter(self, dn, new_state, v_attrs) -> dict | None:
+        return self.bridge.sensor_report_filter.filter(
+            dn, new_state.attributes.get(ATTR_DEVICE_CLASS), v_attrs
+        )
+
+    def flush_prepare(self, entity_id, state, attributes) -> VAttributesTable | None:
+        device_class = attributes.get(ATTR_DEVICE_CLASS)
+        attributes_table = self.bridge.sensor_model.attributes_table_get(device_class)
+        if attributes_table is None:
+            VLog.info(_TAG, f"[flush] not support sensor class:{device_class}")
+            return None
+        if device_class == SensorDeviceClass.TEMPERATURE:
+            attributes["state"] = VSensorModel.sensor_h2v_val(
+                device_class, attributes.get(CONF_UNIT_OF_MEASUREMENT), state.state
+            )
+        else:
+            attributes["state"] = state.state
+        return attributes_table
+
+
+@register_platform_handler(Platform.SENSOR)
+class SensorPlatformHandler(_SensorPlatformHandler):
+    # 只支持温度、湿度、光照和通用枚举
+    SUPPORTED_CLASSES = frozenset(
+        {
+            SensorDeviceClass.TEMPERATURE,
+            SensorDeviceClass.HUMIDITY,
+            SensorDeviceClass.ILLUMINANCE,
+            SensorDeviceClass.ENUM,
+        }
+    )
+
+
+@register_platform_handler(Platform.BINARY_SENSOR)
+class BinarySensorPlatformHandler(_SensorPlatformHandler):
+    SUPPORTED_CLASSES = frozenset(
+        {
+            BinarySensorDeviceClass.OCCUPANCY,
+            BinarySensorDeviceClass.DOOR,
+            BinarySensorDeviceClass.GARAGE_DOOR,
+            BinarySensorDeviceClass.OPENING,
+            BinarySensorDeviceClass.MOTION,
+            BinarySensorDeviceClass.MOVING,
+        }
+    )
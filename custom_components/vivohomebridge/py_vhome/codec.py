@@ -0,0 +1,83 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+import json
+import logging
+from typing import Any, Callable, Optional, Union
+
+_LOGGER = logging.getLogger("py_vhome")
+
+JsonInput = Union[bytes, bytearray, memoryview, str]
+
+
+def _stdlib_dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    return json.dumps(obj, default=default).encode("utf-8")
+
+
+def _stdlib_loads(data: JsonInput) -> Any:
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _orjson_codec():
+    import orjson
+
+    def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS)
+
+    return dumps, orjson.loads
+
+
+def _msgspec_codec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        if default is None:
+            return encoder.encode(obj)
+        return msgspec.json.encode(obj, enc_hook=default)
+
+    return dumps, decoder.decode
+
+
+def available_backends() -> dict[str, tuple[Callable, Callable]]:
+    """
+    返回当前环境可用的 JSON 编解码实现，按优先级排序
+
+    Returns:
+     dict: {名称: (dumps, loads)}，dumps 返回 bytes
+    """
+    backends = {}
+    for name, factory in (("orjson", _orjson_codec), ("msgspec", _msgspec_codec)):
+        try:
+            backends[name] = factory()
+        except ImportError:
+            continue
+    backends["json"] = (_stdlib_dumps, _stdlib_loads)
+    return backends
+
+
+BACKEND, (_dumps, _loads) = next(iter(available_backends().items()))
+_LOGGER.debug(f"json codec backend: {BACKEND}")
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """序列化为 UTF-8 编码的 JSON bytes，可直接传给 native 接口"""
+    return _dumps(obj, default)
+
+
+def loads(data: JsonInput) -> Any:
+    """从 bytes/str/memoryview 解析 JSON"""
+    return _loads(data)
+
+
+def dumps_str(obj: Any) -> str:
+    """序列化为字符串，不可序列化的对象使用 str()，用于日志输出"""
+    return _dumps(obj, str).decode("utf-8")
@@ -0,0 +1,109 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+JSON 编解码微基准，使用 native 边界上的真实数据结构:
+    python -m py_vhome.codec_bench [--number N]
+"""
+
+import argparse
+import json
+import timeit
+
+from .codec import available_backends
+
+_MODEL_PROPS = [
+    {"name": "vivo_std_softver", "value_type": "string", "format": "string", "unit": "",
+     "description": "固件版本", "access": ["read", "notify"]},
+    {"name": "vivo_std_hardver", "value_type": "string", "format": "string", "unit": "",
+     "description": "硬件版本", "access": ["read", "notify"]},
+    {"name": "vivo_std_vendor", "value_type": "string", "format": "string", "unit": "",
+     "description": "制造商", "access": ["read", "notify"]},
+    {"name": "vivo_std_power", "description": "电源", "value_type": "string", "format": "string",
+     "value_list": [{"value": "on", "description": "开"}, {"value": "off", "description": "关"}],
+     "access": ["write", "read", "notify"]},
+    {"name": "vivo_std_speed_gear", "description": "风速档位", "value_type": "number",
+     "format": "int", "value_range": [1, 100, 1], "access": ["write", "read", "notify"],
+     "unit": "%"},
+    {"name": "vivo_std_mode", "description": "工作模式", "value_type": "string",
+     "format": "string", "value_list": [{"value": "auto", "description": "自动"},
+                                        {"value": "sleep", "description": "睡眠"}],
+     "access": ["write", "read", "notify"], "unit": ""},
+]
+
+
+def _sub_devices(count: int) -> list[dict]:
+    return [
+        {
+            "pky": "vhusg",
+            "manufacturer_name": "万物互联有限公司",
+            "logicMac": f"fan.living_room_{i}",
+            "phyMac": f"{i:032x}",
+            "props": _MODEL_PROPS,
+        }
+        for i in range(count)
+    ]
+
+
+def _upload_batch(count: int) -> list[dict]:
+    return [
+        {
+            "subId": f"vhusg{i:012d}",
+            "ver": 0,
+            "props": {"online": "true", "vivo_std_power": "on",
+                      "vivo_std_speed_gear": i % 100, "vivo_std_mode": "auto"},
+        }
+        for i in range(count)
+    ]
+
+
+def _register_result(count: int) -> bytes:
+    result = {
+        "code": 10000,
+        "data": {"succ": [{"logicMac": f"fan.living_room_{i}", "pky": "vhusg",
+                           "dn": f"{i:012d}"} for i in range(count)]},
+    }
+    return json.dumps(result).encode("utf-8")
+
+
+def _set_command() -> bytes:
+    msg = {
+        "type": 1,
+        "payload": {"act": "set", "body": [
+            {"subId": "vhusg000000000001", "props": {"vivo_std_power": "off"}}
+        ]},
+    }
+    return json.dumps(msg).encode("utf-8")
+
+
+def run(number: int) -> None:
+    encode_cases = {
+        "upload x1": _upload_batch(1),
+        "upload x50": _upload_batch(50),
+        "register x300": _sub_devices(300),
+    }
+    decode_cases = {
+        "set command": _set_command(),
+        "register result x300": _register_result(300),
+    }
+    backends = available_backends()
+    print(f"backends: {', '.join(backends)}  number={number}")
+    for title, cases, op in (("encode", encode_cases, 0), ("decode", decode_cases, 1)):
+        print(f"\n{title:<24}" + "".join(f"{name:>12}" for name in backends) + "     speedup")
+        for case, payload in cases.items():
+            timings = []
+            for funcs in backends.values():
+                func = funcs[op]
+                seconds = timeit.timeit(lambda: func(payload), number=number)
+                timings.append(seconds * 1e6 / number)
+            speedup = timings[-1] / min(timings)
+            print(f"{case:<24}" + "".join(f"{t:>10.1f}us" for t in timings)
+                  + f"{speedup:>11.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="py_vhome JSON codec benchmark")
+    parser.add_argument("--number", type=int, default=200)
+    run(parser.parse_args().number)
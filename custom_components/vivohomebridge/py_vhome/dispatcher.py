@@ -0,0 +1,166 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+_LOGGER = logging.getLogger("py_vhome")
+
+DISPATCH_MAX_BATCH = 256
+DISPATCH_MAX_BACKLOG = 4096
+# 积压告警的最小间隔(秒)
+DISPATCH_WARN_INTERVAL = 10.0
+
+
+class LoopDispatcher:
+    """
+    将监听线程解码后的消息批量转交到事件循环中处理
+
+    监听线程只负责入队，同一时刻最多只有一次 call_soon_threadsafe 在途；
+    事件循环被唤醒后一次取出多条消息处理，突发的多条消息只需唤醒一次。
+    未绑定事件循环前收到的消息会被缓存，绑定后统一投递。
+
+    Args:
+     handler (Callable[[Any], None]): 在事件循环线程中处理单条消息
+     max_batch (int): 每次唤醒最多处理的消息数，剩余消息在下一轮处理
+     max_backlog (int): 最大缓存消息数，超出后丢弃最旧的非关键消息；
+        没有可丢弃的消息时关键消息仍然入队，只记录溢出
+     is_critical (Callable[[Any], bool]): 判断消息是否不可丢弃，默认全部不可丢弃
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], None],
+        max_batch: int = DISPATCH_MAX_BATCH,
+        max_backlog: int = DISPATCH_MAX_BACKLOG,
+        is_critical: Callable[[Any], bool] = lambda message: True,
+    ):
+        self._handler = handler
+        self._is_critical = is_critical
+        self._max_batch = max_batch
+        self._max_backlog = max_backlog
+        # 元素为 (是否关键, 消息)
+        self._queue: deque = deque()
+        # 队列中非关键消息的数量，为 0 时积压满也无需查找可丢弃的消息
+        self._droppable = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._scheduled = False
+        self._submitted = 0
+        self._dispatched = 0
+        self._wakeups = 0
+        self._dropped = 0
+        self._overflow = 0
+        self._handler_errors = 0
+        self._last_warn = 0.0
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            self._loop = loop
+            self._scheduled = False
+        self._wakeup()
+
+    def detach_loop(self) -> None:
+        with self._lock:
+            self._loop = None
+            self._scheduled = False
+
+    def submit(self, message: Any) -> None:
+        """在监听线程中调用，消息入队并在需要时唤醒事件循环"""
+        warn = None
+        critical = self._is_critical(message)
+        with self._lock:
+            self._submitted += 1
+            full = len(self._queue) >= self._max_backlog
+            if not full or self._shed(critical):
+                self._queue.append((critical, message))
+                if not critical:
+                    self._droppable += 1
+            if full:
+                now = time.monotonic()
+                if now - self._last_warn >= DISPATCH_WARN_INTERVAL:
+                    self._last_warn = now
+                    warn = (len(self._queue), self._dropped, self._overflow)
+        if warn is not None:
+            _LOGGER.warning(
+                "dispatch backlog full(%d): %d telemetry messages dropped, "
+                "%d critical messages over limit",
+                *warn,
+            )
+        self._wakeup()
+
+    def _shed(self, critical: bool) -> bool:
+        """
+        积压已满时腾出位置，需持有 _lock；关键消息永不丢弃
+
+        Args:
+         critical (bool): 新消息是否为关键消息
+
+        Returns:
+         bool: 新消息是否入队
+        """
+        if self._droppable:
+            for index, (queued_critical, _) in enumerate(self._queue):
+                if not queued_critical:
+                    # 丢弃最旧的非关键消息
+                    del self._queue[index]
+                    self._droppable -= 1
+                    self._dropped += 1
+                    return True
+        if not critical:
+            self._dropped += 1
+            return False
+        self._overflow += 1
+        return True
+
+    def _wakeup(self) -> None:
+        with self._lock:
+            if self._scheduled or self._loop is None or not self._queue:
+                return
+            self._scheduled = True
+            loop = self._loop
+        try:
+            loop.call_soon_threadsafe(self._drain)
+        except RuntimeError as e:
+            # 事件循环已关闭
+            _LOGGER.warning(f"dispatch loop unavailable: {e}")
+            with self._lock:
+                self._scheduled = False
+
+    def _drain(self) -> None:
+        """在事件循环线程中执行，处理一批消息"""
+        with self._lock:
+            count = min(len(self._queue), self._max_batch)
+            batch = [self._queue.popleft() for _ in range(count)]
+            self._droppable -= sum(1 for critical, _ in batch if not critical)
+            self._wakeups += 1
+        for _, message in batch:
+            try:
+                self._handler(message)
+            except Exception as e:
+                self._handler_errors += 1
+                _LOGGER.error(f"dispatch message failed: {e}")
+        with self._lock:
+            self._dispatched += count
+            self._scheduled = False
+        self._wakeup()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backlog": len(self._queue),
+                "submitted": self._submitted,
+                "dispatched": self._dispatched,
+                "wakeups": self._wakeups,
+                "dropped": self._dropped,
+                "overflow": self._overflow,
+                "handler_errors": self._handler_errors,
+            }
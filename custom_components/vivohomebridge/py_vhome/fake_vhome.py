@@ -0,0 +1,270 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+import ctypes
+import json
+import logging
+import queue
+import random
+import threading
+import time
+import uuid
+from ctypes import POINTER, c_char, c_void_p
+from typing import Any, Callable, Optional
+
+_LOGGER = logging.getLogger("py_vhome")
+
+FAKE_SUCCESS_CODE = 10000
+FAKE_POLL_TIMEOUT = 0.5
+
+
+class FakeVHomeLibrary:
+    """
+    进程内模拟的 libvhome，接口与 vhome_lib 一致，用于离线压测
+
+    - 字符串结果以 char* 返回，vhome_memory_free 前保持有效
+    - data_to_python 阻塞等待注入的消息，超时返回 NULL
+    - 每个接口的延迟和返回码可通过 set_latency/set_result_code 配置
+    - inject_set/inject_event/start_traffic 模拟云端下发的控制与事件
+
+    Args:
+     seed (Optional[int]): 随机数种子，用于复现流量
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._buffers: dict[int, ctypes.Array] = {}
+        self._inbound: queue.Queue = queue.Queue()
+        self._latency: dict[str, float] = {}
+        self._result_codes: dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._traffic_thread: Optional[threading.Thread] = None
+        self._traffic_stop = threading.Event()
+        self._connected = False
+        self.sub_devices: dict[str, dict] = {}
+        self.uploads: int = 0
+        self.uploaded_items: int = 0
+        self.calls: dict[str, int] = {}
+        self.port = 36000
+        self._version = ctypes.create_string_buffer(b"fake")
+
+    # ---- 脚本化配置 ----
+
+    def set_latency(self, name: str, seconds: float) -> None:
+        """设置接口延迟，name 为 native 函数名，"*" 表示所有接口"""
+        self._latency[name] = seconds
+
+    def set_result_code(self, name: str, code: int) -> None:
+        """
+        设置接口返回码
+
+        int 接口直接返回该值；JSON 接口返回 {"code": code}，FAKE_SUCCESS_CODE 表示正常结果
+        """
+        self._result_codes[name] = code
+
+    def inject(self, message: dict) -> None:
+        """注入一条原始 native 消息，由 data_to_python 返回"""
+        self._inbound.put(message)
+
+    def inject_state(self, state: int, connect_result: int = 0) -> None:
+        self.inject({"type": 0, "state": state, "payload": {"connect_result": connect_result}})
+
+    def inject_set(self, sub_id: Optional[str], props: dict) -> None:
+        body = {"props": props} if sub_id is None else {"subId": sub_id, "props": props}
+        self.inject({"type": 1, "payload": {"act": "set", "body": [body]}})
+
+    def inject_event(self, sub_id: Optional[str], props: dict) -> None:
+        body = {"props": props} if sub_id is None else {"subId": sub_id, "props": props}
+        self.inject({"type": 1, "payload": {"act": "event", "body": [body]}})
+
+    def inject_local_event(self, cmd: int) -> None:
+        self.inject({"type": 2, "payload": {"cmd": cmd}})
+
+    def start_traffic(
+        self,
+        rate: float,
+        duration: Optional[float] = None,
+        burst: int = 1,
+        props_factory: Optional[Callable[[str], dict]] = None,
+    ) -> None:
+        """
+        按固定速率向已注册的子设备下发 set 命令
+
+        Args:
+         rate: 每秒下发次数
+         duration: 持续时间(秒)，None 表示直到 stop_traffic
+         burst: 每次下发的命令条数
+         props_factory: 根据 subId 生成 props，默认切换 vivo_std_power
+        """
+        self.stop_traffic()
+        self._traffic_stop.clear()
+        factory = props_factory or (
+            lambda sub_id: {"vivo_std_power": self._random.choice(("on", "off"))}
+        )
+
+        def _run():
+            interval = 1.0 / rate if rate > 0 else 1.0
+            deadline = None if duration is None else time.monotonic() + duration
+            while not self._traffic_stop.wait(interval):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                sub_ids = list(self.sub_devices)
+                if not sub_ids:
+                    continue
+                body = []
+                for _ in range(burst):
+                    sub_id = self._random.choice(sub_ids)
+                    body.append({"subId": sub_id, "props": factory(sub_id)})
+                self.inject({"type": 1, "payload": {"act": "set", "body": body}})
+
+        self._traffic_thread = threading.Thread(
+            target=_run, name="fake_vhome_traffic", daemon=True
+        )
+        self._traffic_thread.start()
+
+    def stop_traffic(self) -> None:
+        self._traffic_stop.set()
+        if self._traffic_thread is not None:
+            self._traffic_thread.join(timeout=1)
+            self._traffic_thread = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "uploads": self.uploads,
+                "uploaded_items": self.uploaded_items,
+                "sub_devices": len(self.sub_devices),
+                "live_buffers": len(self._buffers),
+                "inbound_backlog": self._inbound.qsize(),
+            }
+
+    # ---- 内部工具 ----
+
+    def _enter(self, name: str) -> Optional[int]:
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        delay = self._latency.get(name, self._latency.get("*", 0))
+        if delay > 0:
+            time.sleep(delay)
+        return self._result_codes.get(name)
+
+    def _alloc(self, obj: Any):
+        buffer = ctypes.create_string_buffer(json.dumps(obj).encode("utf-8"))
+        address = ctypes.addressof(buffer)
+        with self._lock:
+            self._buffers[address] = buffer
+        return ctypes.cast(address, POINTER(c_char))
+
+    @staticmethod
+    def _text(value) -> str:
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return "" if value is None else str(value)
+
+    # ---- libvhome 接口 ----
+
+    def vhome_init(self, url) -> None:
+        self._enter("vhome_init")
+
+    def vhome_deinit(self) -> None:
+        self._enter("vhome_deinit")
+        self.stop_traffic()
+        self._connected = False
+
+    def vhome_memory_free(self, pointer) -> None:
+        address = ctypes.cast(pointer, c_void_p).value
+        with self._lock:
+            self._buffers.pop(address, None)
+
+    def vhome_get_bind_code_by_mac(self, mac):
+        code = self._enter("vhome_get_bind_code_by_mac")
+        if code is not None and code != FAKE_SUCCESS_CODE:
+            return self._alloc({"code": code})
+        bind_code = uuid.uuid4().hex[:8].upper()
+        return self._alloc(
+            {"code": FAKE_SUCCESS_CODE, "data": {"bindCode": bind_code, "expireIn": 300}}
+        )
+
+    def vhome_bind(self, bcode, mac, en):
+        code = self._enter("vhome_bind")
+        if code is not None and code != FAKE_SUCCESS_CODE:
+            return self._alloc({"code": code})
+        return self._alloc(
+            {
+                "code": FAKE_SUCCESS_CODE,
+                "data": {"dn": uuid.uuid4().hex[:12], "ip": [f"127.0.0.1:{self.port}"]},
+            }
+        )
+
+    def vhome_sub_devices_register(self, bcode, dn, mac, sub_devices):
+        code = self._enter("vhome_sub_devices_register")
+        if code is not None and code != FAKE_SUCCESS_CODE:
+            return self._alloc({"code": code})
+        devices = json.loads(self._text(sub_devices))
+        succ = []
+        with self._lock:
+            registered = {item["logicMac"]: sub_id for sub_id, item in self.sub_devices.items()}
+            self.sub_devices = {}
+            for device in devices:
+                pky = device.get("pky", "")
+                logic_mac = device.get("logicMac", "")
+                sub_id = registered.get(logic_mac) or pky + uuid.uuid4().hex[:12]
+                self.sub_devices[sub_id] = {"logicMac": logic_mac, "pky": pky}
+                succ.append({"logicMac": logic_mac, "pky": pky, "dn": sub_id[len(pky):]})
+        return self._alloc({"code": FAKE_SUCCESS_CODE, "data": {"succ": succ}})
+
+    def vhome_data_upload(self, dn, data) -> int:
+        code = self._enter("vhome_data_upload")
+        if code is not None and code != 0:
+            return code
+        if not self._connected:
+            return -1
+        items = json.loads(self._text(data))
+        with self._lock:
+            self.uploads += 1
+            self.uploaded_items += len(items)
+        return 0
+
+    def vhome_connect(self, ip, port, bcode, dn) -> int:
+        code = self._enter("vhome_connect")
+        if code is not None and code != 0:
+            return code
+        self._connected = True
+        self.inject_state(0)
+        return 0
+
+    def vhome_disconnect(self) -> int:
+        self._enter("vhome_disconnect")
+        self._connected = False
+        return 0
+
+    def data_to_python(self):
+        try:
+            message = self._inbound.get(timeout=FAKE_POLL_TIMEOUT)
+        except queue.Empty:
+            return POINTER(c_char)()
+        return self._alloc(message)
+
+    def vhome_so_version(self):
+        return ctypes.cast(self._version, POINTER(c_char))
+
+    def vhome_so_build_time(self):
+        return ctypes.cast(self._version, POINTER(c_char))
+
+    def vhome_network_shakehand_task_start(self) -> None:
+        self._enter("vhome_network_shakehand_task_start")
+
+    def vhome_network_shakehand_task_stop(self) -> None:
+        self._enter("vhome_network_shakehand_task_stop")
+
+    def vhome_send_bind_code_to_app(self, bind_code) -> int:
+        code = self._enter("vhome_send_bind_code_to_app")
+        return 0 if code is None else code
+
+    def get_local_net_target_port(self) -> int:
+        return self.port
@@ -0,0 +1,148 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+_LOGGER = logging.getLogger("py_vhome")
+
+MSG_TYPE_STATE = 0
+MSG_TYPE_DATA = 1
+MSG_TYPE_LOCAL = 2
+
+ACT_SET = "set"
+ACT_EVENT = "event"
+
+
+@dataclass(slots=True)
+class StateMessage:
+    """网桥连接状态 {"type": 0, "state": 0, "payload": {"connect_result": 0}}"""
+
+    state: Optional[int]
+    connect_result: int
+    payload: dict
+
+
+@dataclass(slots=True)
+class SetCommand:
+    """云端下发的控制命令，sub_id 为 None 表示控制网桥自身"""
+
+    sub_id: Optional[str]
+    props: dict
+
+
+@dataclass(slots=True)
+class SubDeviceEvent:
+    sub_id: Optional[str]
+    props: dict
+
+
+@dataclass(slots=True)
+class EventMessage:
+    """云端下发的事件(如解绑)，同一条 native 消息中的事件保持在一起"""
+
+    events: tuple[SubDeviceEvent, ...]
+
+
+@dataclass(slots=True)
+class LocalHandshake:
+    """局域网配网握手 {"type": 2, "payload": {"cmd": 0}}"""
+
+    cmd: Optional[int]
+    payload: dict
+
+
+Decoder = Callable[[dict], list]
+
+
+# 连接状态、控制命令、事件和配网握手不可丢弃，积压时只丢弃其它(遥测类)消息
+CRITICAL_MESSAGE_TYPES = (StateMessage, SetCommand, EventMessage, LocalHandshake)
+
+
+def is_critical_message(message: Any) -> bool:
+    return isinstance(message, CRITICAL_MESSAGE_TYPES)
+
+
+def _body_items(raw: dict) -> list[tuple[Optional[str], dict]]:
+    body = raw.get("payload", {}).get("body")
+    if not isinstance(body, list) or len(body) == 0:
+        _LOGGER.warning(f"action data is empty: {raw}")
+        return []
+    items = []
+    for item in body:
+        props = item.get("props")
+        if not props:
+            continue
+        sub_id = item.get("subId")
+        items.append((sub_id if sub_id else None, props))
+    return items
+
+
+def _decode_state(raw: dict) -> list:
+    payload = raw.get("payload") or {}
+    return [StateMessage(raw.get("state"), payload.get("connect_result", -99), payload)]
+
+
+def _decode_set(raw: dict) -> list:
+    return [SetCommand(sub_id, props) for sub_id, props in _body_items(raw)]
+
+
+def _decode_event(raw: dict) -> list:
+    events = tuple(SubDeviceEvent(sub_id, props) for sub_id, props in _body_items(raw))
+    return [EventMessage(events)] if events else []
+
+
+def _decode_local(raw: dict) -> list:
+    payload = raw.get("payload")
+    if payload is None:
+        return []
+    return [LocalHandshake(payload.get("cmd"), payload)]
+
+
+class MessageRouter:
+    """
+    native 消息的解码表与分发表
+
+    解码表以 (type, act) 为键，在监听线程中把原始 dict 解码为消息对象；
+    分发表以消息类型为键，在事件循环中调用处理函数。新增消息种类只需注册，无需修改监听循环。
+    """
+
+    def __init__(self):
+        self._decoders: dict[tuple[Any, Optional[str]], Decoder] = {
+            (MSG_TYPE_STATE, None): _decode_state,
+            (MSG_TYPE_DATA, ACT_SET): _decode_set,
+            (MSG_TYPE_DATA, ACT_EVENT): _decode_event,
+            (MSG_TYPE_LOCAL, None): _decode_local,
+        }
+        self._handlers: dict[type, Callable[[Any], None]] = {}
+
+    def register_decoder(self, msg_type: Any, act: Optional[str], decoder: Decoder) -> None:
+        """act 为 None 时按 type 匹配，否则按 (type, payload.act) 匹配"""
+        self._decoders[(msg_type, act)] = decoder
+
+    def register_handler(self, message_cls: type, handler: Callable[[Any], None]) -> None:
+        self._handlers[message_cls] = handler
+
+    def decode(self, raw: dict) -> list:
+        msg_type = raw.get("type")
+        decoder = self._decoders.get((msg_type, None))
+        if decoder is None:
+            payload = raw.get("payload")
+            act = payload.get("act") if isinstance(payload, dict) else None
+            decoder = self._decoders.get((msg_type, act))
+        if decoder is None:
+            _LOGGER.info(f"not support message: {raw}")
+            return []
+        return decoder(raw)
+
+    def dispatch(self, message: Any) -> None:
+        handler = self._handlers.get(type(message))
+        if handler is None:
+            _LOGGER.warning(f"[WARN] 未注册的回调被触发，参数: {message}")
+            return
+        handler(message)
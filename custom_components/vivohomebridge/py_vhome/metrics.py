@@ -0,0 +1,108 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+import bisect
+import threading
+from typing import Any, Optional
+
+# 延迟直方图桶上界(毫秒)，超出最后一个桶计入 "+Inf"
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class LatencyHistogram:
+    """固定桶的延迟直方图，不保存原始样本"""
+
+    __slots__ = ("_bounds", "_counts", "count", "total_ms", "max_ms")
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS_MS):
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        估算分位数，返回所在桶的上界(毫秒)；落在最后一个桶时返回最大值
+
+        Args:
+         p: 0~100
+        """
+        if self.count == 0:
+            return None
+        rank = self.count * p / 100
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(self._bounds):
+                    return float(min(self._bounds[index], self.max_ms))
+                return self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        buckets = {f"le_{bound}ms": count for bound, count in zip(self._bounds, self._counts)}
+        buckets["+Inf"] = self._counts[-1]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class NativeCallMetrics:
+    """
+    记录每个 native 接口的调用延迟和返回码分布
+
+    record 可在任意线程调用
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: dict[str, LatencyHistogram] = {}
+        self._codes: dict[str, dict[str, int]] = {}
+
+    def record(self, name: str, seconds: float, code: Any) -> None:
+        with self._lock:
+            histogram = self._latency.get(name)
+            if histogram is None:
+                histogram = self._latency[name] = LatencyHistogram()
+                self._codes[name] = {}
+            histogram.observe(seconds * 1000)
+            codes = self._codes[name]
+            key = str(code)
+            codes[key] = codes.get(key, 0) + 1
+
+    def percentile(self, name: str, p: float) -> Optional[float]:
+        with self._lock:
+            histogram = self._latency.get(name)
+            return histogram.percentile(p) if histogram is not None else None
+
+    def call_count(self, name: str, code: Any = None) -> int:
+        with self._lock:
+            if code is None:
+                histogram = self._latency.get(name)
+                return histogram.count if histogram is not None else 0
+            return self._codes.get(name, {}).get(str(code), 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                name: {"latency": histogram.as_dict(), "codes": dict(self._codes[name])}
+                for name, histogram in self._latency.items()
+            }
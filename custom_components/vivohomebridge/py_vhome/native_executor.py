@@ -0,0 +1,181 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_LOGGER = logging.getLogger("py_vhome")
+
+NATIVE_EXECUTOR_WORKERS = 1
+NATIVE_EXECUTOR_MAX_PENDING = 64
+NATIVE_CALL_DEFAULT_TIMEOUT = 30.0
+LOOP_LAG_SAMPLE_INTERVAL = 0.5
+
+
+class NativeExecutor:
+    """
+    将阻塞的 libvhome 调用放到专用线程池中执行，避免阻塞事件循环
+
+    Args:
+     max_workers (int): 专用线程数，libvhome 默认单线程串行调用
+     max_pending (int): 同时在途(执行中+排队)的最大调用数
+     default_timeout (float): 单次调用默认超时时间(秒)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = NATIVE_EXECUTOR_WORKERS,
+        max_pending: int = NATIVE_EXECUTOR_MAX_PENDING,
+        default_timeout: float = NATIVE_CALL_DEFAULT_TIMEOUT,
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="vhome_native"
+        )
+        self._max_pending = max_pending
+        self._default_timeout = default_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._calls = 0
+        self._timeouts = 0
+        self._cancelled = 0
+        self._errors = 0
+        self._is_shutdown = False
+
+    @property
+    def is_shutdown(self) -> bool:
+        return self._is_shutdown
+
+    def run(self, func: Callable[..., Any], *args, timeout: Optional[float] = None) -> Any:
+        """
+        在专用线程中同步执行 func(*args)，排在已提交的调用之后，供非事件循环线程使用
+
+        Raises:
+         concurrent.futures.TimeoutError: 调用超时
+        """
+        call_timeout = self._default_timeout if timeout is None else timeout
+        return self._executor.submit(func, *args).result(call_timeout)
+
+    async def async_run(
+        self,
+        func: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        name: Optional[str] = None,
+    ) -> Any:
+        """
+        在专用线程中执行 func(*args)
+
+        超时或被取消时，尚未开始执行的调用会被撤销；已进入 native 的调用无法中断，
+        会在后台执行完毕后丢弃结果。
+
+        Raises:
+         asyncio.TimeoutError: 调用超时
+         asyncio.CancelledError: 调用方被取消
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_pending)
+        call_name = name or getattr(func, "__name__", "native")
+        call_timeout = self._default_timeout if timeout is None else timeout
+        async with self._semaphore:
+            self._pending += 1
+            self._calls += 1
+            future = loop.run_in_executor(self._executor, func, *args)
+            try:
+                return await asyncio.wait_for(future, call_timeout)
+            except asyncio.TimeoutError:
+                self._timeouts += 1
+                _LOGGER.warning(
+                    "native call %s timed out after %.1fs", call_name, call_timeout
+                )
+                raise
+            except asyncio.CancelledError:
+                self._cancelled += 1
+                _LOGGER.info("native call %s cancelled", call_name)
+                raise
+            except Exception:
+                self._errors += 1
+                raise
+            finally:
+                self._pending -= 1
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._is_shutdown = True
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._pending,
+            "max_pending": self._max_pending,
+            "calls": self._calls,
+            "timeouts": self._timeouts,
+            "cancelled": self._cancelled,
+            "errors": self._errors,
+        }
+
+
+class LoopLagMonitor:
+    """
+    周期性测量事件循环的调度延迟，用于确认 native 调用不再阻塞事件循环
+
+    每 interval 秒预约一次回调，实际执行时间与预约时间的差值即为循环延迟。
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_SAMPLE_INTERVAL):
+        self._interval = interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._expected = 0.0
+        self._samples = 0
+        self._last = 0.0
+        self._max = 0.0
+        self._total = 0.0
+        self._over_100ms = 0
+        self._over_1s = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._handle is not None:
+            return
+        self._loop = loop
+        self._schedule()
+
+    def stop(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self) -> None:
+        self._expected = time.monotonic() + self._interval
+        self._handle = self._loop.call_later(self._interval, self._tick)
+
+    def _tick(self) -> None:
+        lag = max(0.0, time.monotonic() - self._expected)
+        self._samples += 1
+        self._last = lag
+        self._total += lag
+        if lag > self._max:
+            self._max = lag
+        if lag >= 1.0:
+            self._over_1s += 1
+        elif lag >= 0.1:
+            self._over_100ms += 1
+        self._schedule()
+
+    def stats(self) -> dict:
+        return {
+            "samples": self._samples,
+            "last_ms": round(self._last * 1000, 3),
+            "max_ms": round(self._max * 1000, 3),
+            "avg_ms": round(self._total * 1000 / self._samples, 3)
+            if self._samples
+            else 0.0,
+            "over_100ms": self._over_100ms,
+            "over_1s": self._over_1s,
+        }
@@ -0,0 +1,464 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from . import codec
+from .dispatcher import LoopDispatcher
+from .messages import (
+    EventMessage,
+    LocalHandshake,
+    MessageRouter,
+    SetCommand,
+    StateMessage,
+    is_critical_message,
+)
+from .metrics import NativeCallMetrics
+from .native_executor import LoopLagMonitor, NativeExecutor
+from .vhome import (
+    LISTENER_JOIN_TIMEOUT,
+    LISTENER_RATE_WINDOW,
+    VHOME_BACKEND_ENV,
+    VHOME_CALL_TIMEOUT,
+    VHOME_REGISTER_TIMEOUT,
+    VHOME_UPLOAD_TIMEOUT,
+    get_backend_name,
+)
+from .worker import METHOD_DIAGNOSTICS, METHOD_INIT, encode_frame, recv_frame
+
+_LOGGER = logging.getLogger("py_vhome")
+
+# 子进程启动(含 vhome_init)的等待时间(秒)
+WORKER_START_TIMEOUT = 10.0
+# 子进程异常退出后的重启退避区间(秒)，存活超过 WORKER_STABLE_TIME 后退避复位
+WORKER_RESTART_DELAY_MIN = 1.0
+WORKER_RESTART_DELAY_MAX = 30.0
+WORKER_STABLE_TIME = 60.0
+
+
+class RemoteVHome:
+    """
+    在子进程中运行 VHome，接口与 VHome 一致
+
+    - 父子进程通过 socketpair 传输长度前缀帧，协议见 worker.py
+    - 监督线程负责启动子进程并读取回复与消息，子进程退出后自动重启，
+      并重放握手任务与最近一次 async_connect
+    - 子进程退出时未完成的调用立即返回失败值
+    - native 消息在父进程解码，回调仍在绑定的事件循环中执行
+
+    Args:
+     url (str): vhome_init 的服务地址
+    """
+
+    def __init__(
+        self,
+        url: str,
+        on_state: Optional[Callable[[StateMessage], None]] = None,
+        on_data_received: Optional[Callable[[SetCommand | EventMessage], None]] = None,
+        on_local_event: Optional[Callable[[LocalHandshake], None]] = None,
+        router: Optional[MessageRouter] = None,
+    ):
+        self._router = router if router is not None else MessageRouter()
+        if callable(on_state):
+            self._router.register_handler(StateMessage, on_state)
+        if callable(on_data_received):
+            self._router.register_handler(SetCommand, on_data_received)
+            self._router.register_handler(EventMessage, on_data_received)
+        if callable(on_local_event):
+            self._router.register_handler(LocalHandshake, on_local_event)
+        # 帧的发送放在单独线程，避免大帧写满 socket 缓冲区时阻塞事件循环
+        self._sender = NativeExecutor(default_timeout=VHOME_CALL_TIMEOUT)
+        self._loop_lag_monitor = LoopLagMonitor()
+        self._dispatcher = LoopDispatcher(self._router.dispatch, is_critical=is_critical_message)
+        self._metrics = NativeCallMetrics()
+        self._url = url
+        self._ids = itertools.count(1)
+        # 事件循环、读帧线程和监督线程都会访问 _pending，统一由 _pending_lock 保护
+        self._pending: dict[int, tuple[concurrent.futures.Future, Any]] = {}
+        self._pending_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._supervisor: Optional[threading.Thread] = None
+        self._closing = threading.Event()
+        self._ready = threading.Event()
+        self._info: dict = {}
+        # 子进程重启后需要重放的状态
+        self._connect_args: Optional[tuple] = None
+        self._shakehand_running = False
+        self._listener_stats = {
+            "messages": 0,
+            "decode_failures": 0,
+            "restarts": 0,
+        }
+        self._rate_window_start = time.monotonic()
+        self._rate_window_messages = 0
+        self._messages_per_sec = 0.0
+        self.open()
+
+    # ---- 生命周期 ----
+
+    def open(self) -> None:
+        """启动监督线程，不等待子进程就绪，已打开时直接返回"""
+        with self._open_lock:
+            if self._supervisor is None or not self._supervisor.is_alive():
+                if self._sender.is_shutdown:
+                    self._sender = NativeExecutor(default_timeout=VHOME_CALL_TIMEOUT)
+                self._closing.clear()
+                self._supervisor = threading.Thread(
+                    target=self._supervise, name="vhome_supervisor", daemon=True
+                )
+                self._supervisor.start()
+
+    async def async_open(self) -> None:
+        """与 VHome 一致的接口，open 本身不阻塞"""
+        self.open()
+
+    async def async_wait_ready(self, timeout: float = WORKER_START_TIMEOUT) -> bool:
+        """
+        在线程池中等待子进程就绪，不阻塞事件循环
+
+        Returns:
+         bool: 超时或已关闭时返回 False
+        """
+        if self._ready.is_set():
+            return True
+        if self._closing.is_set():
+            return False
+        ready = await asyncio.get_running_loop().run_in_executor(
+            None, self._ready.wait, timeout
+        )
+        if not ready:
+            _LOGGER.error("vhome worker not ready in %.1fs", timeout)
+        return ready
+
+    def close(self, timeout: float = LISTENER_JOIN_TIMEOUT) -> None:
+        """关闭 socket 让子进程自行退出，超时后强制结束"""
+        with self._open_lock:
+            self._closing.set()
+            self._ready.clear()
+            sock, process, supervisor = self._sock, self._process, self._supervisor
+            self._supervisor = None
+            self._sender.shutdown()
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if process is not None:
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                _LOGGER.warning("vhome worker did not exit in %.1fs, kill it", timeout)
+                process.kill()
+        if supervisor is not None and supervisor is not threading.current_thread():
+            supervisor.join(timeout)
+        _LOGGER.info("RemoteVHome closed")
+
+    async def async_close(self) -> None:
+        self.stop_loop_monitor()
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def _spawn(self) -> None:
+        parent_sock, child_sock = socket.socketpair()
+        env = dict(os.environ)
+        env[VHOME_BACKEND_ENV] = get_backend_name()
+        try:
+            process = subprocess.Popen(
+                [sys.executable, "-m", "py_vhome.worker", str(child_sock.fileno())],
+                cwd=str(Path(__file__).resolve().parent.parent),
+                env=env,
+                pass_fds=(child_sock.fileno(),),
+                stdin=subprocess.DEVNULL,
+            )
+        except Exception:
+            parent_sock.close()
+            raise
+        finally:
+            child_sock.close()
+        self._sock, self._process = parent_sock, process
+        parent_sock.sendall(encode_frame({"id": 0, "method": METHOD_INIT, "args": [self._url]}))
+        parent_sock.settimeout(WORKER_START_TIMEOUT)
+        reply = recv_frame(parent_sock)
+        parent_sock.settimeout(None)
+        if not reply or "result" not in reply:
+            raise RuntimeError(f"vhome worker init failed: {reply}")
+        self._info = reply["result"]
+        _LOGGER.info(f"vhome worker started: {self._info}")
+
+    def _supervise(self) -> None:
+        delay = WORKER_RESTART_DELAY_MIN
+        while not self._closing.is_set():
+            started = time.monotonic()
+            try:
+                self._spawn()
+                # 首次启动前被跳过的握手与连接同样需要重放
+                self._replay()
+                self._ready.set()
+                self._read_frames(self._sock)
+            except Exception as e:
+                _LOGGER.error(f"vhome worker failed: {e}")
+            self._ready.clear()
+            self._reap()
+            if self._closing.is_set():
+                break
+            self._listener_stats["restarts"] += 1
+            if time.monotonic() - started > WORKER_STABLE_TIME:
+                delay = WORKER_RESTART_DELAY_MIN
+            _LOGGER.warning("vhome worker exited, restart in %.1fs", delay)
+            self._closing.wait(delay)
+            delay = min(delay * 2, WORKER_RESTART_DELAY_MAX)
+
+    def _reap(self) -> None:
+        """清理已退出的子进程，并让未完成的调用返回失败值"""
+        sock, process = self._sock, self._process
+        self._sock = self._process = None
+        if sock is not None:
+            sock.close()
+        if process is not None:
+            try:
+                # 关闭时子进程会先执行 vhome_deinit 再退出
+                code = process.wait(LISTENER_JOIN_TIMEOUT if self._closing.is_set() else 0)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                code = process.wait()
+            if code != 0 and not self._closing.is_set():
+                _LOGGER.error(f"vhome worker exit code: {code}")
+        # _ready 已清除，换出之后不会再有新的调用登记
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future, fail_result in pending.values():
+            if not future.done():
+                future.set_result(fail_result)
+
+    def _replay(self) -> None:
+        """重放子进程就绪前请求的握手与连接状态，连接结果仍由状态消息通知"""
+        if self._shakehand_running:
+            self._send({"id": None, "method": "network_shakehand_task_start", "args": []})
+        if self._connect_args is not None:
+            _LOGGER.warning("vhome worker started, replay connect")
+            self._send({"id": None, "method": "async_connect", "args": list(self._connect_args)})
+
+    def _read_frames(self, sock: socket.socket) -> None:
+        stats = self._listener_stats
+        while True:
+            frame = recv_frame(sock)
+            if frame is None:
+                return
+            if "event" in frame:
+                try:
+                    messages = self._router.decode(frame["event"])
+                except Exception as e:
+                    stats["decode_failures"] += 1
+                    _LOGGER.warning(f"decode native data failed: {e}")
+                    continue
+                stats["messages"] += 1
+                self._update_message_rate()
+                for message in messages:
+                    self._dispatcher.submit(message)
+                continue
+            with self._pending_lock:
+                entry = self._pending.pop(frame.get("id"), None)
+            if entry is None:
+                continue
+            future, fail_result = entry
+            if "error" in frame:
+                _LOGGER.error(f"vhome worker error: {frame['error']}")
+                future.set_result(fail_result)
+            else:
+                future.set_result(frame.get("result"))
+
+    def _update_message_rate(self):
+        self._rate_window_messages += 1
+        now = time.monotonic()
+        elapsed = now - self._rate_window_start
+        if elapsed >= LISTENER_RATE_WINDOW:
+            self._messages_per_sec = self._rate_window_messages / elapsed
+            self._rate_window_start = now
+            self._rate_window_messages = 0
+
+    def _send(self, request: dict) -> None:
+        sock = self._sock
+        if sock is None:
+            raise ConnectionError("vhome worker not running")
+        frame = encode_frame(request)
+        with self._send_lock:
+            sock.sendall(frame)
+
+    async def _async_call(
+        self,
+        method: str,
+        *args,
+        fail_result: Any = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        调用子进程中 VHome 的同名接口
+
+        Returns:
+         接口返回值，子进程未就绪(启动中、重启退避或已关闭)、超时或异常时返回 fail_result
+        """
+        request_id = next(self._ids)
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._pending_lock:
+            # 与 _reap 换出 _pending 互斥，未就绪时不登记，避免调用滞留到超时
+            ready = self._ready.is_set()
+            if ready:
+                self._pending[request_id] = (future, fail_result)
+        if not ready:
+            # 不在事件循环中等待子进程，握手与连接状态会在子进程就绪后重放
+            _LOGGER.warning(f"vhome worker not ready, call {method} skipped")
+            self._metrics.record(method, 0.0, "not_ready")
+            return fail_result
+        start = time.perf_counter()
+        try:
+            await self._sender.async_run(
+                self._send, {"id": request_id, "method": method, "args": list(args)}
+            )
+            result = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout or VHOME_CALL_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            _LOGGER.error(f"vhome worker call {method} timed out")
+            result = fail_result
+        except Exception as e:
+            _LOGGER.error(f"vhome worker call {method} failed: {e}")
+            result = fail_result
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+        if isinstance(result, dict):
+            code = result.get("code", "none")
+        else:
+            code = "null" if result is None else result
+        self._metrics.record(method, time.perf_counter() - start, code)
+        return result
+
+    # ---- 与 VHome 一致的接口 ----
+
+    def get_listener_stats(self) -> dict:
+        stats = dict(self._listener_stats)
+        stats["messages_per_sec"] = round(self._messages_per_sec, 2)
+        stats["alive"] = self._ready.is_set()
+        stats["pid"] = self._info.get("pid")
+        return stats
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._dispatcher.attach_loop(loop)
+
+    def detach_loop(self) -> None:
+        self._dispatcher.detach_loop()
+
+    def register_handler(self, message_cls: type, handler: Callable) -> None:
+        self._router.register_handler(message_cls, handler)
+
+    def register_decoder(self, msg_type, act: Optional[str], decoder: Callable) -> None:
+        """注册 native 消息解码函数，解码函数在监督线程中执行"""
+        self._router.register_decoder(msg_type, act, decoder)
+
+    def get_dispatch_stats(self) -> dict:
+        return self._dispatcher.stats()
+
+    def start_loop_monitor(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop_lag_monitor.start(loop)
+
+    def stop_loop_monitor(self) -> None:
+        self._loop_lag_monitor.stop()
+
+    def get_loop_lag_stats(self) -> dict:
+        return self._loop_lag_monitor.stats()
+
+    def get_native_executor_stats(self) -> dict:
+        stats = self._sender.stats()
+        with self._pending_lock:
+            stats["in_flight"] = len(self._pending)
+        return stats
+
+    def get_native_call_metrics(self) -> NativeCallMetrics:
+        """父进程视角的调用延迟，包含进程间通信开销"""
+        return self._metrics
+
+    def get_diagnostics(self) -> dict:
+        return {
+            "backend": "process",
+            "codec": codec.BACKEND,
+            "native_calls": self._metrics.snapshot(),
+            "executor": self.get_native_executor_stats(),
+            "listener": self.get_listener_stats(),
+            "dispatch": self._dispatcher.stats(),
+            "loop_lag": self._loop_lag_monitor.stats(),
+        }
+
+    async def async_get_worker_diagnostics(self) -> dict:
+        """子进程内 VHome 的运行数据"""
+        return await self._async_call(METHOD_DIAGNOSTICS, fail_result={})
+
+    async def async_get_bcode(self, mac: str) -> dict:
+        return await self._async_call("async_get_bcode", mac, fail_result={})
+
+    async def async_bind(self, bcode: str, mac: str, en: str) -> dict:
+        return await self._async_call("async_bind", bcode, mac, en, fail_result={})
+
+    async def async_send_bind_code_to_app(self, bcode: dict) -> int:
+        return await self._async_call("async_send_bind_code_to_app", bcode, fail_result=-1)
+
+    async def async_sub_devices_register(
+        self, bcode: str, dn: str, mac: str, sub_devices: list[dict]
+    ) -> dict:
+        return await self._async_call(
+            "async_sub_devices_register",
+            bcode,
+            dn,
+            mac,
+            sub_devices,
+            fail_result={"fail": [], "code": 6000},
+            timeout=VHOME_REGISTER_TIMEOUT,
+        )
+
+    async def async_data_upload(self, dn: str, data: list[dict]) -> int:
+        return await self._async_call(
+            "async_data_upload", dn, data, fail_result=-1, timeout=VHOME_UPLOAD_TIMEOUT
+        )
+
+    async def async_connect(self, host: str, port: int, dn: str, user_code: str) -> int:
+        self._connect_args = (host, port, dn, user_code)
+        return await self._async_call(
+            "async_connect", host, port, dn, user_code, fail_result=-1
+        )
+
+    async def async_disconnect(self, dn: str) -> int:
+        self._connect_args = None
+        return await self._async_call("async_disconnect", dn, fail_result=-1)
+
+    def version(self) -> str:
+        return self._info.get("version", "")
+
+    def build_time(self) -> str:
+        return self._info.get("build_time", "")
+
+    def get_local_net_target_port(self) -> int:
+        return self._info.get("local_port", 0)
+
+    async def network_shakehand_task_start(self) -> None:
+        self._shakehand_running = True
+        await self._async_call("network_shakehand_task_start")
+
+    async def network_shakehand_task_stop(self) -> None:
+        self._shakehand_running = False
+        await self._async_call("network_shakehand_task_stop")
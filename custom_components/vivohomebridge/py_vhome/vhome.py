@@ -13,16 +13,41 @@ import shlex
 import subprocess
 import sys
 import threading
+import time
 import json
 from ctypes import c_char_p, c_void_p, c_int, c_char, c_int, POINTER
 from pathlib import Path
-from typing import Callable, Optional, Tuple
+from typing import Any, Callable, Optional, Tuple
+import asyncio
 import logging
 
+from . import codec
+from .dispatcher import LoopDispatcher
+from .messages import (
+    EventMessage,
+    LocalHandshake,
+    MessageRouter,
+    SetCommand,
+    StateMessage,
+    is_critical_message,
+)
+from .metrics import NativeCallMetrics
+from .native_executor import LoopLagMonitor, NativeExecutor
+
 _LOGGER = logging.getLogger("py_vhome")
 system = platform.system()
 machine = platform.machine()
 LIBVERSION = "1.1.1"
+# 各类 native 调用的超时时间(秒)
+VHOME_CALL_TIMEOUT = 30.0
+VHOME_REGISTER_TIMEOUT = 60.0
+VHOME_UPLOAD_TIMEOUT = 10.0
+# 监听线程空轮询退避区间(秒)、异常重启间隔(秒)、关闭时等待线程退出的时间(秒)
+LISTENER_IDLE_BACKOFF_MIN = 0.01
+LISTENER_IDLE_BACKOFF_MAX = 0.5
+LISTENER_RESTART_DELAY = 1.0
+LISTENER_JOIN_TIMEOUT = 5.0
+LISTENER_RATE_WINDOW = 10.0
 """
 检测机器架构
 
@@ -133,105 +158,472 @@ def lib_name(base_name: str, libVersion: str)-> str:
     return build_library_filename(base_name, os_name, arch, libc, libVersion)
 
 
-libpath = (
-    os.path.dirname(os.path.abspath(__file__)) + "/" + lib_name("libvhome", LIBVERSION )
-)
+PLATFORM_CACHE_FILE = "libvhome_platform.json"
+
+
+def resolve_library_path(base_name: str, libVersion: str) -> str:
+    """
+    解析动态库路径，结果缓存在动态库所在目录
+
+    缓存以 (libVersion, sys.platform, platform.machine()) 为键，键变化或缓存的库文件
+    不存在时重新探测平台(会执行 ldd --version)并刷新缓存。
+
+    Returns:
+     str: 动态库的绝对路径
+    """
+    lib_dir = os.path.dirname(os.path.abspath(__file__))
+    cache_path = os.path.join(lib_dir, PLATFORM_CACHE_FILE)
+    cache_key = f"{base_name}|{libVersion}|{sys.platform}|{machine}"
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cache = json.load(f)
+        if cache.get("key") == cache_key:
+            cached_path = os.path.join(lib_dir, cache["library"])
+            if os.path.exists(cached_path):
+                return cached_path
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    filename = lib_name(base_name, libVersion)
+    path = os.path.join(lib_dir, filename)
+    if os.path.exists(path):
+        tmp_path = cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": cache_key, "library": filename}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            _LOGGER.info(f"Failed to write platform cache: {e}")
+    return path
+
+
+# 函数名: (restype, argtypes)
+_NATIVE_SIGNATURES = {
+    # void vhome_init(char *url)
+    "vhome_init": (None, [c_void_p]),
+    # void vhome_deinit(void)
+    "vhome_deinit": (None, []),
+    # void vhome_memory_free( void* pData )
+    "vhome_memory_free": (None, [c_void_p]),
+    # char* vhome_get_bind_code_by_mac( char* mac )
+    "vhome_get_bind_code_by_mac": (POINTER(c_char), [c_char_p]),
+    # char* vhome_bind( char* bcode, char* mac, char* en )
+    "vhome_bind": (POINTER(c_char), [c_char_p, c_char_p, c_char_p]),
+    # char* vhome_sub_devices_register( char* bcode,char* dn,char* mac,char* sub_devices )
+    "vhome_sub_devices_register": (
+        POINTER(c_char),
+        [c_char_p, c_char_p, c_char_p, c_char_p],
+    ),
+    # int vhome_data_upload( char* dn,char* data )
+    "vhome_data_upload": (ctypes.c_int, [c_char_p, c_char_p]),
+    # int vhome_connect( char* ip,int port,char*bcode,char* dn )
+    "vhome_connect": (ctypes.c_int, [c_char_p, c_int, c_char_p, c_char_p]),
+    # int vhome_disconnect( void )
+    "vhome_disconnect": (ctypes.c_int, []),
+    # char* data_to_python(void)
+    "data_to_python": (POINTER(c_char), []),
+    # char* vhome_so_version(void)
+    "vhome_so_version": (POINTER(c_char), []),
+    # char* vhome_so_build_time(void)
+    "vhome_so_build_time": (POINTER(c_char), []),
+    # void vhome_network_shakehand_task_start(void);
+    "vhome_network_shakehand_task_start": (None, []),
+    # void vhome_network_shakehand_task_stop(void);
+    "vhome_network_shakehand_task_stop": (None, []),
+    # int vhome_send_bind_code_to_app( char *bindCode );
+    "vhome_send_bind_code_to_app": (ctypes.c_int, [c_char_p]),
+    # int get_local_net_target_port(void);
+    "get_local_net_target_port": (ctypes.c_int, []),
+}
+
+
+class _LazyNativeLibrary:
+    """
+    libvhome 的延迟加载句柄
+
+    首次访问任一符号时才解析路径、加载动态库并绑定函数签名，之后符号直接缓存为实例属性。
+    仅导入模块不会加载动态库。
+    """
+
+    def __init__(self, base_name: str, lib_version: str, signatures: dict):
+        self._base_name = base_name
+        self._lib_version = lib_version
+        self._signatures = signatures
+        self._lock = threading.Lock()
+        self._lib: Optional[ctypes.CDLL] = None
+        self.path: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._lib is not None
+
+    def load(self) -> ctypes.CDLL:
+        if self._lib is not None:
+            return self._lib
+        with self._lock:
+            if self._lib is None:
+                path = resolve_library_path(self._base_name, self._lib_version)
+                try:
+                    lib = ctypes.CDLL(path)
+                except OSError as e:
+                    _LOGGER.error(f"Failed to load library: {e}")
+                    raise Exception("Failed to load library: {}".format(e))
+                for name, (restype, argtypes) in self._signatures.items():
+                    func = getattr(lib, name)
+                    func.restype = restype
+                    func.argtypes = argtypes
+                    self.__dict__[name] = func
+                self.path = path
+                self._lib = lib
+        return self._lib
+
+    def __getattr__(self, name: str):
+        # 仅在符号尚未缓存时进入
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+VHOME_BACKEND_ENV = "VHOME_BACKEND"
+VHOME_BACKEND_NATIVE = "native"
+VHOME_BACKEND_FAKE = "fake"
+
+vhome_lib = _LazyNativeLibrary("libvhome", LIBVERSION, _NATIVE_SIGNATURES)
+
+
+def select_backend(name: str):
+    """
+    选择 vhome_lib 的实现，需在创建 VHome 之前调用
+
+    Args:
+     name (str): "native" 使用 libvhome 动态库，"fake" 使用进程内模拟实现
+
+    Returns:
+     当前生效的 vhome_lib
+    """
+    global vhome_lib
+    if name == VHOME_BACKEND_FAKE:
+        from .fake_vhome import FakeVHomeLibrary
+
+        if not isinstance(vhome_lib, FakeVHomeLibrary):
+            vhome_lib = FakeVHomeLibrary()
+    elif name == VHOME_BACKEND_NATIVE:
+        if not isinstance(vhome_lib, _LazyNativeLibrary):
+            vhome_lib = _LazyNativeLibrary("libvhome", LIBVERSION, _NATIVE_SIGNATURES)
+    else:
+        raise ValueError(f"unknown vhome backend: {name}")
+    _LOGGER.info(f"vhome backend: {name}")
+    return vhome_lib
+
+
+def get_backend():
+    return vhome_lib
+
+
+def get_backend_name() -> str:
+    return VHOME_BACKEND_NATIVE if isinstance(vhome_lib, _LazyNativeLibrary) else VHOME_BACKEND_FAKE
+
+
+if os.environ.get(VHOME_BACKEND_ENV):
+    select_backend(os.environ[VHOME_BACKEND_ENV])
+
+
+VHOME_ISOLATION_ENV = "VHOME_ISOLATION"
+VHOME_ISOLATION_THREAD = "thread"
+VHOME_ISOLATION_PROCESS = "process"
+
+_isolation = os.environ.get(VHOME_ISOLATION_ENV, VHOME_ISOLATION_THREAD)
+
+
+def select_isolation(mode: str) -> None:
+    """
+    选择 libvhome 的运行方式，需在创建 VHome 之前调用
+
+    Args:
+     mode (str): "thread" 在本进程加载动态库，"process" 在子进程中运行(见 remote.RemoteVHome)
+    """
+    global _isolation
+    if mode not in (VHOME_ISOLATION_THREAD, VHOME_ISOLATION_PROCESS):
+        raise ValueError(f"unknown vhome isolation: {mode}")
+    _isolation = mode
+    _LOGGER.info(f"vhome isolation: {mode}")
+
+
+def create_vhome(url: str, isolation: Optional[str] = None, **kwargs):
+    """
+    创建 VHome 或 RemoteVHome，其余参数与 VHome 一致
+
+    Args:
+     isolation (Optional[str]): 运行方式，None 使用 select_isolation 的设置
+    """
+    if (isolation or _isolation) == VHOME_ISOLATION_PROCESS:
+        from .remote import RemoteVHome
+
+        return RemoteVHome(url, **kwargs)
+    return VHome(url, **kwargs)
+
+def _load_strlen() -> Optional[Callable[[int], int]]:
+    try:
+        libc = ctypes.cdll.msvcrt if sys.platform.startswith("win") else ctypes.CDLL(None)
+        strlen = libc.strlen
+    except (OSError, AttributeError) as e:
+        _LOGGER.info(f"strlen unavailable, fallback to string_at: {e}")
+        return None
+    strlen.restype = ctypes.c_size_t
+    strlen.argtypes = [c_void_p]
+    return strlen
+
+
+_strlen = _load_strlen()
+
+
+def _take_native_json(result) -> Any:
+    """
+    解析 native 返回的 JSON 字符串并释放其内存
+
+    直接在 native 缓冲区上建立 memoryview 交给解析器，不再经过 bytes->str 的拷贝；
+    无法获取 strlen 时退化为 ctypes.string_at 的单次拷贝。
+
+    Args:
+     result: native 接口返回的 char* 指针(非空)
 
-try:
-    vhome_lib = ctypes.CDLL(libpath)
-except OSError as e:
-    _LOGGER.error(f"Failed to load library: {e}")
-    raise Exception("Failed to load library: {}".format(e))
-
-"""void vhome_init(char *url)"""
-vhome_lib.vhome_init.restype = None
-vhome_lib.vhome_init.argtypes = [c_void_p]
-"""void vhome_deinit(void)"""
-vhome_lib.vhome_deinit.restype = None
-vhome_lib.vhome_deinit.argtypes = []
-"""void vhome_memory_free( void* pData )"""
-vhome_lib.vhome_memory_free.argtypes = [c_void_p]
-"""char* vhome_get_bind_code_by_mac( char* mac )"""
-vhome_lib.vhome_get_bind_code_by_mac.restype = POINTER(c_char)
-vhome_lib.vhome_get_bind_code_by_mac.argtypes = [c_char_p]
-"""char* vhome_bind( char* bcode, char* mac )"""
-vhome_lib.vhome_bind.restype = POINTER(c_char)
-vhome_lib.vhome_bind.argtypes = [c_char_p, c_char_p, c_char_p]
-"""char* vhome_sub_devices_register( char* bcode,char* dn,char* mac,char* sub_devices )"""
-vhome_lib.vhome_sub_devices_register.restype = POINTER(c_char)
-vhome_lib.vhome_sub_devices_register.argtypes = [c_char_p, c_char_p, c_char_p, c_char_p]
-"""int vhome_data_upload( char* dn,char* data )"""
-vhome_lib.vhome_data_upload.restype = ctypes.c_int
-vhome_lib.vhome_data_upload.argtypes = [c_char_p, c_char_p]
-"""int vhome_connect( char* ip,int port,char*bcode,char* dn )"""
-vhome_lib.vhome_connect.restype = ctypes.c_int
-vhome_lib.vhome_connect.argtypes = [c_char_p, c_int, c_char_p, c_char_p]
-"""int vhome_disconnect( void )"""
-vhome_lib.vhome_disconnect.restype = ctypes.c_int
-vhome_lib.vhome_disconnect.argtypes = []
-"""char* data_to_python(void)"""
-vhome_lib.data_to_python.restype = POINTER(c_char)
-vhome_lib.data_to_python.argtypes = []
-"""char* vhome_so_version(void)"""
-vhome_lib.vhome_so_version.restype = POINTER(c_char)
-vhome_lib.vhome_so_version.argtypes = []
-"""char* vhome_so_build_time(void)"""
-vhome_lib.vhome_so_build_time.restype = POINTER(c_char)
-vhome_lib.vhome_so_build_time.argtypes = []
-
-"""void vhome_network_shakehand_task_start(void);"""
-vhome_lib.vhome_network_shakehand_task_start.restype = None
-vhome_lib.vhome_network_shakehand_task_start.argtypes = []
-"""void vhome_network_shakehand_task_stop(void);"""
-vhome_lib.vhome_network_shakehand_task_stop.restype = None
-vhome_lib.vhome_network_shakehand_task_stop.argtypes = []
-"""int vhome_send_bind_code_to_app( char *bindCode );"""
-vhome_lib.vhome_send_bind_code_to_app.restype = ctypes.c_int
-vhome_lib.vhome_send_bind_code_to_app.argtypes = [c_char_p]
-"""int get_local_net_target_port(void);"""
-vhome_lib.get_local_net_target_port.restype = ctypes.c_int
-vhome_lib.get_local_net_target_port.argtypes = []
+    Returns:
+     解析后的对象
+    """
+    address = ctypes.cast(result, c_void_p).value
+    try:
+        if _strlen is not None:
+            size = _strlen(address)
+            buffer = memoryview((c_char * size).from_address(address)).cast("B")
+            try:
+                return codec.loads(buffer)
+            finally:
+                buffer.release()
+        return codec.loads(ctypes.string_at(address))
+    finally:
+        vhome_lib.vhome_memory_free(result)
 
 
 class VHome:
     def __init__(
         self,
         url: str,
-        on_state: Optional[Callable[[dict], None]] = None,
-        on_data_received: Optional[Callable[[dict], None]] = None,
-        on_local_event: Optional[Callable[[str], None]] = None,
+        on_state: Optional[Callable[[StateMessage], None]] = None,
+        on_data_received: Optional[Callable[[SetCommand | EventMessage], None]] = None,
+        on_local_event: Optional[Callable[[LocalHandshake], None]] = None,
+        router: Optional[MessageRouter] = None,
     ):
         """
         初始化方法
 
         Args:
-         on_state (Optional[Callable[[dict], None]]): 状态变化时的回调函数，接收一个字典作为参数
-         on_data_received (Optional[Callable[[dict], None]]): 数据接收时的回调函数，接收一个字典作为参数
+         on_state (Optional[Callable[[StateMessage], None]]): 状态变化时的回调函数
+         on_data_received (Optional[Callable[[SetCommand | EventMessage], None]]): 控制命令/事件的回调函数
+         on_local_event (Optional[Callable[[LocalHandshake], None]]): 局域网握手的回调函数
+         router (Optional[MessageRouter]): 自定义消息解码/分发表
+
+        更多消息种类可通过 register_handler/register_decoder 注册
 
         Returns:
          None
         """
         _LOGGER.info(f"VHome work on {system}+{machine}")
-        self._on_state = (
-            on_state if callable(on_state) else self._default_on_state_callback
-        )
-        self._on_data = (
-            on_data_received
-            if callable(on_data_received)
-            else self._default_on_data_received_callback
-        )
-        self._on_local_event = (
-            on_local_event
-            if callable(on_local_event)
-            else self._default_on_local_event_callback
+        self._router = router if router is not None else MessageRouter()
+        if callable(on_state):
+            self._router.register_handler(StateMessage, on_state)
+        if callable(on_data_received):
+            self._router.register_handler(SetCommand, on_data_received)
+            self._router.register_handler(EventMessage, on_data_received)
+        if callable(on_local_event):
+            self._router.register_handler(LocalHandshake, on_local_event)
+        self._native_executor = NativeExecutor(default_timeout=VHOME_CALL_TIMEOUT)
+        self._loop_lag_monitor = LoopLagMonitor()
+        self._dispatcher = LoopDispatcher(self._router.dispatch, is_critical=is_critical_message)
+        self._metrics = NativeCallMetrics()
+        self._version: Optional[str] = None
+        self._build_time: Optional[str] = None
+        self._url = url
+        self._open_lock = threading.Lock()
+        self._is_open = False
+        self._listener_thread: Optional[threading.Thread] = None
+        self._listener_stop: Optional[threading.Event] = None
+        self._listener_stats = {
+            "messages": 0,
+            "empty_polls": 0,
+            "decode_failures": 0,
+            "restarts": 0,
+        }
+        self._rate_window_start = time.monotonic()
+        self._rate_window_messages = 0
+        self._messages_per_sec = 0.0
+        self._local_port = 0
+
+    def open(self) -> None:
+        """
+        加载并初始化 native 库、启动监听线程，已打开时直接返回
+
+        首次调用时解析并加载动态库，会阻塞，事件循环中使用 async_open。
+        版本、编译时间和局域网端口在这里读取并缓存，之后的查询不再调用 native 库
+        """
+        with self._open_lock:
+            if self._is_open:
+                return
+            if self._native_executor.is_shutdown:
+                self._native_executor = NativeExecutor(default_timeout=VHOME_CALL_TIMEOUT)
+            vhome_lib.vhome_init(self._url.encode("utf-8"))
+            self._load_info()
+            self.start_data_listener()
+            self._is_open = True
+
+    def close(self, timeout: float = LISTENER_JOIN_TIMEOUT) -> None:
+        """
+        停止监听线程并释放 native 资源
+
+        vhome_deinit 在 native 线程中排在仍在执行的调用之后执行，随后关闭 native 线程；
+        等待监听线程退出最多 timeout 秒。关闭后 native 调用直接返回失败值，需显式 open/async_open
+        """
+        with self._open_lock:
+            if not self._is_open:
+                return
+            self._is_open = False
+            if self._listener_stop is not None:
+                self._listener_stop.set()
+            try:
+                self._native_executor.run(vhome_lib.vhome_deinit, timeout=timeout)
+            except Exception as e:
+                _LOGGER.warning(f"vhome_deinit did not finish on native thread: {e}")
+            self._native_executor.shutdown()
+            thread = self._listener_thread
+            self._listener_thread = None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                _LOGGER.warning("data listener did not exit in %.1fs", timeout)
+        _LOGGER.info("VHome closed")
+
+    async def async_open(self) -> None:
+        """在线程池中执行 open，不阻塞事件循环"""
+        if not self._is_open:
+            await asyncio.get_running_loop().run_in_executor(None, self.open)
+
+    async def async_wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """与 RemoteVHome 一致的接口，本进程的 native 库在 open 时已初始化"""
+        return self._is_open
+
+    async def async_close(self) -> None:
+        self.stop_loop_monitor()
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def get_listener_stats(self) -> dict:
+        stats = dict(self._listener_stats)
+        stats["messages_per_sec"] = round(self._messages_per_sec, 2)
+        stats["alive"] = (
+            self._listener_thread is not None and self._listener_thread.is_alive()
         )
-        vhome_lib.vhome_init(url.encode("utf-8"))
-        self.start_data_listener()
+        return stats
+
+    def attach_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        绑定回调执行的事件循环，之后所有回调都在该事件循环线程中执行
+
+        绑定前收到的消息会被缓存，绑定后统一投递
+        """
+        self._dispatcher.attach_loop(loop)
+
+    def detach_loop(self) -> None:
+        self._dispatcher.detach_loop()
+
+    def register_handler(self, message_cls: type, handler: Callable) -> None:
+        """注册消息处理函数，处理函数在事件循环线程中执行"""
+        self._router.register_handler(message_cls, handler)
+
+    def register_decoder(self, msg_type, act: Optional[str], decoder: Callable) -> None:
+        """注册 native 消息解码函数，解码函数在监听线程中执行"""
+        self._router.register_decoder(msg_type, act, decoder)
+
+    def get_dispatch_stats(self) -> dict:
+        return self._dispatcher.stats()
+
+    def start_loop_monitor(self, loop: asyncio.AbstractEventLoop) -> None:
+        """开始统计事件循环延迟，需在事件循环线程中调用"""
+        self._loop_lag_monitor.start(loop)
+
+    def stop_loop_monitor(self) -> None:
+        self._loop_lag_monitor.stop()
+
+    def get_loop_lag_stats(self) -> dict:
+        return self._loop_lag_monitor.stats()
+
+    def get_native_executor_stats(self) -> dict:
+        return self._native_executor.stats()
+
+    def get_native_call_metrics(self) -> NativeCallMetrics:
+        return self._metrics
+
+    def get_diagnostics(self) -> dict:
+        """汇总 native 调用、线程池、监听线程、回调分发和事件循环延迟的运行数据"""
+        return {
+            "backend": type(vhome_lib).__name__,
+            "codec": codec.BACKEND,
+            "native_calls": self._metrics.snapshot(),
+            "executor": self._native_executor.stats(),
+            "listener": self.get_listener_stats(),
+            "dispatch": self._dispatcher.stats(),
+            "loop_lag": self._loop_lag_monitor.stats(),
+        }
+
+    def _record_call(self, name: str, start: float, result) -> None:
+        """记录一次 native 调用，JSON 结果取其中的 code 作为返回码"""
+        if isinstance(result, dict):
+            code = result.get("code", "none")
+        elif result is None:
+            code = "null"
+        else:
+            code = result
+        self._metrics.record(name, time.perf_counter() - start, code)
+
+    async def _async_native_call(
+        self,
+        func: Callable[..., Any],
+        *args,
+        fail_result: Any = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        在专用 native 线程中执行阻塞调用
+
+        Args:
+         func: 同步的 native 调用封装
+         fail_result: 超时或异常时的返回值
+         timeout: 超时时间(秒)，None 使用默认值
+
+        Returns:
+         func 的返回值，失败时返回 fail_result
+        """
+        if not self._is_open:
+            # 关闭后不隐式重新初始化，避免卸载期间的调用在事件循环中重新 vhome_init
+            _LOGGER.warning(f"VHome closed, native call {func.__name__} skipped")
+            return fail_result
+        try:
+            return await self._native_executor.async_run(
+                func, *args, timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            return fail_result
+        except Exception as e:
+            _LOGGER.error(f"native call {func.__name__} failed: {e}")
+            return fail_result
 
     def start_data_listener(self):
-        thread = threading.Thread(target=self._data_from_c_to_python)
+        self._listener_stop = threading.Event()
+        thread = threading.Thread(
+            target=self._data_from_c_to_python,
+            args=(self._listener_stop,),
+            name="vhome_listener",
+        )
         thread.daemon = True  # 设置为守护线程，以便在主线程结束时自动退出
         thread.start()
+        self._listener_thread = thread
 
     @ctypes.CFUNCTYPE(None, ctypes.c_char_p)
     def log_debug_callback(msg_ptr):
@@ -253,71 +645,72 @@ class VHome:
         msg = msg_ptr.decode("utf-8")
         _LOGGER.error("[Native] %s", msg)
 
-    """
-    处理默认状态回调
-
-    Args:
-     state (dict): 状态信息字典
-
-    Returns:
-     None
-    """
-
-    def _default_on_state_callback(state: dict):
-        """默认回调处理"""
-        _LOGGER.warning(f"[WARN] 未注册的回调被触发，参数: {state}")
-
-    def _default_on_data_received_callback(data: dict):
-        """默认回调处理"""
-        _LOGGER.warning(f"[WARN] 未注册的回调被触发，参数: {data}")
-
-    def _default_on_local_event_callback(state: dict):
-        """默认回调处理"""
-        _LOGGER.warning(f"[WARN] 未注册的回调被触发，参数: {state}")
-
-    def _data_from_c_to_python(self):
-        """获取从C传过来的数据"""
+    def _data_from_c_to_python(self, stop_event: threading.Event):
+        """获取从C传过来的数据，轮询异常退出后自动重启，直到 stop_event 被置位"""
         _LOGGER.info("开始监听C传过来的数据:_data_from_c_to_python")
-        while True:
+        while not stop_event.is_set():
+            try:
+                self._poll_native_data(stop_event)
+            except Exception as e:
+                self._listener_stats["restarts"] += 1
+                _LOGGER.error(f"data listener crashed, restart later: {e}")
+                stop_event.wait(LISTENER_RESTART_DELAY)
+        _LOGGER.info("停止监听C传过来的数据")
+
+    def _poll_native_data(self, stop_event: threading.Event):
+        stats = self._listener_stats
+        backoff = LISTENER_IDLE_BACKOFF_MIN
+        while not stop_event.is_set():
             result = vhome_lib.data_to_python()
-            if result:
-                result_str = ctypes.cast(result, c_char_p).value.decode("utf-8")
-                vhome_lib.vhome_memory_free(result)
-                # _LOGGER.info(f"data from so: {result_str}")
-                result_dict = json.loads(result_str)
-                if result_dict["type"] == 0:
-                    del result_dict["type"]
-                    self._on_state(result_dict)
-                elif result_dict["type"] == 1:
-                    del result_dict["type"]
-                    self._on_data(result_dict)
-                elif result_dict["type"] == 2:
-                    # 配网数据
-                    _LOGGER.info(f"client sharkhand success : {result_dict}")
-                    self._on_local_event(result_dict)
+            if not result:
+                # 未阻塞直接返回空时逐步退避，避免空转占满 CPU
+                stats["empty_polls"] += 1
+                stop_event.wait(backoff)
+                backoff = min(backoff * 2, LISTENER_IDLE_BACKOFF_MAX)
+                continue
+            backoff = LISTENER_IDLE_BACKOFF_MIN
+            try:
+                messages = self._router.decode(_take_native_json(result))
+            except Exception as e:
+                stats["decode_failures"] += 1
+                _LOGGER.warning(f"decode native data failed: {e}")
+                continue
+            stats["messages"] += 1
+            self._update_message_rate()
+            for message in messages:
+                self._dispatcher.submit(message)
+
+    def _update_message_rate(self):
+        self._rate_window_messages += 1
+        now = time.monotonic()
+        elapsed = now - self._rate_window_start
+        if elapsed >= LISTENER_RATE_WINDOW:
+            self._messages_per_sec = self._rate_window_messages / elapsed
+            self._rate_window_start = now
+            self._rate_window_messages = 0
 
     def _get_bcode(self, mac: str) -> dict:
         """获取绑定码"""
         result_dict = {}
+        start = time.perf_counter()
         result = vhome_lib.vhome_get_bind_code_by_mac(mac.encode("utf-8"))
         if result:
-            result_str = ctypes.cast(result, c_char_p).value.decode("utf-8")
-            _LOGGER.info(f"[INFO] 获取绑定码结果 : {result_str}")
-            vhome_lib.vhome_memory_free(result)
-            result_dict = json.loads(result_str)
+            result_dict = _take_native_json(result)
+            _LOGGER.info("[INFO] 获取绑定码结果 : %s", result_dict)
+        self._record_call("vhome_get_bind_code_by_mac", start, result_dict or None)
         return result_dict
 
     def _bind(self, bcode: str, mac: str, en: str) -> dict:
         """设备绑定"""
         result_dict = {}
+        start = time.perf_counter()
         result = vhome_lib.vhome_bind(
             bcode.encode("utf-8"), mac.encode("utf-8"), en.encode("utf-8")
         )
         if result:
-            result_str = ctypes.cast(result, c_char_p).value.decode("utf-8")
-            _LOGGER.info(f"设备绑定结果 : {result_str}")
-            vhome_lib.vhome_memory_free(result)
-            result_dict = json.loads(result_str)
+            result_dict = _take_native_json(result)
+            _LOGGER.info("设备绑定结果 : %s", result_dict)
+        self._record_call("vhome_bind", start, result_dict or None)
         return result_dict
 
     def _sub_devices_register(
@@ -325,31 +718,33 @@ class VHome:
     ) -> dict:
         result_dict = {}
         try:
-            json_sub_devices = json.dumps(sub_devices)
+            json_sub_devices = codec.dumps(sub_devices)
+            start = time.perf_counter()
             result = vhome_lib.vhome_sub_devices_register(
                 bcode.encode("utf-8"),
                 dn.encode("utf-8"),
                 mac.encode("utf-8"),
-                json_sub_devices.encode("utf-8"),
+                json_sub_devices,
             )
         except Exception as e:
             _LOGGER.warning( f"json_sub_devices fail <{e}>")
             return result_dict
             
         if result:
-            result_str = ctypes.cast(result, c_char_p).value.decode("utf-8")
-            _LOGGER.info(f"子设备注册结果 : {result_str}")
-            vhome_lib.vhome_memory_free(result)
-            result_dict = json.loads(result_str)
+            result_dict = _take_native_json(result)
+            _LOGGER.info("子设备注册结果 : %s", result_dict)
         else:
             _LOGGER.warning("Sub_devices_register result is Null")
+        self._record_call("vhome_sub_devices_register", start, result_dict or None)
         return result_dict
 
     def _connect(self, host: str, port: int, dn: str, user_code: str) -> int:
         result = 0
+        start = time.perf_counter()
         result = vhome_lib.vhome_connect(
             host.encode("utf-8"), port, user_code.encode("utf-8"), dn.encode("utf-8")
         )
+        self._record_call("vhome_connect", start, result)
         return result
 
     def _disconnect(self, dn: str) -> int:
@@ -359,9 +754,10 @@ class VHome:
 
     def _data_upload(self, dn: str, data: list[dict]) -> int:
         result = 0
-        result = vhome_lib.vhome_data_upload(
-            dn.encode("utf-8"), json.dumps(data).encode("utf-8")
-        )
+        payload = codec.dumps(data)
+        start = time.perf_counter()
+        result = vhome_lib.vhome_data_upload(dn.encode("utf-8"), payload)
+        self._record_call("vhome_data_upload", start, result)
         return result
 
     def _network_shakehand_task_start(self):
@@ -373,10 +769,11 @@ class VHome:
     def _send_bind_code_to_app(self, bindCode: dict) -> int:
         _LOGGER.debug(f"_send_bind_code_to_app:{bindCode}")
         try:
-            json_bindCode = json.dumps(bindCode)
-            return vhome_lib.vhome_send_bind_code_to_app(
-            json_bindCode.encode("utf-8")
-        )
+            json_bindCode = codec.dumps(bindCode)
+            start = time.perf_counter()
+            result = vhome_lib.vhome_send_bind_code_to_app(json_bindCode)
+            self._record_call("vhome_send_bind_code_to_app", start, result)
+            return result
         except Exception as e:
             _LOGGER.warning( f"<json error: {e}>") 
             return -1
@@ -387,7 +784,7 @@ class VHome:
         Args:
             mac: 网卡物理地址(mac)
         """
-        return self._get_bcode(mac)
+        return await self._async_native_call(self._get_bcode, mac, fail_result={})
 
     async def async_bind(self, bcode: str, mac: str, en: str) -> dict:
         """绑定设备.
@@ -400,18 +797,28 @@ class VHome:
             绑定设备结果
 
         """
-        return self._bind(bcode, mac, en)
+        return await self._async_native_call(
+            self._bind, bcode, mac, en, fail_result={}
+        )
 
     async def async_send_bind_code_to_app(self, bcode: dict) -> int:
-        return self._send_bind_code_to_app(bcode)
+        return await self._async_native_call(
+            self._send_bind_code_to_app, bcode, fail_result=-1
+        )
 
     async def async_sub_devices_register(
         self, bcode: str, dn: str, mac: str, sub_devices: list[dict]
     ) -> dict:
         """子设备注册"""
         result_devices = []
-        register_sub_device_result = self._sub_devices_register(
-            bcode, dn, mac, sub_devices
+        register_sub_device_result = await self._async_native_call(
+            self._sub_devices_register,
+            bcode,
+            dn,
+            mac,
+            sub_devices,
+            fail_result={},
+            timeout=VHOME_REGISTER_TIMEOUT,
         )
         if (
             register_sub_device_result is None
@@ -434,7 +841,9 @@ class VHome:
             }
 
     async def async_data_upload(self, dn: str, data: list[dict]) -> int:
-        return self._data_upload(dn, data)
+        return await self._async_native_call(
+            self._data_upload, dn, data, fail_result=-1, timeout=VHOME_UPLOAD_TIMEOUT
+        )
 
     async def async_connect(self, host: str, port: int, dn: str, user_code: str) -> int:
         """
@@ -447,7 +856,9 @@ class VHome:
          0:接口调用成功，最终连接成功需要通过状态回调通知获取:{'state': 1, 'connect_result': 0}
          其他:失败
         """
-        return self._connect(host, port, dn, user_code)
+        return await self._async_native_call(
+            self._connect, host, port, dn, user_code, fail_result=-1
+        )
 
     async def async_disconnect(self, dn: str) -> int:
         """
@@ -455,30 +866,38 @@ class VHome:
         Args:
          dn (str): 设备的唯一标识符
         """
-        return self._disconnect(dn)
+        return await self._async_native_call(self._disconnect, dn, fail_result=-1)
+
+    def _load_info(self) -> None:
+        """在 open 中读取库信息，需已加载 native 库"""
+        for attr, func in (
+            ("_version", vhome_lib.vhome_so_version),
+            ("_build_time", vhome_lib.vhome_so_build_time),
+        ):
+            c_type_result = func()
+            result_str = ""
+            if c_type_result:
+                result_str = ctypes.cast(c_type_result, c_char_p).value.decode("utf-8")
+            setattr(self, attr, result_str)
+        self._local_port = vhome_lib.get_local_net_target_port()
 
     def version(self) -> str:
-        c_type_result = vhome_lib.vhome_so_version()
-        result_str = ""
-        if c_type_result:
-            result_str = ctypes.cast(c_type_result, c_char_p).value.decode("utf-8")
-        return result_str
+        """open 之前返回空字符串"""
+        return self._version or ""
 
     def build_time(self) -> str:
-        c_type_result = vhome_lib.vhome_so_build_time()
-        result_str = ""
-        if c_type_result:
-            result_str = ctypes.cast(c_type_result, c_char_p).value.decode("utf-8")
-        return result_str
+        """open 之前返回空字符串"""
+        return self._build_time or ""
 
     def get_local_net_target_port(self) -> int:
-        return vhome_lib.get_local_net_target_port()
+        """open 之前返回 0"""
+        return self._local_port
 
     async def network_shakehand_task_start(self) -> None:
         _LOGGER.warning("Start network_shakehand ... ")
-        self._network_shakehand_task_start()
+        await self._async_native_call(self._network_shakehand_task_start)
         return
 
     async def network_shakehand_task_stop(self) -> None:
         _LOGGER.warning("Stop network_shakehand ... ")
-        self._network_shakehand_task_stop()
+        await self._async_native_call(self._network_shakehand_task_stop)
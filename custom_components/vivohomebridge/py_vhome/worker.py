@@ -0,0 +1,191 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+libvhome 子进程入口
+
+由 RemoteVHome 通过 `python -m py_vhome.worker <fd>` 启动，fd 为 socketpair 的一端。
+子进程内按原方式加载 libvhome 并运行 VHome，native 崩溃或卡死只影响子进程。
+
+帧格式: 4 字节大端长度 + codec 编码的 JSON
+ 请求  {"id": 1, "method": "async_connect", "args": [...]}，id 为 None 时不回复
+ 回复  {"id": 1, "result": ...} 或 {"id": 1, "error": "..."}
+ 消息  {"event": {...}}，native 原始消息，由父进程解码
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import struct
+import sys
+from typing import Any, Optional
+
+from . import codec
+from .messages import MessageRouter
+from .vhome import VHome
+
+_LOGGER = logging.getLogger("py_vhome")
+
+FRAME_HEADER = struct.Struct(">I")
+# 单帧上限，超出视为协议错误
+FRAME_MAX_SIZE = 16 * 1024 * 1024
+
+METHOD_INIT = "init"
+METHOD_DIAGNOSTICS = "diagnostics"
+# 可被父进程调用的 VHome 异步接口
+ASYNC_METHODS = frozenset(
+    (
+        "async_get_bcode",
+        "async_bind",
+        "async_send_bind_code_to_app",
+        "async_sub_devices_register",
+        "async_data_upload",
+        "async_connect",
+        "async_disconnect",
+        "network_shakehand_task_start",
+        "network_shakehand_task_stop",
+    )
+)
+
+
+def encode_frame(obj: Any) -> bytes:
+    payload = codec.dumps(obj)
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:], size - received)
+        if count == 0:
+            return None
+        received += count
+    return bytes(buffer)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Any]:
+    """
+    阻塞读取一帧
+
+    Returns:
+     解码后的对象，对端关闭时返回 None
+    """
+    header = _recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    (size,) = FRAME_HEADER.unpack(header)
+    if size > FRAME_MAX_SIZE:
+        raise ValueError(f"frame too large: {size}")
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    return codec.loads(payload)
+
+
+class _ForwardingRouter(MessageRouter):
+    """子进程不解码 native 消息，原样转发给父进程"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        super().__init__()
+        self._writer = writer
+
+    def decode(self, raw: dict) -> list:
+        return [raw]
+
+    def dispatch(self, message: Any) -> None:
+        if not self._writer.is_closing():
+            self._writer.write(encode_frame({"event": message}))
+
+
+class _Worker:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+        self._vhome: Optional[VHome] = None
+
+    def _reply(self, request_id, **body) -> None:
+        if request_id is None or self._writer.is_closing():
+            return
+        body["id"] = request_id
+        self._writer.write(encode_frame(body))
+
+    def _init(self, url: str) -> dict:
+        if self._vhome is None:
+            self._vhome = VHome(url, router=_ForwardingRouter(self._writer))
+            # 子进程只服务一个网桥，直接在本进程的事件循环中初始化
+            self._vhome.open()
+            self._vhome.attach_loop(asyncio.get_running_loop())
+        return {
+            "pid": os.getpid(),
+            "version": self._vhome.version(),
+            "build_time": self._vhome.build_time(),
+            "local_port": self._vhome.get_local_net_target_port(),
+        }
+
+    async def handle(self, request: dict) -> None:
+        request_id = request.get("id")
+        method = request.get("method")
+        args = request.get("args") or []
+        try:
+            if method == METHOD_INIT:
+                result = self._init(*args)
+            elif self._vhome is None:
+                raise RuntimeError("worker not initialized")
+            elif method == METHOD_DIAGNOSTICS:
+                result = self._vhome.get_diagnostics()
+            elif method in ASYNC_METHODS:
+                result = await getattr(self._vhome, method)(*args)
+            else:
+                raise ValueError(f"unknown method: {method}")
+        except Exception as e:
+            _LOGGER.error(f"worker call {method} failed: {e}")
+            self._reply(request_id, error=str(e))
+            return
+        self._reply(request_id, result=result)
+
+    def close(self) -> None:
+        if self._vhome is not None:
+            self._vhome.close()
+            self._vhome = None
+
+
+async def _serve(sock: socket.socket) -> None:
+    reader, writer = await asyncio.open_connection(sock=sock)
+    worker = _Worker(writer)
+    tasks: set[asyncio.Task] = set()
+    try:
+        while True:
+            try:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                (size,) = FRAME_HEADER.unpack(header)
+                if size > FRAME_MAX_SIZE:
+                    raise ValueError(f"frame too large: {size}")
+                request = codec.loads(await reader.readexactly(size))
+            except asyncio.IncompleteReadError:
+                # 父进程退出或主动关闭
+                break
+            # 每个请求独立执行，慢接口不阻塞后续请求的读取
+            task = asyncio.create_task(worker.handle(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    finally:
+        worker.close()
+        writer.close()
+
+
+def main(argv: Optional[list] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    logging.basicConfig(
+        format="[%(asctime)s][%(levelname)s][%(name)s][worker] %(message)s",
+        level=os.environ.get("VHOME_WORKER_LOG_LEVEL", "WARNING"),
+    )
+    sock = socket.socket(fileno=int(argv[0]))
+    asyncio.run(_serve(sock))
+
+
+if __name__ == "__main__":
+    main()
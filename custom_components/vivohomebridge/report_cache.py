@@ -0,0 +1,86 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+from typing import Optional
+
+_MISSING = object()
+
+
+class LastReportCache:
+    """
+    记录每个设备最近一次提交上报的属性值，只上报值发生变化的属性
+
+    提交时即记录(update)，比较对象包含仍在上传中的值，上传途中值被改回也能再次上报；
+    上传失败时调用 discard 撤销这次提交的记录。
+    target_id 为 None 表示网桥自身。重连或全量刷新后需调用 invalidate/clear，
+    保证云端拿到完整状态。
+    """
+
+    def __init__(self):
+        self._last: dict[Optional[str], dict] = {}
+        self._reports = 0
+        self._sent = 0
+        self._suppressed = 0
+        self._dropped_keys = 0
+        self._discarded = 0
+
+    def changed(self, target_id: Optional[str], props: dict) -> dict:
+        """
+        过滤掉与上次上报值相同的属性
+
+        Returns:
+         需要上报的属性，空字典表示无需上报
+        """
+        self._reports += 1
+        last = self._last.get(target_id)
+        if not last:
+            changed = props
+        else:
+            changed = {
+                key: value
+                for key, value in props.items()
+                if last.get(key, _MISSING) != value
+            }
+        self._dropped_keys += len(props) - len(changed)
+        if changed:
+            self._sent += 1
+        else:
+            self._suppressed += 1
+        return changed
+
+    def update(self, target_id: Optional[str], props: dict) -> None:
+        """提交上报时记录属性值"""
+        self._last.setdefault(target_id, {}).update(props)
+
+    def discard(self, target_id: Optional[str], props: dict) -> None:
+        """
+        上传失败后撤销记录，之后的上报会重新发送这些属性
+
+        只移除仍等于本次提交值的属性，已被后续提交覆盖的保留
+        """
+        last = self._last.get(target_id)
+        if not last:
+            return
+        self._discarded += 1
+        for key, value in props.items():
+            if last.get(key, _MISSING) == value:
+                del last[key]
+
+    def invalidate(self, target_id: Optional[str]) -> None:
+        self._last.pop(target_id, None)
+
+    def clear(self) -> None:
+        self._last.clear()
+
+    def stats(self) -> dict:
+        return {
+            "devices": len(self._last),
+            "reports": self._reports,
+            "sent": self._sent,
+            "suppressed": self._suppressed,
+            "dropped_keys": self._dropped_keys,
+            "discarded": self._discarded,
+        }
@@ -0,0 +1,117 @@
+"""
+Copyright 2024 vivo Mobile Communication Co., Ltd.
+Licensed under the Apache License, Version 2.0 (the "License");
+
+   http://www.apache.org/licenses/LICENSE-2.0
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN, VIVO_BRIDGE_DEVICE_NAME_CONFIG_KEY
+from .device_manager import DeviceManager
+
+SCAN_INTERVAL = timedelta(seconds=30)
+_UPLOAD = "vhome_data_upload"
+
+
+def _upload_failures(device_manager: DeviceManager) -> int:
+    metrics = device_manager.get_vhome().get_native_call_metrics()
+    return metrics.call_count(_UPLOAD) - metrics.call_count(_UPLOAD, 0)
+
+
+@dataclass(frozen=True, kw_only=True)
+class VHomeDiagnosticSensorDescription(SensorEntityDescription):
+    value_fn: Callable[[DeviceManager], float | int | None]
+
+
+DIAGNOSTIC_SENSORS: tuple[VHomeDiagnosticSensorDescription, ...] = (
+    VHomeDiagnosticSensorDescription(
+        key="upload_latency_p50",
+        name="VHome upload latency p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda dm: dm.get_vhome().get_native_call_metrics().percentile(_UPLOAD, 50),
+    ),
+    VHomeDiagnosticSensorDescription(
+        key="upload_latency_p99",
+        name="VHome upload latency p99",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda dm: dm.get_vhome().get_native_call_metrics().percentile(_UPLOAD, 99),
+    ),
+    VHomeDiagnosticSensorDescription(
+        key="upload_calls",
+        name="VHome upload calls",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda dm: dm.get_vhome().get_native_call_metrics().call_count(_UPLOAD),
+    ),
+    VHomeDiagnosticSensorDescription(
+        key="upload_failures",
+        name="VHome upload failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=_upload_failures,
+    ),
+    VHomeDiagnosticSensorDescription(
+        key="loop_lag_max",
+        name="VHome event loop lag max",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda dm: dm.get_vhome().get_loop_lag_stats()["max_ms"],
+    ),
+    VHomeDiagnosticSensorDescription(
+        key="inbound_messages_rate",
+        name="VHome inbound messages per second",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda dm: dm.get_vhome().get_listener_stats()["messages_per_sec"],
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the diagnostic sensors, disabled by default."""
+    async_add_entities(
+        VHomeDiagnosticSensor(entry, description) for description in DIAGNOSTIC_SENSORS
+    )
+
+
+class VHomeDiagnosticSensor(SensorEntity):
+    entity_description: VHomeDiagnosticSensorDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self, entry: ConfigEntry, description: VHomeDiagnosticSensorDescription
+    ) -> None:
+        self.entity_description = description
+        self._entry_id = entry.entry_id
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        # 与 DeviceManager.create_update_service 注册的网桥设备一致，未绑定时网桥设备尚不存在
+        device_name = entry.data.get(VIVO_BRIDGE_DEVICE_NAME_CONFIG_KEY)
+        if device_name:
+            self._attr_device_info = DeviceInfo(
+                identifiers={(DOMAIN, entry.entry_id, device_name)}
+            )
+
+    async def async_update(self) -> None:
+        device_manager = DeviceManager.find(self._entry_id)
+        self._attr_native_value = (
+            None
+            if device_manager is None
+            else self.entity_description.value_fn(device_manager)
+        )
@@ -0,0 +1,203 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Mapping, Optional
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from .v_attribute import VIVO_ATTR_NAME_ONLINE
+from .v_utils.vlog import VLog
+
+_TAG = "SensorPolicy"
+
+
+@dataclass(frozen=True)
+class SensorReportPolicy:
+    """
+    数值传感器的上报策略
+
+    Args:
+     abs_deadband: 与上次上报值的差小于该值时不上报
+     rel_deadband: 相对上次上报值的变化比例小于该值时不上报，与 abs_deadband 取较大者
+     min_interval: 两次上报的最小间隔(秒)，期间的有效变化延后到间隔结束上报
+     max_silence: 最长静默时间(秒)，被死区压住的最新值最迟在此时上报
+    """
+
+    abs_deadband: float = 0.0
+    rel_deadband: float = 0.0
+    min_interval: float = 0.0
+    max_silence: float = 600.0
+
+    def exceeds(self, old, new) -> bool:
+        """new 相对 old 是否是需要上报的变化，非数值按是否相等判断"""
+        try:
+            old_num = float(old)
+            new_num = float(new)
+        except (TypeError, ValueError):
+            return old != new
+        delta = abs(new_num - old_num)
+        return delta > 0 and delta >= max(
+            self.abs_deadband, self.rel_deadband * abs(old_num)
+        )
+
+
+DEFAULT_SENSOR_POLICIES: Mapping[str, SensorReportPolicy] = {
+    SensorDeviceClass.TEMPERATURE: SensorReportPolicy(
+        abs_deadband=0.2, min_interval=10, max_silence=600
+    ),
+    SensorDeviceClass.HUMIDITY: SensorReportPolicy(
+        abs_deadband=1.0, min_interval=10, max_silence=600
+    ),
+    SensorDeviceClass.ILLUMINANCE: SensorReportPolicy(
+        abs_deadband=5.0, rel_deadband=0.1, min_interval=5, max_silence=600
+    ),
+}
+
+
+class _SensorState:
+    __slots__ = ("sent", "sent_at", "held", "timer")
+
+    def __init__(self, sent: dict, sent_at: float):
+        self.sent = dict(sent)
+        self.sent_at = sent_at
+        self.held: dict = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class SensorReportFilter:
+    """
+    按 device_class 的上报策略过滤数值传感器的状态上报
+
+    作用于转换后的 vivo 属性：死区内的变化和最小间隔内的变化先暂存，
+    间隔到期或达到最长静默时间时由定时器通过 emit 发出。在线状态变化总是立即上报。
+    需在事件循环中调用。
+
+    Args:
+     emit: 发出暂存的上报 emit(dn, v_attrs)
+     policies: device_class -> SensorReportPolicy，未配置的类型不过滤
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str, dict], None],
+        policies: Mapping[str, SensorReportPolicy] = DEFAULT_SENSOR_POLICIES,
+    ):
+        self._emit = emit
+        self._policies = dict(policies)
+        self._states: dict[str, _SensorState] = {}
+        self._stats: dict[str, dict] = {}
+
+    def _count(self, device_class: str, name: str) -> None:
+        stats = self._stats.setdefault(
+            device_class,
+            {"readings": 0, "sent": 0, "suppressed": 0, "deferred": 0, "heartbeat": 0},
+        )
+        stats[name] += 1
+
+    def filter(self, dn: str, device_class, v_attrs: dict) -> dict | None:
+        """
+        Returns:
+         需要立即上报的属性，None 表示暂存
+        """
+        policy = self._policies.get(device_class)
+        if policy is None:
+            return v_attrs
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        self._count(device_class, "readings")
+        state = self._states.get(dn)
+        if state is None or state.sent.get(VIVO_ATTR_NAME_ONLINE) != v_attrs.get(
+            VIVO_ATTR_NAME_ONLINE
+        ):
+            return self._send_now(dn, device_class, v_attrs, now)
+
+        state.held.update(v_attrs)
+        changed = {
+            key: value
+            for key, value in state.held.items()
+            if policy.exceeds(state.sent.get(key), value)
+        }
+        elapsed = now - state.sent_at
+        if changed and elapsed >= policy.min_interval:
+            return self._send_now(dn, device_class, v_attrs, now)
+
+        self._count(device_class, "suppressed")
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        if changed:
+            state.timer = loop.call_later(
+                policy.min_interval - elapsed,
+                self._send_held, dn, device_class, "deferred",
+            )
+        elif any(state.sent.get(key) != value for key, value in state.held.items()):
+            state.timer = loop.call_later(
+                max(policy.max_silence - elapsed, 0),
+                self._send_held, dn, device_class, "heartbeat",
+            )
+        return None
+
+    def _send_now(self, dn: str, device_class, v_attrs: dict, now: float) -> dict:
+        state = self._states.get(dn)
+        if state is None:
+            state = _SensorState(v_attrs, now)
+            self._states[dn] = state
+        else:
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+            state.held.update(v_attrs)
+            v_attrs = state.held
+            state.held = {}
+            state.sent.update(v_attrs)
+            state.sent_at = now
+        self._count(device_class, "sent")
+        return v_attrs
+
+    def _send_held(self, dn: str, device_class, reason: str) -> None:
+        state = self._states.get(dn)
+        if state is None or not state.held:
+            return
+        state.timer = None
+        v_attrs = state.held
+        state.held = {}
+        state.sent.update(v_attrs)
+        state.sent_at = asyncio.get_running_loop().time()
+        self._count(device_class, reason)
+        VLog.info(_TAG, "[%s] %s %s", reason, dn, v_attrs)
+        try:
+            self._emit(dn, v_attrs)
+        except Exception as e:
+            VLog.warning(_TAG, "[%s] %s emit error:%s", reason, dn, e)
+
+    def forget(self, dn: str) -> None:
+        """
+        丢弃设备的上报记录和暂存的变化，用于设备离线等绕过过滤器的上报之后，
+        使该设备的下一次上报立即发出
+        """
+        state = self._states.pop(dn, None)
+        if state is not None and state.timer is not None:
+            state.timer.cancel()
+
+    def flush(self) -> None:
+        """立即发出所有暂存的上报"""
+        for dn, state in list(self._states.items()):
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+            if state.held:
+                v_attrs = state.held
+                state.held = {}
+                state.sent.update(v_attrs)
+                try:
+                    self._emit(dn, v_attrs)
+                except Exception as e:
+                    VLog.warning(_TAG, "[flush] %s emit error:%s", dn, e)
+
+    def stats(self) -> dict:
+        return {str(device_class): dict(stats) for device_class, stats in self._stats.items()}
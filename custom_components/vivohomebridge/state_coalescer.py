@@ -0,0 +1,120 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+import asyncio
+from typing import Callable, Iterable, Optional
+
+from .const import STATE_REPORT_MAX_LATENCY, STATE_REPORT_QUIET_WINDOW
+from .v_utils.vlog import VLog
+
+_TAG = "StateCoalescer"
+
+
+class _PendingReport:
+    __slots__ = ("v_attrs", "first_at", "timer")
+
+    def __init__(self, v_attrs: dict, first_at: float):
+        self.v_attrs = dict(v_attrs)
+        self.first_at = first_at
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class StateReportCoalescer:
+    """
+    按设备合并短时间内的多次状态上报
+
+    同一设备的上报在静默窗口内不断合并(后写覆盖)，窗口内没有新变化或距首次变化超过
+    max_latency 时发出一次合并后的上报。urgent_keys 中的属性(在线、开关)与上次发出的值
+    不同时，连同已合并的属性立即上报。需在事件循环中调用。
+
+    Args:
+     emit: 发出上报 emit(dn, v_attrs)
+     quiet_window (float): 静默窗口(秒)，<=0 时不合并
+     max_latency (float): 首次变化到上报的最长延迟(秒)
+     urgent_keys: 变化时立即上报的属性名
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[str, dict], None],
+        quiet_window: float = STATE_REPORT_QUIET_WINDOW,
+        max_latency: float = STATE_REPORT_MAX_LATENCY,
+        urgent_keys: Iterable[str] = (),
+    ):
+        self._emit = emit
+        self._quiet_window = quiet_window
+        self._max_latency = max(max_latency, quiet_window)
+        self._urgent_keys = tuple(urgent_keys)
+        self._pending: dict[str, _PendingReport] = {}
+        self._last_urgent: dict[str, dict] = {}
+        self._reports = 0
+        self._merged = 0
+        self._urgent = 0
+        self._emitted = 0
+
+    def submit(self, dn: str, v_attrs: dict) -> None:
+        """提交设备 dn 的一次状态变化"""
+        loop = asyncio.get_running_loop()
+        self._reports += 1
+        pending = self._pending.get(dn)
+        if pending is None:
+            pending = _PendingReport(v_attrs, loop.time())
+            self._pending[dn] = pending
+        else:
+            pending.v_attrs.update(v_attrs)
+            self._merged += 1
+            if pending.timer is not None:
+                pending.timer.cancel()
+
+        if self._is_urgent(dn, v_attrs):
+            self._urgent += 1
+            self._flush(dn)
+            return
+        if self._quiet_window <= 0:
+            self._flush(dn)
+            return
+        delay = min(
+            self._quiet_window, pending.first_at + self._max_latency - loop.time()
+        )
+        pending.timer = loop.call_later(max(delay, 0), self._flush, dn)
+
+    def _is_urgent(self, dn: str, v_attrs: dict) -> bool:
+        last = self._last_urgent.get(dn)
+        for key in self._urgent_keys:
+            if key in v_attrs and (last is None or last.get(key) != v_attrs[key]):
+                return True
+        return False
+
+    def _flush(self, dn: str) -> None:
+        pending = self._pending.pop(dn, None)
+        if pending is None:
+            return
+        if pending.timer is not None:
+            pending.timer.cancel()
+        v_attrs = pending.v_attrs
+        last = self._last_urgent.setdefault(dn, {})
+        for key in self._urgent_keys:
+            if key in v_attrs:
+                last[key] = v_attrs[key]
+        self._emitted += 1
+        try:
+            self._emit(dn, v_attrs)
+        except Exception as e:
+            VLog.warning(_TAG, "[flush] %s emit error:%s", dn, e)
+
+    def flush(self) -> None:
+        """立即发出所有待上报的合并结果"""
+        for dn in list(self._pending):
+            self._flush(dn)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "reports": self._reports,
+            "merged": self._merged,
+            "urgent": self._urgent,
+            "emitted": self._emitted,
+        }
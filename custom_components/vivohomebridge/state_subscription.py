@@ -0,0 +1,132 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+from typing import Callable, Coroutine, Iterator, Optional
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    callback,
+)
+
+from .v_utils.vlog import VLog
+
+_TAG = "StateSubscription"
+
+
+class EntityStateSubscription:
+    """
+    所有接入实体共用一个 EVENT_STATE_CHANGED 订阅
+
+    维护被跟踪的 entity_id 集合和禁用掩码，event_filter 中按集合过滤，只有已跟踪且未禁用的
+    实体的事件才交给 handler。增删跟踪和启用/禁用都是 O(1)，不增删总线订阅。
+    集合非空时订阅，清空后退订。需在事件循环中调用。
+
+    Args:
+     hass: HomeAssistant
+     handler: 实体状态变化处理协程 handler(event)
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        handler: Callable[[Event[EventStateChangedData]], Coroutine],
+    ):
+        self._hass = hass
+        self._handler = handler
+        self._tracked: set[str] = set()
+        self._disabled: set[str] = set()
+        self._cancel_listen: Optional[CALLBACK_TYPE] = None
+
+    @callback
+    def _event_filter(self, event_data: EventStateChangedData) -> bool:
+        entity_id = event_data["entity_id"]
+        return entity_id in self._tracked and entity_id not in self._disabled
+
+    def _listen(self) -> None:
+        if self._cancel_listen is None and self._tracked:
+            self._cancel_listen = self._hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._handler, event_filter=self._event_filter
+            )
+            VLog.info(_TAG, "[listen] state changed listener registered")
+
+    def _unlisten(self) -> None:
+        if self._cancel_listen is not None:
+            self._cancel_listen()
+            self._cancel_listen = None
+            VLog.info(_TAG, "[unlisten] state changed listener cancelled")
+
+    def track(self, entity_id: str) -> bool:
+        """
+        跟踪实体并启用
+
+        Returns:
+         bool: False 表示该实体已在跟踪且已启用
+        """
+        if entity_id in self._tracked and entity_id not in self._disabled:
+            return False
+        self._tracked.add(entity_id)
+        self._disabled.discard(entity_id)
+        self._listen()
+        return True
+
+    def untrack(self, entity_id: str) -> bool:
+        """
+        停止跟踪实体
+
+        Returns:
+         bool: False 表示该实体未被跟踪
+        """
+        if entity_id not in self._tracked:
+            return False
+        self._tracked.discard(entity_id)
+        self._disabled.discard(entity_id)
+        if not self._tracked:
+            self._unlisten()
+        return True
+
+    def set_enabled(self, entity_id: str, enable: bool) -> bool:
+        """
+        启用时等同 track；禁用时保留跟踪，只屏蔽其事件
+
+        Returns:
+         bool: False 表示状态未变化
+        """
+        if enable:
+            return self.track(entity_id)
+        if entity_id not in self._tracked or entity_id in self._disabled:
+            return False
+        self._disabled.add(entity_id)
+        return True
+
+    def is_active(self, entity_id: str) -> bool:
+        """已跟踪且未禁用"""
+        return entity_id in self._tracked and entity_id not in self._disabled
+
+    def clear(self) -> None:
+        """清空跟踪集合并退订"""
+        self._tracked.clear()
+        self._disabled.clear()
+        self._unlisten()
+
+    def __contains__(self, entity_id: object) -> bool:
+        return entity_id in self._tracked
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._tracked))
+
+    def __len__(self) -> int:
+        return len(self._tracked)
+
+    def stats(self) -> dict:
+        return {
+            "tracked": len(self._tracked),
+            "disabled": len(self._disabled),
+            "listening": self._cancel_listen is not None,
+        }
@@ -0,0 +1,152 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from .const import UPLOAD_BATCH_MAX_SIZE, UPLOAD_BATCH_WINDOW
+from .v_utils.vlog import VLog
+
+_TAG = "UploadBatcher"
+
+
+class _PendingItem:
+    __slots__ = ("sub_id", "props", "futures")
+
+    def __init__(self, sub_id: Optional[str], props: dict):
+        self.sub_id = sub_id
+        self.props = dict(props)
+        self.futures: list[asyncio.Future] = []
+
+    def payload(self) -> dict:
+        if self.sub_id is None:
+            return {"ver": 0, "props": self.props}
+        return {"subId": self.sub_id, "ver": 0, "props": self.props}
+
+
+class UploadBatcher:
+    """
+    将窗口期内多个设备的上报合并为一次 vhome_data_upload 调用
+
+    同一 subId 在窗口期内的多次上报合并 props(后写覆盖)；达到 max_batch 立即发送。
+    批量发送失败时逐条重发，每条上报都能拿到自己的结果码。
+
+    Args:
+     upload: 实际上报函数 upload(dn, payload_list) -> result code
+     window (float): 合并窗口(秒)
+     max_batch (int): 单次上报的最大设备数
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[str, list[dict]], Awaitable[int]],
+        window: float = UPLOAD_BATCH_WINDOW,
+        max_batch: int = UPLOAD_BATCH_MAX_SIZE,
+    ):
+        self._upload = upload
+        self._window = window
+        self._max_batch = max_batch
+        self._pending: dict[str, dict[Optional[str], _PendingItem]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._reports = 0
+        self._merged = 0
+        self._batches = 0
+        self._native_calls = 0
+        self._fallbacks = 0
+        self._failed_items = 0
+
+    async def async_upload(self, dn: str, sub_id: Optional[str], props: dict) -> int:
+        """
+        提交一条上报并等待其结果
+
+        Args:
+         dn: 网桥设备名
+         sub_id: 子设备ID，网桥自身上报为 None
+         props: 上报属性
+
+        Returns:
+         0:成功 其他:失败
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._reports += 1
+        pending = self._pending.setdefault(dn, {})
+        item = pending.get(sub_id)
+        if item is None:
+            item = _PendingItem(sub_id, props)
+            pending[sub_id] = item
+        else:
+            item.props.update(props)
+            self._merged += 1
+        item.futures.append(future)
+
+        if len(pending) >= self._max_batch:
+            self._schedule_flush(dn)
+        elif dn not in self._timers:
+            self._timers[dn] = loop.call_later(self._window, self._schedule_flush, dn)
+        return await future
+
+    def _schedule_flush(self, dn: str) -> None:
+        timer = self._timers.pop(dn, None)
+        if timer is not None:
+            timer.cancel()
+        items = self._pending.pop(dn, None)
+        if not items:
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._async_send(dn, list(items.values()))
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _async_send(self, dn: str, items: list[_PendingItem]) -> None:
+        self._batches += 1
+        try:
+            self._native_calls += 1
+            result = await self._upload(dn, [item.payload() for item in items])
+            if result != 0 and len(items) > 1:
+                VLog.info(
+                    _TAG,
+                    f"[send] batch of {len(items)} failed:{result},fallback to single upload",
+                )
+                self._fallbacks += 1
+                for item in items:
+                    self._native_calls += 1
+                    item_result = await self._upload(dn, [item.payload()])
+                    self._resolve(item, item_result)
+                return
+            for item in items:
+                self._resolve(item, result)
+        except Exception as e:
+            VLog.warning(_TAG, f"[send] upload error:{e}")
+            for item in items:
+                self._resolve(item, -1)
+
+    def _resolve(self, item: _PendingItem, result: int) -> None:
+        if result != 0:
+            self._failed_items += 1
+        for future in item.futures:
+            if not future.done():
+                future.set_result(result)
+
+    async def async_flush(self) -> None:
+        """立即发送所有待上报数据并等待完成"""
+        for dn in list(self._pending):
+            self._schedule_flush(dn)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "pending": sum(len(items) for items in self._pending.values()),
+            "reports": self._reports,
+            "merged": self._merged,
+            "batches": self._batches,
+            "native_calls": self._native_calls,
+            "fallbacks": self._fallbacks,
+            "failed_items": self._failed_items,
+        }
@@ -0,0 +1,266 @@
+"""
+ Copyright 2024 vivo Mobile Communication Co., Ltd.
+ Licensed under the Apache License, Version 2.0 (the "License");
+
+    http://www.apache.org/licenses/LICENSE-2.0
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from .const import (
+    UPLOAD_RATE_BURST,
+    UPLOAD_RATE_LIMIT,
+    UPLOAD_TARGET_RATE_BURST,
+    UPLOAD_TARGET_RATE_LIMIT,
+)
+from .v_attribute import VIVO_ATTR_NAME_ONLINE, VIVO_ATTR_NAME_POWER
+from .v_utils.vlog import VLog
+
+_TAG = "UploadLimiter"
+
+# 上报优先级，数值越小越先发送
+PRIORITY_STATE = 0
+PRIORITY_CONTROL = 1
+PRIORITY_TELEMETRY = 2
+_PRIORITY_NAMES = ("state", "control", "telemetry")
+
+_STATE_KEYS = frozenset({VIVO_ATTR_NAME_ONLINE, VIVO_ATTR_NAME_POWER})
+# 只反映环境测量值、不是用户设定的属性
+_TELEMETRY_KEYS = frozenset(
+    {
+        "vivo_std_indoor_temperature",
+        "vivo_std_indoor_humidity",
+        "vivo_std_current_temperature",
+        "vivo_std_battery",
+        "vivo_std_illuminance",
+        "vivo_std_humidity",
+        "vivo_std_sensor_value",
+        "vivo_std_person_move",
+    }
+)
+
+
+def upload_priority(props: dict, telemetry_device: bool = False) -> int:
+    """
+    上报的优先级：在线/开关状态 > 设定值 > 传感器测量值
+
+    Args:
+     props: 上报属性
+     telemetry_device: 是否传感器类设备，其属性全部视为测量值
+    """
+    if not _STATE_KEYS.isdisjoint(props):
+        return PRIORITY_STATE
+    if telemetry_device or _TELEMETRY_KEYS.issuperset(props):
+        return PRIORITY_TELEMETRY
+    return PRIORITY_CONTROL
+
+
+class _TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "stamp")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.stamp = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def ready(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class _QueuedReport:
+    __slots__ = ("target_id", "props", "priority", "futures", "queued_at")
+
+    def __init__(self, target_id: Optional[str], props: dict, priority: int, now: float):
+        self.target_id = target_id
+        self.props = dict(props)
+        self.priority = priority
+        self.futures: list[asyncio.Future] = []
+        self.queued_at = now
+
+
+class UploadRateLimiter:
+    """
+    上报限流：全局和每个设备各一个令牌桶，超出速率的上报按优先级排队
+
+    每个设备最多一条排队中的上报，新的上报合并进去(后写覆盖)并提升到两者中较高的优先级，
+    因此测量值只会被合并，不会被丢弃，也不会出现旧值晚于新值发出。
+    设备令牌不足时跳过该设备，不阻塞同优先级的其他设备。
+
+    Args:
+     upload: 实际上报函数 upload(target_id, props) -> result code
+     rate (float): 全局速率(次/秒)
+     burst (int): 全局突发容量
+     target_rate (float): 单个设备速率(次/秒)
+     target_burst (int): 单个设备突发容量
+    """
+
+    def __init__(
+        self,
+        upload: Callable[[Optional[str], dict], Awaitable[int]],
+        rate: float = UPLOAD_RATE_LIMIT,
+        burst: int = UPLOAD_RATE_BURST,
+        target_rate: float = UPLOAD_TARGET_RATE_LIMIT,
+        target_burst: int = UPLOAD_TARGET_RATE_BURST,
+    ):
+        self._upload = upload
+        now = time.monotonic()
+        self._global = _TokenBucket(rate, burst, now)
+        self._target_rate = target_rate
+        self._target_burst = target_burst
+        self._targets: dict[Optional[str], _TokenBucket] = {}
+        self._queues: list[OrderedDict] = [OrderedDict() for _ in _PRIORITY_NAMES]
+        self._queued: dict[Optional[str], _QueuedReport] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: set[asyncio.Task] = set()
+        self._sent = [0] * len(_PRIORITY_NAMES)
+        self._throttled = [0] * len(_PRIORITY_NAMES)
+        self._coalesced = 0
+        self._max_queue_depth = 0
+        self._max_wait = 0.0
+
+    def _target_bucket(self, target_id: Optional[str], now: float) -> _TokenBucket:
+        bucket = self._targets.get(target_id)
+        if bucket is None:
+            bucket = _TokenBucket(self._target_rate, self._target_burst, now)
+            self._targets[target_id] = bucket
+        return bucket
+
+    async def async_submit(
+        self, target_id: Optional[str], props: dict, priority: int = PRIORITY_CONTROL
+    ) -> int:
+        """
+        提交一条上报，令牌不足时排队等待
+
+        Returns:
+         0:成功 其他:失败
+        """
+        now = time.monotonic()
+        queued = self._queued.get(target_id)
+        if queued is None:
+            bucket = self._target_bucket(target_id, now)
+            if not self._has_backlog(priority) and self._global.ready(now) and bucket.ready(now):
+                self._global.take()
+                bucket.take()
+                self._sent[priority] += 1
+                return await self._upload(target_id, props)
+            queued = _QueuedReport(target_id, props, priority, now)
+            self._queued[target_id] = queued
+            self._queues[priority][target_id] = queued
+            self._throttled[priority] += 1
+        else:
+            queued.props.update(props)
+            self._coalesced += 1
+            if priority < queued.priority:
+                del self._queues[queued.priority][target_id]
+                queued.priority = priority
+                self._queues[priority][target_id] = queued
+        self._max_queue_depth = max(self._max_queue_depth, len(self._queued))
+        future = asyncio.get_running_loop().create_future()
+        queued.futures.append(future)
+        self._ensure_worker()
+        return await future
+
+    def _has_backlog(self, priority: int) -> bool:
+        """同级或更高优先级已有排队，新上报不能插队"""
+        return any(self._queues[level] for level in range(priority + 1))
+
+    def _ensure_worker(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._async_drain())
+
+    def _next_ready(self, now: float) -> tuple[Optional[_QueuedReport], float]:
+        """
+        取出可以发送的上报
+
+        Returns:
+         (上报, 0) 或 (None, 最早可发送的等待时间)
+        """
+        wait = self._global.wait_time(now)
+        if wait > 0:
+            return None, wait
+        wait = None
+        for queue in self._queues:
+            for target_id, queued in queue.items():
+                target_wait = self._target_bucket(target_id, now).wait_time(now)
+                if target_wait <= 0:
+                    del queue[target_id]
+                    del self._queued[target_id]
+                    return queued, 0
+                wait = target_wait if wait is None else min(wait, target_wait)
+        return None, wait if wait is not None else 0
+
+    async def _async_drain(self) -> None:
+        while self._queued:
+            now = time.monotonic()
+            queued, wait = self._next_ready(now)
+            if queued is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._global.take()
+            self._target_bucket(queued.target_id, now).take()
+            self._send(queued, now)
+
+    def _send(self, queued: _QueuedReport, now: float) -> None:
+        self._sent[queued.priority] += 1
+        self._max_wait = max(self._max_wait, now - queued.queued_at)
+        task = asyncio.get_running_loop().create_task(self._async_send(queued))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _async_send(self, queued: _QueuedReport) -> None:
+        try:
+            result = await self._upload(queued.target_id, queued.props)
+        except Exception as e:
+            VLog.warning(_TAG, "[send] %s upload error:%s", queued.target_id, e)
+            result = -1
+        for future in queued.futures:
+            if not future.done():
+                future.set_result(result)
+
+    async def async_flush(self) -> None:
+        """不限速立即发送所有排队的上报并等待完成"""
+        now = time.monotonic()
+        for queue in self._queues:
+            while queue:
+                target_id, queued = queue.popitem(last=False)
+                del self._queued[target_id]
+                self._send(queued, now)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": {
+                name: len(queue) for name, queue in zip(_PRIORITY_NAMES, self._queues)
+            },
+            "max_queue_depth": self._max_queue_depth,
+            "sent": dict(zip(_PRIORITY_NAMES, self._sent)),
+            "throttled": dict(zip(_PRIORITY_NAMES, self._throttled)),
+            "coalesced": self._coalesced,
+            "max_wait": round(self._max_wait, 3),
+        }
@@ -9,44 +9,51 @@ from homeassistant.const import CONF_UNIT_OF_MEASUREMENT
 from homeassistant.helpers import entity_registry as er
 from .const import VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC, VIVO_DEVICE_NAME_CONFIG_KEY, \
     VIVO_DEVICE_ENTITY_ID_KEY, VIVO_HA_KEY_WORLD_DEV_ENTRY_ID, VIVO_DEVICE_NAME_FRIENDLY_KEY,VIVO_DEVICE_ID_KEY
+from .bridge_index import BridgeDeviceIndex
+
+
+def _find_record(bridge_config_data: list, key: str, value):
+    """bridge_config_data 为 BridgeDeviceIndex 时走索引，否则线性查找"""
+    if isinstance(bridge_config_data, BridgeDeviceIndex):
+        return bridge_config_data.find(key, value)
+    return next((item for item in bridge_config_data if item.get(key, None) == value), None)
 
 
 class Utils:
 
     @staticmethod
     def get_entity_id_by_name(dname: str, bridge_config_data: list):
-        obj = next(
-            (item for item in bridge_config_data if item.get(VIVO_DEVICE_NAME_CONFIG_KEY, None) == dname), None)
+        obj = _find_record(bridge_config_data, VIVO_DEVICE_NAME_CONFIG_KEY, dname)
         if obj:
             return obj[VIVO_DEVICE_ENTITY_ID_KEY]
         return None
 
     @staticmethod
     def get_entry_id_from_entity_id(entity_id: str, bridge_config_data: list):
-        obj = next(
-            (item for item in bridge_config_data if item.get(VIVO_DEVICE_ENTITY_ID_KEY, None) == entity_id), None)
+        obj = _find_record(bridge_config_data, VIVO_DEVICE_ENTITY_ID_KEY, entity_id)
         if obj:
             return obj.get(VIVO_HA_KEY_WORLD_DEV_ENTRY_ID, None)
         return None
 
     @staticmethod
     def get_entity_id_by_logic_mac(logic_mac: str, bridge_config_data: list):
-        obj = next(
-            (item for item in bridge_config_data if item.get(VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC, None) == logic_mac), None)
+        obj = _find_record(bridge_config_data, VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC, logic_mac)
         if obj:
             return obj[VIVO_DEVICE_ENTITY_ID_KEY]
         return None
 
     @staticmethod 
     def get_logic_mac_by_entity_id( entry_id: str, bridge_config_data: list ):
-        obj = next(
-            (item for item in bridge_config_data if item.get(VIVO_DEVICE_ENTITY_ID_KEY, None) == entry_id), None)
+        obj = _find_record(bridge_config_data, VIVO_DEVICE_ENTITY_ID_KEY, entry_id)
         if obj:
             return obj[VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC]
         return None
         
     @staticmethod
     def get_entity_ids_from_entry_id(entry_id: str, bridge_config_data: list):
+        if isinstance(bridge_config_data, BridgeDeviceIndex):
+            items = bridge_config_data.find_by_entry_id(entry_id)
+            return [item[VIVO_DEVICE_ENTITY_ID_KEY] for item in items]
         return [item[VIVO_DEVICE_ENTITY_ID_KEY] for item in bridge_config_data
                 if item.get(VIVO_HA_KEY_WORLD_DEV_ENTRY_ID, None) == entry_id]
 
@@ -56,8 +63,7 @@ class Utils:
 
     @staticmethod
     def get_device_id_by_name(dname: str, bridge_config_data: list):
-        obj = next(
-            (item for item in bridge_config_data if item.get(VIVO_DEVICE_NAME_CONFIG_KEY, None) == dname), None)
+        obj = _find_record(bridge_config_data, VIVO_DEVICE_NAME_CONFIG_KEY, dname)
         if obj:
             return obj[VIVO_DEVICE_ID_KEY]
         return None
@@ -95,22 +101,21 @@ class Utils:
             return unit
         return None
     def get_device_id(entity_id: str, bridge_config_data: list):
-        obj = next((item for item in bridge_config_data if item.get(VIVO_DEVICE_ENTITY_ID_KEY, None) == entity_id), None)
+        obj = _find_record(bridge_config_data, VIVO_DEVICE_ENTITY_ID_KEY, entity_id)
         if obj:
             return obj[VIVO_DEVICE_ID_KEY]
         return None
 
     @staticmethod
     def get_dn(entity_id: str, bridge_config_data: list):
-        obj = next((item for item in bridge_config_data if item.get(VIVO_DEVICE_ENTITY_ID_KEY, None) == entity_id), None)
+        obj = _find_record(bridge_config_data, VIVO_DEVICE_ENTITY_ID_KEY, entity_id)
         if obj:
             return obj[VIVO_DEVICE_NAME_CONFIG_KEY]
         return None
 
     @staticmethod
     def get_fn(entity_id: str, bridge_config_data: list):
-        obj = next((item for item in bridge_config_data if item.get(VIVO_DEVICE_ENTITY_ID_KEY, None) == entity_id),
-                   None)
+        obj = _find_record(bridge_config_data, VIVO_DEVICE_ENTITY_ID_KEY, entity_id)
         if obj:
             return obj[VIVO_DEVICE_NAME_FRIENDLY_KEY]
         return None
@@ -5,6 +5,9 @@ Licensed under the Apache License, Version 2.0 (the "License");
    http://www.apache.org/licenses/LICENSE-2.0
 """
 
+from types import MappingProxyType
+from typing import Mapping
+
 from homeassistant.components.climate import ATTR_HVAC_MODES, ATTR_FAN_MODES
 from homeassistant.components.fan import ATTR_PRESET_MODES
 from homeassistant.const import Platform
@@ -1283,6 +1286,80 @@ v2h_attributes_map = {
 }
 
 
+
+def _compile_value_maps(attributes_map: dict) -> tuple[Mapping, Mapping]:
+    """
+    把各平台属性的 value_list 编译成 h_value <-> value 的只读字典
+
+    同一平台同名 h_name 取第一项，value_list 内重复的值取第一项，与线性查找一致；
+    没有 value_list 的属性对应空字典。
+
+    Returns:
+        (h2v, v2h): platform -> h_name -> {h_value: value} / {value: h_value}
+    """
+    h2v_maps: dict = {}
+    v2h_maps: dict = {}
+    for platform, attributes in attributes_map.items():
+        h2v_platform: dict = {}
+        v2h_platform: dict = {}
+        for attribute in attributes:
+            h_name = attribute.get(VIVO_KEY_WORD_H_NAME)
+            if h_name is None or h_name in h2v_platform:
+                continue
+            h2v: dict = {}
+            v2h: dict = {}
+            for item in attribute.get("value_list") or ():
+                if "h_value" not in item or "value" not in item:
+                    continue
+                h2v.setdefault(item["h_value"], item["value"])
+                v2h.setdefault(item["value"], item["h_value"])
+            h2v_platform[h_name] = MappingProxyType(h2v)
+            v2h_platform[h_name] = MappingProxyType(v2h)
+        h2v_maps[platform] = MappingProxyType(h2v_platform)
+        v2h_maps[platform] = MappingProxyType(v2h_platform)
+    return MappingProxyType(h2v_maps), MappingProxyType(v2h_maps)
+
+
+# 导入时编译，模式转换直接查表
+h2v_value_maps, v2h_value_maps = _compile_value_maps(v2h_attributes_map)
+
+
+def _freeze(value):
+    """列表转为元组，嵌套的 value_list 条目仍为 dict，共享只读"""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _compile_wire_specs(attributes_map: dict) -> Mapping:
+    """
+    生成各平台属性去掉 h_name 后的上报描述，同一平台同名 h_name 取第一项
+
+    Returns:
+        platform -> h_name -> 只读描述
+    """
+    specs: dict = {}
+    for platform, attributes in attributes_map.items():
+        platform_specs: dict = {}
+        for attribute in attributes:
+            h_name = attribute.get(VIVO_KEY_WORD_H_NAME)
+            if h_name is None or h_name in platform_specs:
+                continue
+            platform_specs[h_name] = MappingProxyType(
+                {
+                    key: _freeze(value)
+                    for key, value in attribute.items()
+                    if key != VIVO_KEY_WORD_H_NAME
+                }
+            )
+        specs[platform] = MappingProxyType(platform_specs)
+    return MappingProxyType(specs)
+
+
+# 物模型使用的属性描述，导入时生成一次
+wire_specs = _compile_wire_specs(v2h_attributes_map)
+
+
 @staticmethod
 def get_h_attribute_name(platform, name: str):
     attributes = v2h_attributes_map.get(platform, [])
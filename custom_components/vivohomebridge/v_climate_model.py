@@ -27,7 +27,7 @@ from homeassistant.components.climate import (
     ATTR_HVAC_MODES, ATTR_HVAC_ACTION, ATTR_FAN_MODE, ATTR_SWING_MODES, SWING_BOTH, SWING_OFF
 )
 from .utils import Utils
-from .v_utils.vattributes_utils import VAttributeUtils
+from .v_utils.vattributes_utils import VAttributeUtils, VAttributesTable
 from .v_utils.vlog import VLog
 
 CLIMATE_MIN_TEMP = 16
@@ -107,6 +107,7 @@ class VClimateModel:
                 "h2v_converter": self.h2v_current_humidity
             }
         ]
+        self.attributes_table = VAttributesTable(self.attributes_map)
 
     def v2h_onoff(self, device_id: str, index: int, on_off: dict, val):
         """Turn off the climate."""
@@ -9,7 +9,7 @@ from homeassistant.const import ATTR_ENTITY_ID, ATTR_SUPPORTED_FEATURES, Platfor
 from .v_attribute import VIVO_KEY_WORD_V_NAME, VIVO_KEY_WORD_H_NAME
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from .v_utils.vattributes_utils import VAttributeUtils
+from .v_utils.vattributes_utils import VAttributeUtils, VAttributesTable
 from .v_utils.vlog import VLog
 from homeassistant.components.cover import (
     SERVICE_CLOSE_COVER,
@@ -49,6 +49,7 @@ class VCoverModel:
                 "h2v_converter": None,
             }
         ]
+        self.attributes_table = VAttributesTable(self.attributes_map)
 
     def v2h_set_position(self, entity_id: str, index: int, on_off: dict, val):
         service: str = SERVICE_SET_COVER_POSITION
@@ -14,7 +14,7 @@ from homeassistant.const import ATTR_ENTITY_ID, ATTR_SUPPORTED_FEATURES, Platfor
 from .v_attribute import VIVO_KEY_WORD_V_NAME, VIVO_KEY_WORD_H_NAME, FAN_SPEED_STEP, FAN_MAX_SPEED, FAN_MIN_SPEED
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from .v_utils.vattributes_utils import VAttributeUtils
+from .v_utils.vattributes_utils import VAttributeUtils, VAttributesTable
 from .v_utils.vlog import VLog
 
 _TAG = "fan"
@@ -52,6 +52,7 @@ class VFanModel:
                 "h2v_converter": self.h2v_fan_speed
             },
         ]
+        self.attributes_table = VAttributesTable(self.attributes_map)
 
     def v2h_onoff(self, device_id: str, index: int, on_off: dict, val):
         """Turn off the climate."""
@@ -8,7 +8,7 @@ import json
 from typing import Mapping, Any
 
 from .v_attribute import VIVO_KEY_WORD_V_NAME, VIVO_KEY_WORD_H_NAME
-from .v_utils.vattributes_utils import VAttributeUtils
+from .v_utils.vattributes_utils import VAttributeUtils, VAttributesTable
 from .v_utils.vlog import VLog
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS, ATTR_RGB_COLOR, ATTR_COLOR_TEMP_KELVIN, SERVICE_TURN_OFF, SERVICE_TURN_ON,
@@ -49,6 +49,7 @@ class VLightModel:
                 "h2v_converter": self.h2v_color_temp
             }
         ]
+        self.attributes_table = VAttributesTable(self.attributes_map)
 
     def v2h_onoff(self, device_id: str, index: int, on_off: dict, val):
         VLog.info(_TAG, f"[v2h_onoff],val:{val}")
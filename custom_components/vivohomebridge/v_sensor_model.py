@@ -12,7 +12,7 @@ from homeassistant.core import HomeAssistant
 from .const import VIVO_HA_PLATFORM_COMMON_SENSOR_PK, VIVO_HA_PLATFORM_HUMIDITY_TEMPERATURE_PK, \
     VIVO_HA_PLATFORM_ILLUMINANCE_PK, VIVO_HA_PLATFORM_OCCUPANCY_PK, VIVO_HA_PLATFORM_OPENING_PK
 from .v_attribute import VIVO_KEY_WORD_V_NAME, VIVO_KEY_WORD_H_NAME,VIVI_KEY_WORK_SENSOR_CLASS
-from .v_utils.vattributes_utils import VAttributeUtils
+from .v_utils.vattributes_utils import VAttributeUtils, VAttributesTable
 from .v_utils.vlog import VLog
 _TAG = "sensor"
 
@@ -128,6 +128,15 @@ class VSensorModel:
                 "h2v_converter": self.h2v_door,
             },
         ]
+        # 每种传感器类型只上报一项属性，按类型预编译
+        self.attributes_tables: dict = {}
+        for item in self.attributes_map:
+            device_class = item[VIVI_KEY_WORK_SENSOR_CLASS]
+            if device_class not in self.attributes_tables:
+                self.attributes_tables[device_class] = VAttributesTable([item])
+
+    def attributes_table_get(self, device_class) -> VAttributesTable | None:
+        return self.attributes_tables.get(device_class)
 
     def h2v_person_move(self, device_id: str, index: int, attributes_map_item: dict, val):
         VLog.info(_TAG, f"[h2v_person_move]{val}")
@@ -8,7 +8,7 @@ Licensed under the Apache License, Version 2.0 (the "License");
 from typing import Mapping, Any
 
 from .v_attribute import VIVO_KEY_WORD_V_NAME, VIVO_KEY_WORD_H_NAME
-from .v_utils.vattributes_utils import VAttributeUtils
+from .v_utils.vattributes_utils import VAttributeUtils, VAttributesTable
 from .v_utils.vlog import VLog
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
@@ -44,6 +44,7 @@ class VSwitchModel:
                 "h2v_converter": self.h2v_onoff,
             }
         ]
+        self.attributes_table = VAttributesTable(self.attributes_map)
 
     def v2h_onoff(self, device_id: str, index: int, on_off: dict, val):
         """Turn off the climate."""
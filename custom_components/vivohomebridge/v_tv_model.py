@@ -4,7 +4,6 @@
 
     http://www.apache.org/licenses/LICENSE-2.0
 """
-import json
 from typing import List, Mapping, Any
 
 from homeassistant.components.media_player import ATTR_MEDIA_VOLUME_LEVEL, MediaPlayerEntityFeature
@@ -39,7 +38,8 @@ from .v_attribute import (
     HA_ATTR_VALUE_TOP_MENU, HA_APPLE_ATTR_VALUE_ENTER, HA_ATTR_VALUE_PLAY, HA_ATTR_VALUE_PAUSE, HA_ATTR_VALUE_VOLUME_UP,
     HA_ATTR_VALUE_VOLUME_DOWN, HA_ATTR_VALUE_PREVIOUS, HA_ATTR_VALUE_NEXT
 )
-from .v_utils.vattributes_utils import VAttributeUtils
+from .v_utils.vattributes_utils import VAttributeUtils, VAttributesTable
+from .py_vhome import codec
 from .v_utils.vlog import VLog
 
 _TAG = "tv"
@@ -203,6 +203,7 @@ class VLGTV(VTVCommon):
                 "h2v_converter": self.h2v_stop,
             }
         ]
+        self.attributes_table = VAttributesTable(self.attributes_map)
 
     def v2h_onoff(self, device_id: str, index: int, on_off: dict, val):
         """Turn off the tv."""
@@ -529,16 +530,12 @@ class VLGTV(VTVCommon):
 
     @classmethod
     def media_player_model_get(cls, device: dr.DeviceEntry, attributes: Mapping[str, Any]):
-        try:
-            VLog.info(_TAG, f"[lg_media_player_model_get] {device}\n json of attribute is {json.dumps(attributes,default=str)}")
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
+        VLog.info(_TAG, "[lg_media_player_model_get] %s\n json of attribute is %s",
+                  device, VLog.lazy(codec.dumps_str, attributes))
         model: list = []
         _tv_common_model = cls.get_media_player_model_from_feature(device, attributes)
-        try:
-            VLog.info(_TAG, f"[lg_media_player_model_get] _tv_common_model {json.dumps(_tv_common_model,default=str)}", )
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
+        VLog.info(_TAG, "[lg_media_player_model_get] _tv_common_model %s",
+                  VLog.lazy(codec.dumps_str, _tv_common_model))
         model += _tv_common_model
         lg_keys_out_of_feature = ["left", "right", "down", "up", "home", "menu", "back", "enter",
                                   HA_LG_ATTR_NAME_VOLUME_UP, HA_LG_ATTR_NAME_VOLUME_DOWN,
@@ -547,10 +544,7 @@ class VLGTV(VTVCommon):
             _item = VAttributeUtils.get_model_item(Platform.MEDIA_PLAYER, h_key)
             if _item is not None:
                 model.append(_item)
-        try:
-            VLog.info(_TAG, f"[lg_media_player_model_get] models {json.dumps(model,default=str)}", )
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
+        VLog.info(_TAG, "[lg_media_player_model_get] models %s", VLog.lazy(codec.dumps_str, model))
         return model
 
     @staticmethod
@@ -728,6 +722,7 @@ class VAppleTV(VTVCommon):
                 "h2v_converter": self.h2v_navigate_next,
             }
         ]
+        self.attributes_table = VAttributesTable(self.attributes_map)
 
     def v2h_onoff(self, device_id: str, index: int, on_off: dict, val):
         """Turn off the tv."""
@@ -1005,10 +1000,7 @@ class VAppleTV(VTVCommon):
             _item = VAttributeUtils.get_model_item(Platform.REMOTE, h_ext_key)
             if _item is not None:
                 model.append(_item)
-        try:
-            VLog.info(_TAG, f"[remote_model_get] {json.dumps(model,default=str)}")
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
+        VLog.info(_TAG, "[remote_model_get] %s", VLog.lazy(codec.dumps_str, model))
         return model
 
     @staticmethod
@@ -1055,9 +1047,9 @@ class VTVModelUtils:
                         f"identified {_identify_name}")
         _attributes_list = None
         if _identify_name == VTVModel.LG_IDENTIFIER_ID and _device.manufacturer == VLGTV.BRAND_NAME:
-            _attributes_list = tv.vLGTV.attributes_map
+            _attributes_list = tv.vLGTV.attributes_table
         elif _identify_name == VTVModel.APPLE_IDENTIFIER_ID and _device.manufacturer == VAppleTV.BRAND_NAME:
-            _attributes_list = tv.vAppleTV.attributes_map
+            _attributes_list = tv.vAppleTV.attributes_table
         else:
             VLog.warning(_TAG, f"[get_remote_device_attribute_list] not supported remote {_identify_name} "
                                f"for {_device.manufacturer}")
@@ -1078,9 +1070,9 @@ class VTVModelUtils:
                         f"identified {_identify_name}")
         _attributes_list = None
         if _identify_name == VTVModel.LG_IDENTIFIER_ID and _device.manufacturer == VLGTV.BRAND_NAME:
-            _attributes_list = tv.vLGTV.attributes_map
+            _attributes_list = tv.vLGTV.attributes_table
         elif _identify_name == VTVModel.APPLE_IDENTIFIER_ID and _device.manufacturer == VAppleTV.BRAND_NAME:
-            _attributes_list = tv.vAppleTV.attributes_map
+            _attributes_list = tv.vAppleTV.attributes_table
         else:
             VLog.warning(_TAG, f"[get_media_player_attributes_list] not supported remote {_identify_name} "
                                f"for {_device.manufacturer}")
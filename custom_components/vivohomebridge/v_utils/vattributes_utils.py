@@ -4,26 +4,78 @@
 
     http://www.apache.org/licenses/LICENSE-2.0
 """
-import copy
 from enum import Enum
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional, Union
 
 from homeassistant.const import ATTR_ENTITY_ID
 from .vlog import VLog
 from ..v_attribute import VIVO_KEY_WORD_V_NAME, VIVO_ATTR_NAME_POWER, VIVO_KEY_WORD_H_NAME
 from homeassistant.core import HomeAssistant
-from ..v_attritube_map import v2h_attributes_map
+from ..v_attritube_map import v2h_value_maps, h2v_value_maps, wire_specs
 
 _TAG = "attributes"
 
 
+class VAttributesTable:
+    """
+    预编译的属性映射表
+
+    由模型的 attributes_map 构建一次，提供 h_name/v_name 到属性描述的只读字典，
+    转换时按变化的属性名直接查表，无需逐项扫描 attributes_map。
+    同名属性出现多次时与原先的 next(...) 查找一致，取第一项。
+    """
+
+    __slots__ = ("specs", "by_h_name", "by_v_name", "has_power")
+
+    def __init__(self, attributes_map: Iterable[dict]):
+        self.specs: tuple = tuple(attributes_map)
+        by_h_name: dict = {}
+        by_v_name: dict = {}
+        for item in self.specs:
+            h_name = item.get(VIVO_KEY_WORD_H_NAME)
+            if h_name is not None:
+                by_h_name.setdefault(h_name, item)
+            v_name = item.get(VIVO_KEY_WORD_V_NAME)
+            if v_name is not None:
+                by_v_name.setdefault(v_name, item)
+        self.by_h_name: Mapping[str, dict] = MappingProxyType(by_h_name)
+        self.by_v_name: Mapping[str, dict] = MappingProxyType(by_v_name)
+        self.has_power: bool = VIVO_ATTR_NAME_POWER in by_v_name
+
+    def h_spec(self, h_name: str) -> Optional[dict]:
+        return self.by_h_name.get(h_name)
+
+    def v_spec(self, v_name: str) -> Optional[dict]:
+        return self.by_v_name.get(v_name)
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    def __repr__(self) -> str:
+        return f"VAttributesTable({list(self.by_v_name)})"
+
+    @staticmethod
+    def of(attributes_map: Union["VAttributesTable", Iterable[dict]]) -> "VAttributesTable":
+        """已编译的表原样返回，列表则临时编译"""
+        if isinstance(attributes_map, VAttributesTable):
+            return attributes_map
+        return VAttributesTable(attributes_map)
+
+
 class VAttributeUtils:
 
     @staticmethod
-    def h2v_attributes_converter(hass: HomeAssistant, entity_id: str, attributes_map: list, h_attributes: dict,
+    def h2v_attributes_converter(hass: HomeAssistant, entity_id: str,
+                                 attributes_map: Union[VAttributesTable, list], h_attributes: dict,
                                  skip_off_state: bool):
         v_data = {}
+        table = VAttributesTable.of(attributes_map)
 
-        if any(item[VIVO_KEY_WORD_V_NAME] == VIVO_ATTR_NAME_POWER for item in attributes_map):
+        if table.has_power:
             if hass.states.get(entity_id).state == 'unavailable':
                 v_data[VIVO_ATTR_NAME_POWER] = 'off'
                 return v_data
@@ -34,12 +86,13 @@ class VAttributeUtils:
             else:
                 v_data[VIVO_ATTR_NAME_POWER] = 'on'
         else:
-            VLog.info(_TAG, f"{entity_id} had no {VIVO_ATTR_NAME_POWER} {attributes_map}")
+            VLog.info(_TAG, "%s had no %s %s", entity_id, VIVO_ATTR_NAME_POWER, table)
 
+        by_h_name = table.by_h_name
         for key, val in h_attributes.items():
             if val is None:
                 continue
-            obj = next((item for item in attributes_map if item.get(VIVO_KEY_WORD_H_NAME) == key), None)
+            obj = by_h_name.get(key)
             if obj is None or obj['h2v_converter'] is None:
                 continue
             h2v_converter = obj['h2v_converter']
@@ -47,12 +100,12 @@ class VAttributeUtils:
         return v_data
 
     @staticmethod
-    def v2h_attributes_converter(hass: HomeAssistant, h_device_id: str, entity_id: str, attributes_map: list,
-                                 v_attributes: dict):
+    def v2h_attributes_converter(hass: HomeAssistant, h_device_id: str, entity_id: str,
+                                 attributes_map: Union[VAttributesTable, list], v_attributes: dict):
         h_data = {ATTR_ENTITY_ID: entity_id}
+        by_v_name = VAttributesTable.of(attributes_map).by_v_name
         for key, val in v_attributes.items():
-            obj = next(
-                (item for item in attributes_map if item.get(VIVO_KEY_WORD_V_NAME) == key), None)
+            obj = by_v_name.get(key)
             if obj:
                 v2h_converter = obj['v2h_converter']
                 if v2h_converter:
@@ -61,27 +114,35 @@ class VAttributeUtils:
         return h_data
 
     @staticmethod
-    def get_model_item(platform: str, key: str):
-        attributes_array = v2h_attributes_map[platform]
-        new_item: dict = {}
-        for item in attributes_array:
-            # 复制原始字典，避免修改原始数据
-            new_item = copy.deepcopy(item)
-            if new_item[VIVO_KEY_WORD_H_NAME] == key:
-                del new_item[VIVO_KEY_WORD_H_NAME]
-                return new_item
-        VLog.info(_TAG, f"[get_model_item] no attribute support for {platform},{key}")
-        return None
+    def get_model_item(platform: str, key: str) -> Optional[dict]:
+        """
+        属性 key 的物模型描述(不含 h_name)
+
+        返回预生成只读描述的浅拷贝，可以替换其中的键(如 value_range、value_list)；
+        嵌套的列表是共享的元组，不要原地修改。
+        """
+        spec = wire_specs.get(platform, {}).get(key)
+        if spec is None:
+            VLog.info(_TAG, f"[get_model_item] no attribute support for {platform},{key}")
+            return None
+        return dict(spec)
+
+    @staticmethod
+    def _value_map_get(value_maps: Mapping, platform: str, key: str) -> Optional[Mapping]:
+        value_map = value_maps.get(platform, {}).get(key)
+        if value_map is None:
+            VLog.info(_TAG, f"[get_model_item] no attribute support for {platform},{key}")
+        return value_map
 
     @staticmethod
     def h2v_mode_get_value(platform: str, key: str, val):
-        temp_mode: dict = VAttributeUtils.get_model_item(platform, key)
-        if not temp_mode:
+        value_map = VAttributeUtils._value_map_get(h2v_value_maps, platform, key)
+        if not value_map:
             return val
-        value_list = temp_mode.get("value_list", [])
-        if not value_list:
+        try:
+            v_value = value_map.get(val)
+        except TypeError:
             return val
-        v_value = next((item["value"] for item in value_list if item["h_value"] == val), None)
         if not v_value:
             return val
         else:
@@ -89,13 +150,13 @@ class VAttributeUtils:
 
     @staticmethod
     def v2h_mode_get_attr(h_mode_key, h_attr_key, val, platform, h_attributes):
-        temp_mode = VAttributeUtils.get_model_item(platform, h_mode_key)
-        if not temp_mode:
+        value_map = VAttributeUtils._value_map_get(v2h_value_maps, platform, h_mode_key)
+        if not value_map:
             return h_attributes
-        value_list = temp_mode.get("value_list", [])
-        if not value_list:
+        try:
+            h_value = value_map.get(val)
+        except TypeError:
             return h_attributes
-        h_value = next((item["h_value"] for item in value_list if item["value"] == val), None)
         if not h_value:
             return h_attributes
         h_attributes[h_attr_key] = h_value
@@ -121,12 +182,10 @@ class VAttributeUtils:
     @staticmethod
     def get_support_value_list(v_o_values: list, h_o_values: list) -> list:
         value_list: list = []
-        v_values = copy.deepcopy(v_o_values)
-        for v_value_item in v_values:
+        for v_value_item in v_o_values:
             h_value = v_value_item.get("h_value")
             if h_value and h_value in h_o_values:
-                del v_value_item["h_value"]
-                value_list.append(v_value_item)
+                value_list.append({k: v for k, v in v_value_item.items() if k != "h_value"})
         return value_list
 
     @staticmethod
@@ -11,10 +11,48 @@ INFO = 1
 WARN = 2
 ERROR = 3
 _LOGGER = logging.getLogger(DOMAIN)
+LEVEL_NAMES = {
+    "debug": DEBUG,
+    "info": INFO,
+    "warn": WARN,
+    "warning": WARN,
+    "error": ERROR,
+}
+_LOGGING_LEVELS = {
+    DEBUG: logging.DEBUG,
+    INFO: logging.INFO,
+    WARN: logging.WARNING,
+    ERROR: logging.ERROR,
+}
+
+
+class _LazyArg:
+    """日志真正输出时才计算的参数"""
+
+    __slots__ = ("_func", "_args")
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+
+    def __str__(self) -> str:
+        try:
+            return str(self._func(*self._args))
+        except Exception as e:
+            return f"<log arg error: {e}>"
+
+    __repr__ = __str__
 
 
 class VLog:
-    level = DEBUG
+    """
+    日志输出
+
+    content 可以是字符串或返回字符串的函数；带 args 时按 logging 的 % 格式延迟格式化，
+    开销大的参数（如 json 序列化）用 VLog.lazy 包装。级别未开启时不做任何格式化。
+    """
+
+    level = WARN
     is_enabled = True
     _logger_initialized = False
 
@@ -23,6 +61,16 @@ class VLog:
         """Set the logging level."""
         cls.level = level
 
+    @classmethod
+    def set_level_by_name(cls, name: str) -> bool:
+        """按名称设置日志级别，名称无效时保持原级别"""
+        level = LEVEL_NAMES.get(str(name).lower())
+        if level is None:
+            cls.warning("log", "unknown log level:%s", name)
+            return False
+        cls.level = level
+        return True
+
     @classmethod
     def enable_log(cls):
         """Enable logging output."""
@@ -34,34 +82,46 @@ class VLog:
         cls.is_enabled = False
 
     @classmethod
-    def _log(cls, level, content):
+    def is_enabled_for(cls, level) -> bool:
+        """该级别的日志是否会输出，用于包住只为打日志而做的计算"""
+        return (
+            cls.is_enabled
+            and level >= cls.level
+            and _LOGGER.isEnabledFor(_LOGGING_LEVELS[level])
+        )
+
+    @staticmethod
+    def lazy(func, *args) -> _LazyArg:
+        """包装日志参数，输出时才调用 func(*args)"""
+        return _LazyArg(func, *args)
+
+    @classmethod
+    def _log(cls, level, tag, content, args):
         """Internal method to log a message with a given level."""
-        if not cls.is_enabled:
+        if not cls.is_enabled or level < cls.level:
             return
-
-        if level < cls.level:
+        logging_level = _LOGGING_LEVELS[level]
+        if not _LOGGER.isEnabledFor(logging_level):
             return
-
-        log_func = {
-            DEBUG: _LOGGER.debug,
-            INFO: _LOGGER.info,
-            WARN: _LOGGER.warning,
-            ERROR: _LOGGER.error,
-        }.get(level)
-        log_func(content)
+        if callable(content):
+            content = content()
+        if args:
+            _LOGGER.log(logging_level, f"[{tag}]{content}", *args)
+        else:
+            _LOGGER.log(logging_level, "[%s]%s", tag, content)
 
     @classmethod
-    def debug(cls, tag, content):
-        cls._log(DEBUG, f"[{tag}]" + content)
+    def debug(cls, tag, content, *args):
+        cls._log(DEBUG, tag, content, args)
 
     @classmethod
-    def info(cls, tag, content):
-        cls._log(INFO, f"[{tag}]" + content)
+    def info(cls, tag, content, *args):
+        cls._log(INFO, tag, content, args)
 
     @classmethod
-    def warning(cls, tag, content):
-        cls._log(WARN, f"[{tag}]" + content)
+    def warning(cls, tag, content, *args):
+        cls._log(WARN, tag, content, args)
 
     @classmethod
-    def error(cls, tag, content):
-        cls._log(ERROR, f"[{tag}]" + content)
+    def error(cls, tag, content, *args):
+        cls._log(ERROR, tag, content, args)
@@ -6,6 +6,7 @@
 """
 from homeassistant.const import ATTR_ENTITY_ID, SERVICE_TURN_OFF, SERVICE_TURN_ON
 from .v_attribute import VIVO_KEY_WORD_V_NAME, VIVO_KEY_WORD_H_NAME
+from .v_utils.vattributes_utils import VAttributesTable
 from .v_utils.vlog import VLog
 from homeassistant.components.water_heater import ATTR_CURRENT_TEMPERATURE, ATTR_OPERATION_LIST
 from homeassistant.config_entries import ConfigEntry
@@ -45,6 +46,7 @@ class VWaterHeaterModel:
                 "h2v_converter": self.h2v_operation_list
             }
         ]
+        self.attributes_table = VAttributesTable(self.attributes_map)
 
     # v2h开关转换
     def v2h_onoff(self, device_id: str, index: int, on_off: dict, val):
@@ -6,14 +6,8 @@ Licensed under the Apache License, Version 2.0 (the "License");
 """
 
 import asyncio
-import copy
-import json
 import re
-from homeassistant.components.binary_sensor import BinarySensorDeviceClass
-from homeassistant.components.cover import CoverDeviceClass
-from homeassistant.components.media_player import MediaPlayerDeviceClass
-from homeassistant.components.sensor import SensorDeviceClass
-from homeassistant.components.switch import SwitchDeviceClass
+from collections import ChainMap
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     ATTR_ENTITY_ID,
@@ -22,7 +16,6 @@ from homeassistant.const import (
     ATTR_NAME,
     ATTR_DEVICE_CLASS,
     ATTR_TEMPERATURE,
-    CONF_UNIT_OF_MEASUREMENT,
     STATE_UNAVAILABLE,
 )
 from homeassistant.core import HomeAssistant, Event, EventStateChangedData
@@ -39,12 +32,20 @@ from .const import (
     EVENT_VHOME_DEV_STATE_CHANGE,
     VIVO_DEVICE_NAME_CONFIG_KEY,
     VIVO_DEVICE_ENTITY_ID_KEY,
+    VIVO_DEVICE_ID_KEY,
     VIVO_HA_CONFIG_DATA_DEVICES_KEY,
-    VIVO_HA_PLATFORM_PK,
     VIVO_HA_PLATFORM_PKY_KEY,
-    VIVO_HA_PLATFORM_SWITCH_PK,
+    VIVO_BRIDGE_ENTRY_ID_EVENT_KEY,
+    VIVO_STATE_FLUSH_EVENT_KEY,
+)
+from .bridge_index import BridgeDeviceIndex
+from .sensor_policy import SensorReportFilter
+from .state_coalescer import StateReportCoalescer
+from .platform_handler import (
+    PLATFORM_HANDLERS,
+    PlatformHandler,
+    platform_handler_class_get,
 )
-from .utils import Utils
 from .v_attribute import (
     VIVO_ATTR_NAME_ONLINE,
     VIVO_HA_COMMON_ATTR_LIST,
@@ -53,9 +54,7 @@ from .v_attribute import (
     VIVO_HA_COMMOM_ATTR_VENDOR,
     VIVO_HA_COMMON_ATTR_SERIAL,
     VIVO_HA_COMMON_ATTR_MODEL,
-    HA_ATTR_NAME_POWER,
-    VIVO_KEY_WORD_V_NAME,
-    VIVI_KEY_WORK_SENSOR_CLASS,
+    VIVO_ATTR_NAME_POWER,
 )
 
 # new device integration
@@ -63,10 +62,11 @@ from .v_climate_model import VClimateModel
 from .v_cover_model import VCoverModel
 from .v_fan_model import VFanModel
 from .v_light_model import VLightModel
-from .v_sensor_model import VSensorModel, VIVO_HA_SENSORS_PK
+from .v_sensor_model import VSensorModel
 from .v_switch_model import VSwitchModel
-from .v_tv_model import VTVModel, VTVModelUtils
+from .v_tv_model import VTVModel
 from .v_utils.vattributes_utils import VAttributeUtils
+from .py_vhome import codec
 from .v_utils.vlog import VLog
 from .v_water_heater_model import VWaterHeaterModel
 
@@ -81,6 +81,8 @@ VIVO_HA_PLATFORM_SUPPORT_LIST = [
     Platform.SENSOR,
 ]
 _TAG = "bridge"
+# 单网桥版本所有条目共用的配置文件
+VIVO_BRIDGE_LEGACY_CONFIG_STORE = f"{DOMAIN}/vBridgeConfig.json"
 
 
 class VBridgeEntity:
@@ -92,8 +94,10 @@ class VBridgeEntity:
         self.bridge_service: DeviceEntry | None = None
         self.device_enable = True
         self.version = VIVO_HA_BRIDGE_VERSION
-        self.bridge_config_handle = Store(hass, 1, f"{DOMAIN}/vBridgeConfig.json")
-        self.bridge_config_data = []
+        self.bridge_config_handle = Store(
+            hass, 1, f"{DOMAIN}/vBridgeConfig_{config_entry.entry_id}.json"
+        )
+        self._bridge_config_data = BridgeDeviceIndex()
         self.light_model = VLightModel(hass, config_entry, "lights")
         self.sensor_model = VSensorModel(hass, config_entry, "sensors")
         self.switch_model = VSwitchModel(hass, config_entry, "switch")
@@ -106,8 +110,55 @@ class VBridgeEntity:
             [VTVModel.LG_IDENTIFIER_ID, VTVModel.APPLE_IDENTIFIER_ID],
         )
         self.water_heater_model = VWaterHeaterModel(hass, config_entry, "waterHeater")
+        self._state_coalescer = StateReportCoalescer(
+            self._fire_state_change,
+            urgent_keys=(VIVO_ATTR_NAME_ONLINE, VIVO_ATTR_NAME_POWER),
+        )
+        self.sensor_report_filter = SensorReportFilter(self._state_coalescer.submit)
+        self._platform_handlers: dict[str, PlatformHandler] = {
+            domain: handler_class(self, domain)
+            for domain, handler_class in PLATFORM_HANDLERS.items()
+        }
         VLog.info(_TAG, "[VBridgeEntity] init ... ...")
 
+    async def async_adopt_legacy_config(self) -> list | None:
+        """
+        接管单网桥版本的配置文件
+
+        旧版本只有一个配置条目，配置文件不区分条目；首个加载时没有专属配置的条目将其迁移过来
+        """
+        legacy_handle = Store(self.hass, 1, VIVO_BRIDGE_LEGACY_CONFIG_STORE)
+        legacy_data = await legacy_handle.async_load()
+        if legacy_data is None:
+            return None
+        VLog.info(_TAG, f"[adopt_legacy_config] {self.config_entry.entry_id}")
+        await self.bridge_config_handle.async_save(legacy_data)
+        await legacy_handle.async_remove()
+        return legacy_data
+
+    @property
+    def bridge_config_data(self) -> BridgeDeviceIndex:
+        return self._bridge_config_data
+
+    @bridge_config_data.setter
+    def bridge_config_data(self, records: list) -> None:
+        """整体替换子设备记录时重建索引"""
+        self._bridge_config_data = BridgeDeviceIndex(records)
+
+    def event_data(self, data: dict | None = None) -> dict:
+        """为事件数据附带本网桥的配置条目 id"""
+        if data is None:
+            data = {}
+        data[VIVO_BRIDGE_ENTRY_ID_EVENT_KEY] = self.config_entry.entry_id
+        return data
+
+    def platform_handler_get(self, domain: str) -> PlatformHandler:
+        handler = self._platform_handlers.get(domain)
+        if handler is None:
+            handler = PlatformHandler(self, domain)
+            self._platform_handlers[domain] = handler
+        return handler
+
     def set_device_enable(self, enable: bool) -> None:
         self.device_enable = enable
 
@@ -132,40 +183,41 @@ class VBridgeEntity:
             new_state.state != "off" and new_state != STATE_UNAVAILABLE
         ):
             current_attrs_from_change = False
-        try:
-            def diff_states(old_state, new_state):
-                """返回只包含变化项的新属性（包括 state 和 attributes）。"""
-                result = {}
+        def diff_states(old_state, new_state):
+            """返回只包含变化项的新属性（包括 state 和 attributes）。"""
+            result = {}
 
-                if old_state.state != new_state.state:
-                    result["state"] = new_state.state
+            if old_state.state != new_state.state:
+                result["state"] = new_state.state
 
-                old_attrs = old_state.attributes or {}
-                new_attrs = new_state.attributes or {}
+            old_attrs = old_state.attributes or {}
+            new_attrs = new_state.attributes or {}
 
-                for key, new_value in new_attrs.items():
-                    if old_attrs.get(key) != new_value:
-                        result[key] = new_value
+            for key, new_value in new_attrs.items():
+                if old_attrs.get(key) != new_value:
+                    result[key] = new_value
 
-                # 被删除的属性（旧有新无）
-                for key in old_attrs:
-                    if key not in new_attrs:
-                        result[key] = None
+            # 被删除的属性（旧有新无）
+            for key in old_attrs:
+                if key not in new_attrs:
+                    result[key] = None
 
-                return result
+            return result
 
+        VLog.info(
+            _TAG,
+            "[entity_state_change] %s from change:%s "
+            "change as follow:\n\t\r old_state:%s\n\n\t\r new_state:%s\n\n"
+            "\t\r old_attrs:%s\n\n\t\r new_attrs:%s\n\n",
+            entity_id,
+            current_attrs_from_change,
+            old_state,
+            new_state,
+            VLog.lazy(codec.dumps_str, old_attrs),
+            VLog.lazy(codec.dumps_str, new_attrs),
+        )
+        current_attrs = diff_states(old_state, new_state)
 
-            VLog.info(
-                _TAG,
-                f"[entity_state_change] {entity_id} from change:{current_attrs_from_change} "
-                f"change as follow:\n\t\r old_state:{old_state}\n\n\t\r new_state:{new_state}\n\n"
-                f"\t\r old_attrs:{json.dumps(old_attrs,default=str)}\n\n\t\r new_attrs:{json.dumps(new_attrs,default=str)}\n\n",
-            )
-            current_attrs  = diff_states(old_state,new_state)
-        except Exception as e:
-            VLog.warning(_TAG, f"<json error: {e}>")
-            
-            
         if current_attrs_from_change is False:
             for attr_name, new_value in new_attrs.items():
                 current_attrs[attr_name] = new_value
@@ -183,106 +235,21 @@ class VBridgeEntity:
                     )
 
         platform = entity_id.split(".")[0]
-        deviceid = Utils.get_device_id(entity_id, self.bridge_config_data)
-        if deviceid is None:
+        record = self.bridge_config_data.find_by_entity_id(entity_id)
+        if record is None or record.get(VIVO_DEVICE_ID_KEY) is None:
             return
+        dn = record.get(VIVO_DEVICE_NAME_CONFIG_KEY)
         state = self.hass.states.get(entity_id)
         if not state:
-            await self.async_notify_device_offline(
-                Utils.get_dn(entity_id, self.bridge_config_data)
-            )
+            await self.async_notify_device_offline(dn)
             return
-        attributes_map: list = []
         # new device integration
-        if platform == Platform.LIGHT:
-            attributes_map = self.light_model.attributes_map
-        elif platform == Platform.SWITCH:
-            device_class = state.attributes.get(ATTR_DEVICE_CLASS)
-            VLog.info(_TAG, f"Switch class:{device_class}")
-            if (
-                changed_attrs.get("switch.on") is not None
-                or new_state.state != old_state.state
-            ):
-                attributes_map = self.switch_model.attributes_map
-            else:
-                try:
-                    VLog.info(
-                        _TAG,
-                        f"[entity_state_change] {entity_id} "
-                        f"Unsupported the attrs:{json.dumps(changed_attrs,default=str)}",
-                    )
-                except Exception as e:
-                    VLog.warning(_TAG, f"<json error: {e}>")
-                return
-            if new_state.state != old_state.state:
-                current_attrs["power"] = new_state.state
-        elif platform == Platform.CLIMATE:
-            attributes_map = self.climate_model.attributes_map
-            self.climate_model.calibrate_current_attrs(
-                current_attrs, new_state.state, old_state.state
-            )
-        elif platform == Platform.FAN:
-            attributes_map = self.fan_model.attributes_map
-        elif platform == Platform.COVER:
-            attributes_map = self.cover_model.attributes_map
-        elif platform == Platform.WATER_HEATER:
-            attributes_map = self.water_heater_model.attributes_map
-        elif platform == Platform.MEDIA_PLAYER:
-            _current_attrs, _attributes_list = (
-                VTVModelUtils.get_media_player_attribute_list_and_state(
-                    entity_id,
-                    old_state.state,
-                    new_state.state,
-                    self.hass,
-                    self.tv_model,
-                )
-            )
-            if _attributes_list is None or len(_attributes_list) == 0:
-                VLog.info(
-                    _TAG, f"[entity_state_change] No attributes list for {entity_id}"
-                )
-                return
-            attributes_map = _attributes_list
-            if _current_attrs is not None and len(_current_attrs) != 0:
-                for attr_name, attr_value in _current_attrs.items():
-                    current_attrs[attr_name] = attr_value
-        elif platform == Platform.REMOTE:
-            _current_attrs, _attributes_list = (
-                VTVModelUtils.get_remote_attribute_list_and_state(
-                    entity_id,
-                    old_state.state,
-                    new_state.state,
-                    self.hass,
-                    self.tv_model,
-                )
-            )
-            if _attributes_list is None or len(_attributes_list) == 0:
-                VLog.info(
-                    _TAG,
-                    f"[entity_state_change] No attributes list for {entity_id} of {platform}",
-                )
-                return
-            attributes_map = _attributes_list
-            if _current_attrs is not None and len(_current_attrs) != 0:
-                for attr_name, attr_value in _current_attrs.items():
-                    current_attrs[attr_name] = attr_value
-        elif platform == Platform.BINARY_SENSOR or platform == Platform.SENSOR:
-            attributes_maps = self.sensor_model.attributes_map
-            device_class = state.attributes.get(ATTR_DEVICE_CLASS)
-            target_map = next( item 
-                                    for item in attributes_maps
-                                    if item[VIVI_KEY_WORK_SENSOR_CLASS] ==device_class 
-                                    )
-            attributes_map.append(target_map)
-            unit = new_attrs.get(CONF_UNIT_OF_MEASUREMENT)
-            if device_class == SensorDeviceClass.TEMPERATURE:
-                current_attrs["state"] = VSensorModel.sensor_h2v_val(
-                    device_class, unit, new_state.state
-                )
-        else:
-            VLog.warning(_TAG, f"{entity_id} Unsupported platform:{platform}")
+        attributes_map = self.platform_handler_get(platform).state_change_prepare(
+            entity_id, old_state, new_state, changed_attrs, current_attrs
+        )
+        if attributes_map is None:
             return
-        VLog.info(_TAG, f"[entity_state_change] current_attrs:{current_attrs}")
+        VLog.info(_TAG, "[entity_state_change] current_attrs:%s", current_attrs)
         v_attrs = {}
         try:
             v_attrs = VAttributeUtils.h2v_attributes_converter(
@@ -294,30 +261,44 @@ class VBridgeEntity:
             v_attrs = {"online": "false"}
         else:
             v_attrs["online"] = "true"
-        VLog.info(_TAG, f"[entity_state_change] v_attrs:{v_attrs}")
+        VLog.info(_TAG, "[entity_state_change] v_attrs:%s", v_attrs)
         if len(v_attrs) == 0:
             return
-        self.hass.bus.async_fire(
-            EVENT_VHOME_DEV_STATE_CHANGE,
-            {
-                "data": v_attrs,
-                VIVO_DEVICE_NAME_CONFIG_KEY: Utils.get_dn(
-                    entity_id, self.bridge_config_data
-                ),
-                "domain": DOMAIN,
-            },
+        v_attrs = self.platform_handler_get(platform).state_report_filter(
+            dn, new_state, v_attrs
         )
+        if v_attrs is None:
+            return
+        self._state_coalescer.submit(dn, v_attrs)
 
     async def async_notify_device_offline(self, dn: str):
+        # 离线不经过滤器，清掉过滤器记录的在线状态，恢复在线时立即上报
+        self.sensor_report_filter.forget(dn)
+        self._state_coalescer.submit(dn, {VIVO_ATTR_NAME_ONLINE: "false"})
+
+    def _fire_state_change(self, dn: str, v_attrs: dict) -> None:
         self.hass.bus.async_fire(
             EVENT_VHOME_DEV_STATE_CHANGE,
-            {
-                "data": {"online": "false"},
-                VIVO_DEVICE_NAME_CONFIG_KEY: dn,
-                "domain": DOMAIN,
-            },
+            self.event_data(
+                {
+                    "data": v_attrs,
+                    VIVO_DEVICE_NAME_CONFIG_KEY: dn,
+                    "domain": DOMAIN,
+                }
+            ),
         )
 
+    def flush_state_reports(self) -> None:
+        """立即发出暂存和合并中的状态上报"""
+        self.sensor_report_filter.flush()
+        self._state_coalescer.flush()
+
+    def state_report_stats(self) -> dict:
+        return self._state_coalescer.stats()
+
+    def sensor_report_stats(self) -> dict:
+        return self.sensor_report_filter.stats()
+
     async def _async_get_entity_ids_names(self, platforms: list):
         """new device integration"""
         _id_name_dict_list: list[dict[str, str]] = []
@@ -343,158 +324,27 @@ class VBridgeEntity:
                 entity_ids = await self.hass.async_add_executor_job(
                     self.hass.states.async_entity_ids, platform
                 )
-                if platform == Platform.SWITCH:
-                    for entity_id in entity_ids:
-                        device_class = self.hass.states.get(entity_id).attributes.get(
-                            ATTR_DEVICE_CLASS
-                        )
-                        _item: dict = {}
-                        _device_name = self.hass.states.get(entity_id).attributes.get(
-                            ATTR_FRIENDLY_NAME
-                        )
-                        _item[ATTR_ENTITY_ID] = entity_id
+                handler = platform_handler_class_get(platform)
+                for entity_id in entity_ids:
+                    _attributes = self.hass.states.get(entity_id).attributes
+                    device_class = _attributes.get(ATTR_DEVICE_CLASS)
+                    if not handler.entity_supported(device_class):
                         VLog.info(
                             _TAG,
-                            f"Switch name={_device_name},entity_id={entity_id} device_class={device_class}",
-                        )
-                        if device_class == SwitchDeviceClass.OUTLET:
-                            _item[VIVO_HA_PLATFORM_PKY_KEY] = VIVO_HA_PLATFORM_PK.get(
-                                platform
-                            )
-                        else:
-                            _item[VIVO_HA_PLATFORM_PKY_KEY] = VIVO_HA_PLATFORM_SWITCH_PK
-                        temp_name = self._generate_device_name(
-                            _device_name, platform, entity_id
-                        )
-                        if not temp_name:
-                            continue
-                        _item[ATTR_NAME] = temp_name
-                        _id_name_dict_list.append(_item)
-
-                elif platform == Platform.COVER:
-                    for entity_id in entity_ids:
-                        device_class = self.hass.states.get(entity_id).attributes.get(
-                            ATTR_DEVICE_CLASS
-                        )
-                        if device_class == CoverDeviceClass.CURTAIN:
-                            _item: dict = {}
-                            _device_name = self.hass.states.get(
-                                entity_id
-                            ).attributes.get(ATTR_FRIENDLY_NAME)
-                            _item[VIVO_HA_PLATFORM_PKY_KEY] = VIVO_HA_PLATFORM_PK.get(
-                                platform
-                            )
-                            _item[ATTR_ENTITY_ID] = entity_id
-                            temp_name = self._generate_device_name(
-                                _device_name, platform, entity_id
-                            )
-                            if not temp_name:
-                                continue
-                            else:
-                                _item[ATTR_NAME] = temp_name
-                            _id_name_dict_list.append(_item)
-                elif platform == Platform.SENSOR:
-                    for entity_id in entity_ids:
-                        device_class = self.hass.states.get(entity_id).attributes.get(
-                            ATTR_DEVICE_CLASS
-                        )
-                        if (
-                            device_class == SensorDeviceClass.TEMPERATURE
-                            or device_class == SensorDeviceClass.HUMIDITY
-                            or device_class == SensorDeviceClass.ILLUMINANCE
-                            or device_class == SensorDeviceClass.ENUM
-                        ):
-                            """只支持温度、湿度、光照支持"""
-                            _item: dict = {}
-                            _device_name = self.hass.states.get(
-                                entity_id
-                            ).attributes.get(ATTR_FRIENDLY_NAME)
-                            _item[ATTR_ENTITY_ID] = entity_id
-                            _item[VIVO_HA_PLATFORM_PKY_KEY] = VIVO_HA_SENSORS_PK.get(
-                                device_class
-                            )
-                            temp_name = self._generate_device_name(
-                                _device_name, platform, entity_id
-                            )
-                            if not temp_name:
-                                continue
-                            else:
-                                _item[ATTR_NAME] = temp_name
-                                _id_name_dict_list.append(_item)
-                elif platform == Platform.BINARY_SENSOR:
-                    for entity_id in entity_ids:
-                        device_class = self.hass.states.get(entity_id).attributes.get(
-                            ATTR_DEVICE_CLASS
-                        )
-                        if (
-                            device_class == BinarySensorDeviceClass.OCCUPANCY
-                            or device_class == BinarySensorDeviceClass.DOOR
-                            or device_class == BinarySensorDeviceClass.GARAGE_DOOR
-                            or device_class == BinarySensorDeviceClass.OPENING
-                            or device_class == BinarySensorDeviceClass.MOTION
-                            or device_class == BinarySensorDeviceClass.MOVING
-                        ):
-                            _item: dict = {}
-                            _device_name = self.hass.states.get(
-                                entity_id
-                            ).attributes.get(ATTR_FRIENDLY_NAME)
-                            _item[ATTR_ENTITY_ID] = entity_id
-                            _item[VIVO_HA_PLATFORM_PKY_KEY] = VIVO_HA_SENSORS_PK.get(
-                                device_class
-                            )
-                            temp_name = self._generate_device_name(
-                                _device_name, platform, entity_id
-                            )
-                            if not temp_name:
-                                continue
-                            else:
-                                _item[ATTR_NAME] = temp_name
-                            _id_name_dict_list.append(_item)
-                elif platform == Platform.MEDIA_PLAYER:
-                    for entity_id in entity_ids:
-                        device_class = self.hass.states.get(entity_id).attributes.get(
-                            ATTR_DEVICE_CLASS
+                            f"{entity_id} is not support {platform} device class:{device_class}",
                         )
-                        if device_class == MediaPlayerDeviceClass.TV:
-                            _item: dict = {}
-                            _device_name = self.hass.states.get(
-                                entity_id
-                            ).attributes.get(ATTR_FRIENDLY_NAME)
-                            _item[VIVO_HA_PLATFORM_PKY_KEY] = VIVO_HA_PLATFORM_PK.get(
-                                platform
-                            )
-                            _item[ATTR_ENTITY_ID] = entity_id
-                            temp_name = self._generate_device_name(
-                                _device_name, platform, entity_id
-                            )
-                            if not temp_name:
-                                continue
-                            else:
-                                _item[ATTR_NAME] = temp_name
-                            _id_name_dict_list.append(_item)
-                        else:
-                            VLog.info(
-                                _TAG,
-                                f"{entity_id} is not support media player device class:{device_class}",
-                            )
-                else:
-                    for entity_id in entity_ids:
-                        _item: dict = {}
-                        _device_name = self.hass.states.get(entity_id).attributes.get(
-                            ATTR_FRIENDLY_NAME
-                        )
-                        _item[VIVO_HA_PLATFORM_PKY_KEY] = VIVO_HA_PLATFORM_PK.get(
-                            platform
-                        )
-                        _item[ATTR_ENTITY_ID] = entity_id
-                        temp_name = self._generate_device_name(
-                            _device_name, platform, entity_id
-                        )
-                        if not temp_name:
-                            continue
-                        else:
-                            _item[ATTR_NAME] = temp_name
-                        _id_name_dict_list.append(_item)
+                        continue
+                    _item: dict = {
+                        ATTR_ENTITY_ID: entity_id,
+                        VIVO_HA_PLATFORM_PKY_KEY: handler.pky_get(platform, device_class),
+                    }
+                    temp_name = self._generate_device_name(
+                        _attributes.get(ATTR_FRIENDLY_NAME), platform, entity_id
+                    )
+                    if not temp_name:
+                        continue
+                    _item[ATTR_NAME] = temp_name
+                    _id_name_dict_list.append(_item)
         return _id_name_dict_list
 
     def _generate_device_name(
@@ -572,71 +422,22 @@ class VBridgeEntity:
         """new device integration"""
         device_entity_id = device[VIVO_DEVICE_ENTITY_ID_KEY]
         device_state = self.hass.states.get(device_entity_id)
-        VLog.info(_TAG, f"[flush][{reason}][{device_entity_id}] {device_state}")
+        VLog.info(_TAG, "[flush][%s][%s] %s", reason, device_entity_id, device_state)
         if device_state is not None:
-            attributes_map: list = []
-            attributes = copy.deepcopy(dict(device_state.attributes))
+            # 校准写入覆盖层，HA 的属性只读，不复制
+            attributes = ChainMap({}, device_state.attributes)
             device_platform = device[VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC].split(".")[1]
-            VLog.info(_TAG, f"[flush] device platform:{device_platform}")
-            if device_platform == Platform.LIGHT:
-                attributes_map = self.light_model.attributes_map
-            elif device_platform == Platform.SWITCH:
-                attributes_map = self.switch_model.attributes_map
-            elif device_platform == Platform.CLIMATE:
-                attributes_map = self.climate_model.attributes_map
-                attributes["state"] = device_state.state
-                self.climate_model.calibrate_swing_mode_attr_when_flush(attributes)
-            elif device_platform == Platform.FAN:
-                attributes_map = self.fan_model.attributes_map
-                attributes["state"] = device_state.state
-            elif device_platform == Platform.COVER:
-                attributes_map = self.cover_model.attributes_map
-            elif device_platform == Platform.MEDIA_PLAYER:
-                _attributes_list = VTVModelUtils.get_media_player_attributes_list(
-                    device_entity_id, self.hass, self.tv_model
-                )
-                attributes["state"] = device_state.state
-                attributes[HA_ATTR_NAME_POWER] = device_state.state
-                if _attributes_list is not None and len(_attributes_list) != 0:
-                    attributes_map = _attributes_list
-            elif device_platform == Platform.REMOTE:
-                attributes["state"] = device_state.state
-                attributes[HA_ATTR_NAME_POWER] = device_state.state
-                _attributes_list = VTVModelUtils.get_remote_device_attribute_list(
-                    device_entity_id, self.hass, self.tv_model
-                )
-                if _attributes_list is not None and len(_attributes_list) != 0:
-                    attributes_map = _attributes_list
-            elif (
-                device_platform == Platform.SENSOR
-                or device_platform == Platform.BINARY_SENSOR
-            ):
-                attributes_maps = self.sensor_model.attributes_map
-                device_class = attributes.get(ATTR_DEVICE_CLASS)
-                target_map = next( item 
-                                      for item in attributes_maps
-                                      if item[VIVI_KEY_WORK_SENSOR_CLASS] ==device_class 
-                                      )
-                attributes_map.append(target_map)
-                unit = attributes.get(CONF_UNIT_OF_MEASUREMENT)
-                if device_class == SensorDeviceClass.TEMPERATURE:
-                    attributes["state"] = self.sensor_model.sensor_h2v_val(
-                        device_class, unit, device_state.state
-                    )
-                else:
-                    attributes["state"] = device_state.state
-            elif device_platform == Platform.WATER_HEATER:
-                attributes_map = self.water_heater_model.attributes_map
-                attributes["state"] = device_state.state
-            else:
-                VLog.info(_TAG, f"[flush] not support :{device_platform}")
+            VLog.info(_TAG, "[flush] device platform:%s", device_platform)
+            attributes_map = self.platform_handler_get(device_platform).flush_prepare(
+                device_entity_id, device_state, attributes
+            )
+            if attributes_map is None:
                 return
-            try:
-                VLog.info(
-                    _TAG, "[flush] Attribute before transform: " + json.dumps(attributes,default=str)
-                )
-            except Exception as e:
-                VLog.warning(_TAG, f"<json error: {e}>")
+            VLog.info(
+                _TAG,
+                "[flush] Attribute before transform: %s",
+                VLog.lazy(lambda: codec.dumps_str(dict(attributes))),
+            )
             vivo_std_attrs = {}
             try:
                 vivo_std_attrs = VAttributeUtils.h2v_attributes_converter(
@@ -660,19 +461,21 @@ class VBridgeEntity:
                 vivo_std_attrs = {VIVO_ATTR_NAME_ONLINE: "false"}
             else:
                 vivo_std_attrs[VIVO_ATTR_NAME_ONLINE] = "true"
-            try:
-                VLog.info(
-                    _TAG, "[flush] Attribute after transform: " + json.dumps(vivo_std_attrs,default=str)
-                )
-            except Exception as e:
-                VLog.warning(_TAG, f"<json error: {e}>")
+            VLog.info(
+                _TAG,
+                "[flush] Attribute after transform: %s",
+                VLog.lazy(codec.dumps_str, vivo_std_attrs),
+            )
             self.hass.bus.fire(
                 EVENT_VHOME_DEV_STATE_CHANGE,
-                {
-                    "data": vivo_std_attrs,
-                    VIVO_DEVICE_NAME_CONFIG_KEY: device[VIVO_DEVICE_NAME_CONFIG_KEY],
-                    "domain": DOMAIN,
-                },
+                self.event_data(
+                    {
+                        "data": vivo_std_attrs,
+                        VIVO_DEVICE_NAME_CONFIG_KEY: device[VIVO_DEVICE_NAME_CONFIG_KEY],
+                        "domain": DOMAIN,
+                        VIVO_STATE_FLUSH_EVENT_KEY: True,
+                    }
+                ),
             )
         else:
             # 被禁用了
@@ -680,11 +483,14 @@ class VBridgeEntity:
             vivo_std_attrs = {VIVO_ATTR_NAME_ONLINE: "false"}
             self.hass.bus.fire(
                 EVENT_VHOME_DEV_STATE_CHANGE,
-                {
-                    "data": vivo_std_attrs,
-                    VIVO_DEVICE_NAME_CONFIG_KEY: device[VIVO_DEVICE_NAME_CONFIG_KEY],
-                    "domain": DOMAIN,
-                },
+                self.event_data(
+                    {
+                        "data": vivo_std_attrs,
+                        VIVO_DEVICE_NAME_CONFIG_KEY: device[VIVO_DEVICE_NAME_CONFIG_KEY],
+                        "domain": DOMAIN,
+                        VIVO_STATE_FLUSH_EVENT_KEY: True,
+                    }
+                ),
             )
 
     def _sub_dev_common_attributes_get(self, entity_id: str) -> dict | None:
@@ -724,10 +530,11 @@ class VBridgeEntity:
         return common_attributes
 
     async def async_sub_dev_attributes_set(self, dname: str, v_attributes: dict):
-        entity_id = Utils.get_entity_id_by_name(dname, self.bridge_config_data)
-        deviceid = Utils.get_device_id_by_name(dname, self.bridge_config_data)
+        record = self.bridge_config_data.find_by_dn(dname) or {}
+        entity_id = record.get(VIVO_DEVICE_ENTITY_ID_KEY)
+        deviceid = record.get(VIVO_DEVICE_ID_KEY)
         VLog.info(
-            _TAG, f"[sub_dev_attributes_set]:entity_id:{entity_id}:{dname}:{deviceid}"
+            _TAG, "[sub_dev_attributes_set]:entity_id:%s:%s:%s", entity_id, dname, deviceid
         )
         if entity_id is None:
             return
@@ -738,61 +545,30 @@ class VBridgeEntity:
         onoff = self.hass.states.get(entity_id).state
 
         if onoff == "unavailable":
-            VLog.info(_TAG, f"{dname} is unavailable")
+            VLog.info(_TAG, "%s is unavailable", dname)
             return
         platform = entity_id.split(".")[0]
         if platform not in VIVO_HA_PLATFORM_SUPPORT_LIST:
-            VLog.warning(_TAG, f"Unsupported platform:{platform}")
+            VLog.warning(_TAG, "Unsupported platform:%s", platform)
             return
         await self._v2h_states_set(platform, entity_id, v_attributes)
 
     async def _v2h_states_set(self, domain: str, entity_id: str, attributes):
         """new device integration"""
-        attributes_map: list = []
-        if domain == Platform.LIGHT:
-            attributes_map = self.light_model.attributes_map
-        elif domain == Platform.SWITCH:
-            attributes_map = self.switch_model.attributes_map
-        elif domain == Platform.CLIMATE:
-            attributes_map = self.climate_model.attributes_map
-        elif domain == Platform.FAN:
-            attributes_map = self.fan_model.attributes_map
-        elif domain == Platform.COVER:
-            attributes_map = self.cover_model.attributes_map
-        elif domain == Platform.MEDIA_PLAYER:
-            attributes_map = VTVModelUtils.get_media_player_attributes_list(
-                entity_id, self.hass, self.tv_model
-            )
-            if attributes_map is None or len(attributes_map) == 0:
-                VLog.info(_TAG, f"no attribute {domain} for {entity_id}")
-                return
-        elif domain == Platform.REMOTE:
-            attributes_map = VTVModelUtils.get_remote_device_attribute_list(
-                entity_id, self.hass, self.tv_model
-            )
-            if attributes_map is None or len(attributes_map) == 0:
-                VLog.info(_TAG, f"no attribute {domain} for {entity_id}")
-                return
-        elif domain == Platform.WATER_HEATER:
-            attributes_map = self.water_heater_model.attributes_map
-        else:
-            VLog.info(_TAG, f"not support {domain}")
+        attributes_map = self.platform_handler_get(domain).attributes_table_get(entity_id)
+        if attributes_map is None:
             return
         VLog.info(
             _TAG,
-            f"[v2h_states_set]entity_id:{entity_id},domain:{domain},attributes:{attributes}",
+            "[v2h_states_set]entity_id:%s,domain:%s,attributes:%s",
+            entity_id,
+            domain,
+            attributes,
         )
         _task_index = 0
         for key, val in attributes.items():
-            obj = next(
-                (
-                    item
-                    for item in attributes_map
-                    if item.get(VIVO_KEY_WORD_V_NAME) == key
-                ),
-                None,
-            )
-            VLog.info(_TAG, f"[v2h_states_set]key:{key},value:{val},obj:{obj}")
+            obj = attributes_map.v_spec(key)
+            VLog.info(_TAG, "[v2h_states_set]key:%s,value:%s,obj:%s", key, val, obj)
             if obj:
                 v2h_converter = obj["v2h_converter"]
                 _service = None
@@ -813,23 +589,25 @@ class VBridgeEntity:
                         _target_domain = domain
                     VLog.info(
                         _TAG,
-                        f"[v2h_states_set]domain:{_target_domain},service:{_service},"
-                        f"h_attributes:{_h_attributes}",
+                        "[v2h_states_set]domain:%s,service:%s,h_attributes:%s",
+                        _target_domain,
+                        _service,
+                        _h_attributes,
                     )
                     _task_index += 1
                     if _task_index > 1:
                         try:
                             await asyncio.sleep(2)
                         except asyncio.CancelledError as e:
-                            VLog.info(_TAG, f"[v2h_states_set] exception:{e}")
+                            VLog.info(_TAG, "[v2h_states_set] exception:%s", e)
                     self.hass.async_create_task(
                         self.hass.services.async_call(
                             _target_domain, _service, _h_attributes, context=None
                         )
                     )
                 else:
-                    VLog.warning(_TAG, f"[v2h_states_set] no convert method for {key}")
+                    VLog.warning(_TAG, "[v2h_states_set] no convert method for %s", key)
             else:
                 VLog.warning(
-                    _TAG, f"[v2h_states_set] {key} no contain to {attributes_map}"
+                    _TAG, "[v2h_states_set] %s no contain to %s", key, attributes_map
                 )
@@ -5,39 +5,26 @@ Licensed under the Apache License, Version 2.0 (the "License");
    http://www.apache.org/licenses/LICENSE-2.0
 """
 
-import json
 import re
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     ATTR_SUPPORTED_FEATURES,
-    Platform,
     ATTR_DEVICE_CLASS,
     ATTR_FRIENDLY_NAME,
 )
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr, entity_registry as er
-from homeassistant.components.switch import (
-    SwitchDeviceClass,
-)
 from .const import (
-    VIVO_HA_PLATFORM_PK,
     VIVO_HA_PLATFORM_PKY_KEY,
     VIVO_HA_KEY_WORLD_DEV_LOGIC_MAC,
     VIVO_HA_KEY_WORLD_DEV_PHY_MAC,
     VIVO_HA_PLATFORM_MANUFACTURER,
     VIVO_HA_KEY_WORLD_DEV_PROPS,
     VIVO_HA_KEY_WORLD_DEV_EN,
-    VIVO_HA_PLATFORM_SOCKET_PK,
-    VIVO_HA_PLATFORM_SWITCH_PK,
 )
+from .platform_handler import platform_handler_class_get
 from .v_attritube_map import v2h_attributes_map
-from .v_climate_model import VClimateModel
-from .v_cover_model import VCoverModel
-from .v_fan_model import VFanModel
-from .v_light_model import VLightModel
-from .v_sensor_model import VSensorModel, VIVO_HA_SENSORS_PK
-from .v_switch_model import VSwitchModel
-from .v_tv_model import VTVModelUtils
+from .py_vhome import codec
 from .v_utils.vlog import VLog
 
 _TAG = "model"
@@ -67,59 +54,21 @@ class VModel:
             self.supported_features = self.state.attributes.get(ATTR_SUPPORTED_FEATURES)
         self.common_model = v2h_attributes_map["commom"]
         self.entity_model: list = []
-        pky = VIVO_HA_PLATFORM_PK.get(self.platform)
         manufacturer_name: str = "万物互联有限公司"
         self.phyMac: str = self.entity_obj.device_id
         if not self.entity_obj.id:
             self.logicMac = None
         else:
             self.logicMac: str = f"{self.entity_obj.id}.{self.platform}"
-        if self.platform == Platform.LIGHT:
-            self.entity_model = VLightModel.model_get(
-                self.hass, self.entity_id, self.entity_attributes
-            )
-        elif self.platform == Platform.SWITCH:
-            self.entity_model = VSwitchModel.model_get(
-                self.hass, self.entity_id, self.entity_attributes
-            )
-            VLog.info(
-                _TAG,
-                f"get switch model class:{self.entity_attributes.get(ATTR_DEVICE_CLASS)}",
-            )
-            device_class = self.entity_attributes.get(ATTR_DEVICE_CLASS)
-            if device_class == SwitchDeviceClass.OUTLET:
-                pky = VIVO_HA_PLATFORM_SOCKET_PK
-            else:
-                pky = VIVO_HA_PLATFORM_SWITCH_PK
-
-        elif self.platform == Platform.CLIMATE:
-            self.entity_model = VClimateModel.model_get(
-                self.hass, self.entity_id, self.entity_attributes
-            )
-        elif self.platform == Platform.FAN:
-            self.entity_model = VFanModel.model_get(
-                self.hass, self.entity_id, self.entity_attributes
-            )
-        elif self.platform == Platform.COVER:
-            self.entity_model = VCoverModel.model_get(
-                self.hass, self.entity_id, self.entity_attributes
-            )
-        elif self.platform == Platform.REMOTE:
-            self.entity_model = VTVModelUtils.remote_model_get(
-                self.hass, self.device, self.entity_attributes
-            )
-        elif self.platform == Platform.MEDIA_PLAYER:
-            self.entity_model = VTVModelUtils.media_play_model_get(
-                self.hass, self.device, self.entity_attributes
-            )
-        elif self.platform in {Platform.SENSOR, Platform.BINARY_SENSOR}:
-            self.entity_model = VSensorModel.model_get(
-                self.hass, self.entity_id, self.entity_attributes
-            )
-            pky = VIVO_HA_SENSORS_PK.get(self.entity_attributes.get(ATTR_DEVICE_CLASS))
-        else:
+        handler = platform_handler_class_get(self.platform)
+        entity_model = handler.model_get(
+            self.hass, self.entity_id, self.device, self.entity_attributes
+        )
+        if entity_model is None:
             VLog.error(_TAG, f"[init]platform:{self.platform} not support")
             return
+        self.entity_model = entity_model
+        pky = handler.pky_get(self.platform, self.entity_attributes.get(ATTR_DEVICE_CLASS))
 
         if len(self.entity_model) == 0:
             VLog.warning(
@@ -145,10 +94,14 @@ class VModel:
         self.model[VIVO_HA_KEY_WORLD_DEV_PHY_MAC] = self.phyMac
         self.model[VIVO_HA_KEY_WORLD_DEV_PROPS] = self.common_model + self.entity_model
 
-        try:
-            json_str = json.dumps(self.entity_attributes, default=str)
-        except Exception as e:
-            json_str = f"<json error: {e}>"
-
-        VLog.info(_TAG, f"[init]entity_attributes json :{json_str}")
-        VLog.info(_TAG, f"[init]{entity_id} whole_model:{json.dumps(self.model,default=str)}")
+        VLog.info(
+            _TAG,
+            "[init]entity_attributes json :%s",
+            VLog.lazy(codec.dumps_str, self.entity_attributes),
+        )
+        VLog.info(
+            _TAG,
+            "[init]%s whole_model:%s",
+            entity_id,
+            VLog.lazy(codec.dumps_str, self.model),
+        )